@@ -0,0 +1,75 @@
+"""add llm_response_cache and eval_results cache flags
+
+Revision ID: 3e8f5a2c9d17
+Revises: 9d2b7e4a1c63
+Create Date: 2026-10-17 14:05:37.582930
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3e8f5a2c9d17"
+down_revision: Union[str, Sequence[str], None] = "9d2b7e4a1c63"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "llm_response_cache",
+        sa.Column("cache_key", sa.String(length=64), nullable=False),
+        sa.Column("model_name", sa.Text(), nullable=False),
+        sa.Column("response_text", sa.Text(), nullable=False),
+        sa.Column("response_model", sa.Text(), nullable=True),
+        sa.Column("usage_prompt_tokens", sa.BigInteger(), nullable=True),
+        sa.Column("usage_completion_tokens", sa.BigInteger(), nullable=True),
+        sa.Column("usage_total_tokens", sa.BigInteger(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "last_used_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("cache_key"),
+    )
+    op.create_index(
+        "ix_llm_response_cache_last_used_at", "llm_response_cache", ["last_used_at"]
+    )
+    op.add_column(
+        "eval_results",
+        sa.Column(
+            "answer_cached",
+            sa.Boolean(),
+            server_default=sa.text("false"),
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        "eval_results",
+        sa.Column(
+            "judge_cached",
+            sa.Boolean(),
+            server_default=sa.text("false"),
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("eval_results", "judge_cached")
+    op.drop_column("eval_results", "answer_cached")
+    op.drop_index("ix_llm_response_cache_last_used_at", table_name="llm_response_cache")
+    op.drop_table("llm_response_cache")
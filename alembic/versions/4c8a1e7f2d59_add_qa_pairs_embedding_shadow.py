@@ -0,0 +1,61 @@
+"""add qa_pairs embedding_model and embedding_shadow
+
+Revision ID: 4c8a1e7f2d59
+Revises: b6e04d2f7c19
+Create Date: 2026-10-17 02:14:37.905126
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+from app.infrastructure.config import EMBEDDING_MODEL_NAME
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4c8a1e7f2d59"
+down_revision: Union[str, Sequence[str], None] = "b6e04d2f7c19"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("qa_pairs", sa.Column("embedding_model", sa.Text(), nullable=True))
+    op.add_column(
+        "qa_pairs", sa.Column("embedding_shadow", Vector(1024), nullable=True)
+    )
+    op.add_column(
+        "qa_pairs", sa.Column("embedding_shadow_model", sa.Text(), nullable=True)
+    )
+    # Existing rows were embedded with the configured model.
+    if EMBEDDING_MODEL_NAME:
+        op.execute(
+            sa.text("UPDATE qa_pairs SET embedding_model = :model").bindparams(
+                model=EMBEDDING_MODEL_NAME
+            )
+        )
+    op.create_index(
+        "ix_qa_pairs_embedding_shadow_hnsw",
+        "qa_pairs",
+        ["embedding_shadow"],
+        unique=False,
+        postgresql_using="hnsw",
+        postgresql_with={"m": 16, "ef_construction": 64},
+        postgresql_ops={"embedding_shadow": "vector_cosine_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_qa_pairs_embedding_shadow_hnsw",
+        table_name="qa_pairs",
+        postgresql_using="hnsw",
+    )
+    op.drop_column("qa_pairs", "embedding_shadow_model")
+    op.drop_column("qa_pairs", "embedding_shadow")
+    op.drop_column("qa_pairs", "embedding_model")
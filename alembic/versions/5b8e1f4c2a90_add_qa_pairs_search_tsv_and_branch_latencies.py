@@ -0,0 +1,63 @@
+"""add qa_pairs search_tsv and rag_runs branch latencies
+
+Revision ID: 5b8e1f4c2a90
+Revises: c3d91e0a7b52
+Create Date: 2026-10-16 23:20:05.612087
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5b8e1f4c2a90"
+down_revision: Union[str, Sequence[str], None] = "c3d91e0a7b52"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "qa_pairs",
+        sa.Column(
+            "search_tsv",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "to_tsvector('russian'::regconfig, question || ' ' || answer)",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_qa_pairs_search_tsv_gin",
+        "qa_pairs",
+        ["search_tsv"],
+        unique=False,
+        postgresql_using="gin",
+    )
+    op.add_column(
+        "rag_runs",
+        sa.Column("latency_ms_retrieval_vector", sa.BigInteger(), nullable=True),
+    )
+    op.add_column(
+        "rag_runs",
+        sa.Column("latency_ms_retrieval_lexical", sa.BigInteger(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("rag_runs", "latency_ms_retrieval_lexical")
+    op.drop_column("rag_runs", "latency_ms_retrieval_vector")
+    op.drop_index(
+        "ix_qa_pairs_search_tsv_gin",
+        table_name="qa_pairs",
+        postgresql_using="gin",
+    )
+    op.drop_column("qa_pairs", "search_tsv")
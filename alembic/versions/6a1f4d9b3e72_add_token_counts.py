@@ -0,0 +1,36 @@
+"""add qa_pairs token_count and rag_runs context token budget
+
+Revision ID: 6a1f4d9b3e72
+Revises: 3e8f5a2c9d17
+Create Date: 2026-10-17 16:12:37.508193
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6a1f4d9b3e72"
+down_revision: Union[str, Sequence[str], None] = "3e8f5a2c9d17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Filled by seeding; existing rows via `python -m app.infrastructure.db.count_qa_tokens`.
+    op.add_column("qa_pairs", sa.Column("token_count", sa.Integer(), nullable=True))
+    op.add_column("rag_runs", sa.Column("context_tokens", sa.Integer(), nullable=True))
+    op.add_column(
+        "rag_runs", sa.Column("context_token_budget", sa.Integer(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("rag_runs", "context_token_budget")
+    op.drop_column("rag_runs", "context_tokens")
+    op.drop_column("qa_pairs", "token_count")
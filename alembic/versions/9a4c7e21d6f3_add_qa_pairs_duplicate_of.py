@@ -0,0 +1,38 @@
+"""add qa_pairs duplicate_of
+
+Revision ID: 9a4c7e21d6f3
+Revises: 5b8e1f4c2a90
+Create Date: 2026-10-16 23:41:37.204518
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9a4c7e21d6f3"
+down_revision: Union[str, Sequence[str], None] = "5b8e1f4c2a90"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("qa_pairs", sa.Column("duplicate_of", sa.BigInteger(), nullable=True))
+    op.create_foreign_key(
+        "qa_pairs_duplicate_of_fkey",
+        "qa_pairs",
+        "qa_pairs",
+        ["duplicate_of"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("qa_pairs_duplicate_of_fkey", "qa_pairs", type_="foreignkey")
+    op.drop_column("qa_pairs", "duplicate_of")
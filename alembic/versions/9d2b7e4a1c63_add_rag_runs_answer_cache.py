@@ -0,0 +1,59 @@
+"""add rag_runs answer cache columns
+
+Revision ID: 9d2b7e4a1c63
+Revises: f1a6d3c8b2e0
+Create Date: 2026-10-17 11:42:51.307214
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9d2b7e4a1c63"
+down_revision: Union[str, Sequence[str], None] = "f1a6d3c8b2e0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "rag_runs", sa.Column("question_embedding", Vector(1024), nullable=True)
+    )
+    op.add_column(
+        "rag_runs", sa.Column("context_key", sa.String(length=64), nullable=True)
+    )
+    op.add_column(
+        "rag_runs",
+        sa.Column("answer_cache_source_id", sa.UUID(), nullable=True),
+    )
+    op.create_foreign_key(
+        "fk_rag_runs_answer_cache_source_id",
+        "rag_runs",
+        "rag_runs",
+        ["answer_cache_source_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+    op.create_index(
+        "ix_rag_runs_context_key",
+        "rag_runs",
+        ["context_key", "created_at"],
+        postgresql_where=sa.text("context_key IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_rag_runs_context_key", table_name="rag_runs")
+    op.drop_constraint(
+        "fk_rag_runs_answer_cache_source_id", "rag_runs", type_="foreignkey"
+    )
+    op.drop_column("rag_runs", "answer_cache_source_id")
+    op.drop_column("rag_runs", "context_key")
+    op.drop_column("rag_runs", "question_embedding")
@@ -0,0 +1,43 @@
+"""add seed_checkpoints
+
+Revision ID: b6e04d2f7c19
+Revises: 7d3b6f0e95a4
+Create Date: 2026-10-17 01:02:26.730415
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b6e04d2f7c19"
+down_revision: Union[str, Sequence[str], None] = "7d3b6f0e95a4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "seed_checkpoints",
+        sa.Column("source_hash", sa.String(length=64), nullable=False),
+        sa.Column("chunk_size", sa.Integer(), nullable=False),
+        sa.Column("chunk_index", sa.Integer(), nullable=False),
+        sa.Column("source_path", sa.Text(), nullable=False),
+        sa.Column("row_count", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("source_hash", "chunk_size", "chunk_index"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("seed_checkpoints")
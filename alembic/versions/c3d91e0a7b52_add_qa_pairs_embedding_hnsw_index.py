@@ -0,0 +1,41 @@
+"""add qa_pairs embedding hnsw index
+
+Revision ID: c3d91e0a7b52
+Revises: 4f5e2dda35ed
+Create Date: 2026-10-16 10:12:41.318204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c3d91e0a7b52"
+down_revision: Union[str, Sequence[str], None] = "4f5e2dda35ed"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_qa_pairs_embedding_hnsw",
+        "qa_pairs",
+        ["embedding"],
+        unique=False,
+        postgresql_using="hnsw",
+        # pgvector defaults; changing them needs a new migration.
+        postgresql_with={"m": 16, "ef_construction": 64},
+        postgresql_ops={"embedding": "vector_cosine_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_qa_pairs_embedding_hnsw",
+        table_name="qa_pairs",
+        postgresql_using="hnsw",
+    )
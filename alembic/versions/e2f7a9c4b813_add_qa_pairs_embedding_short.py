@@ -0,0 +1,56 @@
+"""add qa_pairs embedding_short
+
+Revision ID: e2f7a9c4b813
+Revises: 9a4c7e21d6f3
+Create Date: 2026-10-17 00:05:12.481937
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e2f7a9c4b813"
+down_revision: Union[str, Sequence[str], None] = "9a4c7e21d6f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # subvector/l2_normalize need pgvector >= 0.7.
+    op.add_column(
+        "qa_pairs",
+        sa.Column(
+            "embedding_short",
+            Vector(256),
+            sa.Computed(
+                "l2_normalize(subvector(embedding, 1, 256))::vector(256)",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_qa_pairs_embedding_short_hnsw",
+        "qa_pairs",
+        ["embedding_short"],
+        unique=False,
+        postgresql_using="hnsw",
+        postgresql_with={"m": 16, "ef_construction": 64},
+        postgresql_ops={"embedding_short": "vector_cosine_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_qa_pairs_embedding_short_hnsw",
+        table_name="qa_pairs",
+        postgresql_using="hnsw",
+    )
+    op.drop_column("qa_pairs", "embedding_short")
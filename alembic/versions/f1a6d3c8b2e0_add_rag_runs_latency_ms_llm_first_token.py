@@ -0,0 +1,32 @@
+"""add rag_runs latency_ms_llm_first_token
+
+Revision ID: f1a6d3c8b2e0
+Revises: 4c8a1e7f2d59
+Create Date: 2026-10-17 03:21:08.164520
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f1a6d3c8b2e0"
+down_revision: Union[str, Sequence[str], None] = "4c8a1e7f2d59"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "rag_runs",
+        sa.Column("latency_ms_llm_first_token", sa.BigInteger(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("rag_runs", "latency_ms_llm_first_token")
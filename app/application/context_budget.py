@@ -0,0 +1,95 @@
+from dataclasses import dataclass, replace
+from typing import Optional, Sequence
+
+from app.domain.models.qa_pair import QaPairProjection
+from app.domain.models.tokens import TokenEstimator, count_qa_pair_tokens
+
+# Context formatting around each pair ("- Q1: ...\n  A1: ...", separators).
+PAIR_OVERHEAD_TOKENS = 8
+_ELLIPSIS = "…"
+
+
+@dataclass(frozen=True)
+class ContextBudgetUsage:
+    budget_tokens: Optional[int]
+    used_tokens: int
+    pairs_used: int
+    pairs_truncated: int
+    pairs_dropped: int
+
+
+def pair_tokens(qa: QaPairProjection, estimator: TokenEstimator) -> int:
+    """Context tokens of a pair; the precomputed count is used when present."""
+    count = (
+        qa.token_count
+        if qa.token_count is not None
+        else count_qa_pair_tokens(qa.question, qa.answer, estimator)
+    )
+    return count + PAIR_OVERHEAD_TOKENS
+
+
+def truncate_to_tokens(text: str, max_tokens: int, estimator: TokenEstimator) -> str:
+    """Cut `text` on a word boundary so that it, with an ellipsis, fits."""
+    if estimator(text) <= max_tokens:
+        return text
+    cut = text
+    while cut and estimator(cut + _ELLIPSIS) > max_tokens:
+        ratio = max_tokens / max(1, estimator(cut + _ELLIPSIS))
+        # Proportional guess, at least 10% shorter per step so it terminates.
+        end = int(len(cut) * min(ratio, 0.9))
+        space = cut.rfind(" ", 0, end)
+        cut = cut[: space if space > end // 2 else end].rstrip()
+    return cut + _ELLIPSIS if cut else ""
+
+
+def fit_context(
+    qa_pairs: Sequence[QaPairProjection],
+    *,
+    budget_tokens: int,
+    estimator: TokenEstimator,
+    min_answer_tokens: int,
+) -> tuple[list[QaPairProjection], ContextBudgetUsage]:
+    """
+    Greedily keep pairs in the given (relevance) order while they fit into
+    `budget_tokens`. A pair that does not fit is kept with its answer
+    truncated if at least `min_answer_tokens` of the answer would remain,
+    otherwise dropped; later, shorter pairs may still fit. A budget of 0 or
+    less keeps everything.
+    """
+    if budget_tokens <= 0:
+        return list(qa_pairs), ContextBudgetUsage(
+            budget_tokens=None,
+            used_tokens=sum(pair_tokens(qa, estimator) for qa in qa_pairs),
+            pairs_used=len(qa_pairs),
+            pairs_truncated=0,
+            pairs_dropped=0,
+        )
+
+    selected: list[QaPairProjection] = []
+    used = 0
+    truncated = 0
+    for qa in qa_pairs:
+        tokens = pair_tokens(qa, estimator)
+        remaining = budget_tokens - used
+        if tokens <= remaining:
+            selected.append(qa)
+            used += tokens
+            continue
+
+        question_tokens = estimator(qa.question) + PAIR_OVERHEAD_TOKENS
+        answer_budget = remaining - question_tokens
+        if answer_budget < max(1, min_answer_tokens):
+            continue
+        answer = truncate_to_tokens(qa.answer, answer_budget, estimator)
+        answer_tokens = estimator(answer)
+        selected.append(replace(qa, answer=answer, token_count=None))
+        used += question_tokens + answer_tokens
+        truncated += 1
+
+    return selected, ContextBudgetUsage(
+        budget_tokens=budget_tokens,
+        used_tokens=used,
+        pairs_used=len(selected),
+        pairs_truncated=truncated,
+        pairs_dropped=len(qa_pairs) - len(selected),
+    )
@@ -0,0 +1,42 @@
+from dataclasses import replace
+from typing import Optional, Sequence
+
+from app.domain.models.qa_pair import QaPairHit
+
+# Rank offset from the original RRF paper; damps the weight of the top ranks.
+DEFAULT_RRF_K = 60
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Sequence[Sequence[QaPairHit]],
+    *,
+    rrf_k: int = DEFAULT_RRF_K,
+    limit: Optional[int] = None,
+) -> list[QaPairHit]:
+    """
+    Merge ranked hit lists by summing 1 / (rrf_k + rank + 1) per QA pair.
+
+    The first occurrence of a pair keeps its distance/similarity; lexical_rank
+    is taken from whichever list set it. Returned hits are re-ranked by fused
+    score and carry it in `fusion_score`.
+    """
+    scores: dict[int, float] = {}
+    merged: dict[int, QaPairHit] = {}
+    for hits in ranked_lists:
+        for position, hit in enumerate(hits):
+            key = hit.qa_pair.id if hit.qa_pair.id is not None else -id(hit.qa_pair)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + position + 1)
+            seen = merged.get(key)
+            if seen is None:
+                merged[key] = hit
+            elif seen.lexical_rank is None and hit.lexical_rank is not None:
+                merged[key] = replace(seen, lexical_rank=hit.lexical_rank)
+
+    # Stable sort: ties keep first-seen order, i.e. the first list wins.
+    ordered = sorted(merged, key=lambda key: scores[key], reverse=True)
+    if limit is not None:
+        ordered = ordered[:limit]
+    return [
+        replace(merged[key], rank=rank, fusion_score=scores[key])
+        for rank, key in enumerate(ordered)
+    ]
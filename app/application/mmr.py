@@ -0,0 +1,42 @@
+from typing import Optional
+
+import numpy as np
+import numpy.typing as npt
+
+
+def mmr_select(
+    relevance: npt.NDArray[np.float32],
+    embeddings: npt.NDArray[np.float32],
+    k: int,
+    *,
+    lambda_: float = 0.7,
+    duplicate_similarity: Optional[float] = None,
+) -> list[int]:
+    """
+    Maximal marginal relevance: greedily pick up to k candidates maximizing
+    `lambda_ * relevance - (1 - lambda_) * max cosine to already picked`.
+
+    `embeddings` rows are normalized here; all-zero rows (no embedding) never
+    penalize or get penalized. Candidates at least `duplicate_similarity`
+    similar to a picked one are dropped entirely, so fewer than k indices may
+    be returned.
+    """
+    n = int(relevance.shape[0])
+    if n == 0 or k <= 0:
+        return []
+
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    normalized = embeddings / np.where(norms > 0, norms, 1.0)
+    pairwise = (normalized @ normalized.T).astype(np.float32)
+    max_sim = np.zeros(n, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    selected: list[int] = []
+    while len(selected) < k and available.any():
+        scores = lambda_ * relevance - (1.0 - lambda_) * max_sim
+        idx = int(np.argmax(np.where(available, scores, -np.inf)))
+        selected.append(idx)
+        available[idx] = False
+        max_sim = np.maximum(max_sim, pairwise[idx])
+        if duplicate_similarity is not None:
+            available &= pairwise[idx] < duplicate_similarity
+    return selected
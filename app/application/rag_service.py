@@ -1,19 +1,45 @@
+import asyncio
+import hashlib
+import json
 import time
-from dataclasses import dataclass
-from typing import Optional, Sequence
+from dataclasses import dataclass, replace
+from typing import Any, Awaitable, Mapping, Optional, Sequence, TypeVar
 
-from app.domain.interfaces.qa_pair_repository import QaPairRepository
+import numpy as np
+
+from app.application.context_budget import ContextBudgetUsage, fit_context
+from app.application.fusion import reciprocal_rank_fusion
+from app.application.mmr import mmr_select
+from app.domain.interfaces.qa_pair_repository import (
+    LexicalQaPairRetriever,
+    QaPairRepository,
+)
+from app.domain.interfaces.answer_cache import AnswerCache
 from app.domain.interfaces.embedding_provider import EmbeddingProvider
-from app.domain.interfaces.llm_client import LlmClient
-from app.domain.models.qa_pair import QaPair
+from app.domain.interfaces.llm_client import LlmClient, LlmDeltaHandler
+from app.domain.interfaces.topic_router import TopicRouter
+from app.domain.models.qa_pair import QaPairHit, QaPairProjection
 from app.domain.interfaces.rag_run_repository import RagRunRepository
-from app.domain.models.rag_run import RagRun, RagRunHit
+from app.domain.models.embedding import Embedding
+from app.domain.models.llm_generation import LlmGeneration, LlmUsage
+from app.domain.models.rag_run import CachedAnswer, RagRun, RagRunHit
+from app.domain.models.tokens import TokenEstimator, get_token_estimator
 from app.infrastructure.config import (
     EMBEDDING_MODEL_NAME,
     OPENROUTER_MODEL_NAME,
     OPENROUTER_TEMPERATURE,
+    RAG_CONTEXT_MIN_ANSWER_TOKENS,
+    RAG_CONTEXT_TOKEN_BUDGET,
+    RAG_LEXICAL_TOP_K,
     RAG_MIN_SIMILARITY,
+    RAG_MMR,
+    RAG_MMR_CANDIDATES,
+    RAG_MMR_DUPLICATE_SIMILARITY,
+    RAG_MMR_LAMBDA,
+    RAG_PUSHDOWN_MIN_SIMILARITY,
     RAG_QA_PROMPT_NAME,
+    RAG_RRF_K,
+    RAG_TOKEN_ESTIMATOR,
     RAG_TOP_K,
     SYSTEM_PROMPT_NAME,
 )
@@ -21,6 +47,14 @@ from app.prompts.loader import load_prompt
 from app.pricing.pricing import estimate_llm_cost_usd
 from loguru import logger
 
+T = TypeVar("T")
+
+
+async def _timed(awaitable: Awaitable[T]) -> tuple[T, int]:
+    t_start = time.perf_counter()
+    result = await awaitable
+    return result, int((time.perf_counter() - t_start) * 1000)
+
 
 @dataclass(frozen=True)
 class RagAnswerDetails:
@@ -34,6 +68,25 @@ class RagAnswerDetails:
     latency_ms_retrieval: int
     latency_ms_llm: int
     latency_ms_embedding: int
+    latency_ms_retrieval_vector: Optional[int] = None
+    latency_ms_retrieval_lexical: Optional[int] = None
+    latency_ms_llm_first_token: Optional[int] = None
+    # Generation came from the LLM response cache (usage is the original's).
+    llm_cached: bool = False
+
+
+@dataclass(frozen=True)
+class RagRetrieval:
+    question: str
+    query_embedding: Embedding
+    hits: Sequence[QaPairHit]
+    latency_ms_embedding: int
+    latency_ms_retrieval: int
+    # Per-branch timings; the lexical one is only set for hybrid retrieval.
+    latency_ms_retrieval_vector: Optional[int] = None
+    latency_ms_retrieval_lexical: Optional[int] = None
+    # Topics the vector search was restricted to (empty: whole corpus).
+    topics: Sequence[str] = ()
 
 
 class RagService:
@@ -47,36 +100,423 @@ class RagService:
         top_k: int = RAG_TOP_K,
         qa_prompt_name: str = RAG_QA_PROMPT_NAME,
         min_similarity: float = RAG_MIN_SIMILARITY,
+        pushdown_min_similarity: bool = RAG_PUSHDOWN_MIN_SIMILARITY,
+        lexical_retriever: Optional[LexicalQaPairRetriever] = None,
+        lexical_top_k: int = RAG_LEXICAL_TOP_K,
+        rrf_k: int = RAG_RRF_K,
+        topic_router: Optional[TopicRouter] = None,
+        mmr: bool = RAG_MMR,
+        mmr_lambda: float = RAG_MMR_LAMBDA,
+        mmr_candidates: int = RAG_MMR_CANDIDATES,
+        mmr_duplicate_similarity: Optional[float] = RAG_MMR_DUPLICATE_SIMILARITY,
+        answer_cache: Optional[AnswerCache] = None,
+        context_token_budget: int = RAG_CONTEXT_TOKEN_BUDGET,
+        context_min_answer_tokens: int = RAG_CONTEXT_MIN_ANSWER_TOKENS,
+        token_estimator: Optional[TokenEstimator] = None,
+        llm_model_name: Optional[str] = None,
+        llm_temperature: Optional[float] = None,
+        system_prompt_name: str = SYSTEM_PROMPT_NAME,
     ) -> None:
 
         self._qa_repo = qa_repo
         self._embeddings = embedding_provider
         self._llm = llm_client
+        # What `llm_client` was built with; the LlmClient protocol does not
+        # expose it, and the answer cache key and rag_runs need it.
+        self._llm_model_name = llm_model_name or OPENROUTER_MODEL_NAME or ""
+        self._llm_temperature = (
+            OPENROUTER_TEMPERATURE
+            if llm_temperature is None
+            else float(llm_temperature)
+        )
+        self._system_prompt_name = system_prompt_name
+        self._system_prompt = load_prompt(system_prompt_name)
         self._run_repo = run_repo
         self._top_k = top_k
         self._min_similarity = min_similarity
+        # When set, the repository drops hits below min_similarity itself, so
+        # rag_run_hits only records hits that were eligible for the context.
+        self._max_distance = 1.0 - min_similarity if pushdown_min_similarity else None
+        # With a lexical retriever, vector and full-text hits are fused by RRF.
+        self._lexical = lexical_retriever
+        self._lexical_top_k = lexical_top_k
+        self._rrf_k = rrf_k
+        self._topic_router = topic_router
+        # With MMR, search over-fetches a candidate pool and a diverse top_k
+        # subset of it is kept.
+        self._mmr = mmr
+        self._mmr_lambda = mmr_lambda
+        self._mmr_duplicate_similarity = mmr_duplicate_similarity
+        self._fetch_k = max(top_k, mmr_candidates) if mmr else top_k
         self._qa_prompt_name = qa_prompt_name
         self._qa_prompt_template = load_prompt(qa_prompt_name)
+        # With an answer cache, runs are stored with their question embedding
+        # and context key, and a matching earlier run skips the LLM call.
+        self._answer_cache = answer_cache
+        # Usable hits are packed into the context in rank order until the
+        # token budget is spent (0: no limit).
+        self._context_token_budget = context_token_budget
+        self._context_min_answer_tokens = context_min_answer_tokens
+        self._token_estimator = token_estimator or get_token_estimator(
+            RAG_TOKEN_ESTIMATOR
+        )
+        # Runs share one repository session; persist them one at a time.
+        self._run_repo_lock = asyncio.Lock()
+
+    def _route(self, query_vec: Embedding) -> list[str]:
+        if self._topic_router is None:
+            return []
+        topics = list(self._topic_router.route(query_vec))
+        logger.debug("RAG query routed to topics {}", topics)
+        return topics
+
+    async def _find_top_k_many_routed(
+        self,
+        query_vecs: Sequence[Embedding],
+        topics_per_question: Sequence[Sequence[str]],
+    ) -> Sequence[Sequence[QaPairHit]]:
+        # Questions routed to the same topics share one batched query.
+        groups: dict[tuple[str, ...], list[int]] = {}
+        for idx, topics in enumerate(topics_per_question):
+            groups.setdefault(tuple(topics), []).append(idx)
+
+        hits_per_question: list[Sequence[QaPairHit]] = [[] for _ in query_vecs]
+        for topics, indices in groups.items():
+            group_hits = await self._qa_repo.find_top_k_many(
+                [query_vecs[idx] for idx in indices],
+                self._fetch_k,
+                max_distance=self._max_distance,
+                topics=list(topics) or None,
+            )
+            for idx, hits in zip(indices, group_hits, strict=True):
+                hits_per_question[idx] = hits
+        return hits_per_question
+
+    def _is_usable(self, hit: QaPairHit) -> bool:
+        # Full-text matches are kept even below the similarity threshold: exact
+        # terms (program codes, document names) are what embeddings tend to miss.
+        return hit.similarity >= self._min_similarity or hit.lexical_rank is not None
+
+    async def _find_lexical(
+        self, question: str, query_vec: Embedding
+    ) -> Sequence[QaPairHit]:
+        if self._lexical is None:
+            return []
+        try:
+            return await self._lexical.find_top_k_lexical(
+                question, query_vec, self._lexical_top_k
+            )
+        except Exception as exc:
+            logger.exception("Lexical search failed, using vector hits only: {}", exc)
+            return []
+
+    async def _find_lexical_many(
+        self, questions: Sequence[str], query_vecs: Sequence[Embedding]
+    ) -> Sequence[Sequence[QaPairHit]]:
+        if self._lexical is None:
+            return [[] for _ in questions]
+        try:
+            return await self._lexical.find_top_k_lexical_many(
+                questions, query_vecs, self._lexical_top_k
+            )
+        except Exception as exc:
+            logger.exception("Lexical search failed, using vector hits only: {}", exc)
+            return [[] for _ in questions]
+
+    def _fuse(
+        self, vector_hits: Sequence[QaPairHit], lexical_hits: Sequence[QaPairHit]
+    ) -> list[QaPairHit]:
+        return reciprocal_rank_fusion(
+            [vector_hits, lexical_hits], rrf_k=self._rrf_k, limit=self._fetch_k
+        )
+
+    async def _diversify_many(
+        self, hits_per_question: Sequence[Sequence[QaPairHit]]
+    ) -> list[Sequence[QaPairHit]]:
+        if not self._mmr:
+            return list(hits_per_question)
+
+        # Only usable candidates compete: otherwise MMR could trade a usable
+        # but similar pair for a diverse one that min_similarity then drops.
+        hits_per_question = [
+            [hit for hit in hits if self._is_usable(hit)] for hits in hits_per_question
+        ]
+        # Hits carry no vectors; load the pool's embeddings in one call.
+        ids = {
+            hit.qa_pair.id
+            for hits in hits_per_question
+            for hit in hits
+            if hit.qa_pair.id is not None
+        }
+        embeddings = await self._qa_repo.get_embeddings(sorted(ids))
+        return [self._diversify(hits, embeddings) for hits in hits_per_question]
 
-    def _build_context(self, qa_pairs: Sequence[QaPair]) -> str:
+    def _diversify(
+        self,
+        hits: Sequence[QaPairHit],
+        embeddings: Mapping[int, Embedding],
+    ) -> list[QaPairHit]:
+        vectors = [
+            embeddings.get(hit.qa_pair.id) if hit.qa_pair.id is not None else None
+            for hit in hits
+        ]
+        dim = next((len(vec) for vec in vectors if vec is not None), 0)
+        if len(hits) <= 1 or not dim:
+            return list(hits[: self._top_k])
+
+        matrix = np.zeros((len(hits), dim), dtype=np.float32)
+        for row, vec in enumerate(vectors):
+            if vec is not None:
+                matrix[row] = vec
+        relevance = np.asarray([hit.similarity for hit in hits], dtype=np.float32)
+
+        selected = mmr_select(
+            relevance,
+            matrix,
+            self._top_k,
+            lambda_=self._mmr_lambda,
+            duplicate_similarity=self._mmr_duplicate_similarity,
+        )
+        logger.info(
+            "RAG MMR selected {} of {} candidates: {}",
+            len(selected),
+            len(hits),
+            [hits[idx].qa_pair.id for idx in selected],
+        )
+        return [replace(hits[idx], rank=rank) for rank, idx in enumerate(selected)]
+
+    def _fit_context(
+        self, qa_pairs: Sequence[QaPairProjection]
+    ) -> tuple[list[QaPairProjection], ContextBudgetUsage]:
+        return fit_context(
+            qa_pairs,
+            budget_tokens=self._context_token_budget,
+            estimator=self._token_estimator,
+            min_answer_tokens=self._context_min_answer_tokens,
+        )
+
+    def _build_context(self, qa_pairs: Sequence[QaPairProjection]) -> str:
         parts: list[str] = []
         for idx, qa in enumerate(qa_pairs, start=1):
             part = f"- Q{idx}: {qa.question}\n" f"  A{idx}: {qa.answer}"
             parts.append(part)
         return "\n\n".join(parts)
 
+    def _extra_params(self, retrieval: RagRetrieval) -> dict[str, Any]:
+        params: dict[str, Any] = {
+            "system_prompt_name": self._system_prompt_name,
+            "qa_prompt_name": self._qa_prompt_name,
+            "embedding_model_name": EMBEDDING_MODEL_NAME,
+        }
+        if self._lexical is not None:
+            params["hybrid_search"] = {
+                "lexical_top_k": self._lexical_top_k,
+                "rrf_k": self._rrf_k,
+            }
+        if self._topic_router is not None:
+            params["topics"] = list(retrieval.topics)
+        if self._mmr:
+            params["mmr"] = {
+                "lambda": self._mmr_lambda,
+                "candidates": self._fetch_k,
+                "duplicate_similarity": self._mmr_duplicate_similarity,
+            }
+        return params
+
+    def _context_key(self, context_text: str) -> str:
+        # Everything besides the question that shapes the answer.
+        payload = json.dumps(
+            [
+                self._llm_model_name,
+                self._llm_temperature,
+                # Prompt text, not name: editing the file changes the answers.
+                self._system_prompt,
+                self._qa_prompt_template,
+                context_text,
+            ],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def _lookup_answer(
+        self, context_key: str, query_vec: Embedding
+    ) -> Optional[CachedAnswer]:
+        if self._answer_cache is None:
+            return None
+        try:
+            return await self._answer_cache.lookup(context_key, query_vec)
+        except Exception as exc:
+            logger.warning("Answer cache lookup failed: {}", exc)
+            return None
+
     def _build_prompt(self, question: str, context_text: str) -> str:
         return self._qa_prompt_template.replace("{{context}}", context_text).replace(
             "{{user_question}}", question
         )
 
-    async def answer(self, question: str, user_id: Optional[int] = None) -> str:
-        details = await self.answer_detailed(question, user_id=user_id)
+    async def answer(
+        self,
+        question: str,
+        user_id: Optional[int] = None,
+        on_delta: Optional[LlmDeltaHandler] = None,
+    ) -> str:
+        details = await self.answer_detailed(
+            question, user_id=user_id, on_delta=on_delta
+        )
         return details.answer_text
 
+    async def retrieve(self, question: str) -> RagRetrieval:
+        t_embed_start = time.perf_counter()
+        query_vec = await self._embeddings.embed(question)  # 1
+        t_embed_end = time.perf_counter()
+        logger.debug("Embedding generated (dimension={})", len(query_vec))
+
+        t_retrieval_start = time.perf_counter()
+        topics = self._route(query_vec)
+        vector_search = self._qa_repo.find_top_k(
+            query_vec,
+            self._fetch_k,
+            max_distance=self._max_distance,
+            topics=topics or None,
+        )  # 2
+        latency_ms_lexical: Optional[int] = None
+        if self._lexical is None:
+            retrieved_hits, latency_ms_vector = await _timed(vector_search)
+        else:
+            (vector_hits, latency_ms_vector), (
+                lexical_hits,
+                latency_ms_lexical,
+            ) = await asyncio.gather(
+                _timed(vector_search),
+                _timed(self._find_lexical(question, query_vec)),
+            )
+            retrieved_hits = self._fuse(vector_hits, lexical_hits)
+            logger.info(
+                "RAG hybrid retrieval (vector={}, lexical={}, fused={}, vector_ms={}, lexical_ms={})",
+                len(vector_hits),
+                len(lexical_hits),
+                len(retrieved_hits),
+                latency_ms_vector,
+                latency_ms_lexical,
+            )
+        if self._mmr:
+            retrieved_hits = (await self._diversify_many([retrieved_hits]))[0]
+        t_retrieval_end = time.perf_counter()
+
+        return RagRetrieval(
+            question=question,
+            query_embedding=query_vec,
+            hits=retrieved_hits,
+            latency_ms_embedding=int((t_embed_end - t_embed_start) * 1000),
+            latency_ms_retrieval=int((t_retrieval_end - t_retrieval_start) * 1000),
+            latency_ms_retrieval_vector=latency_ms_vector,
+            latency_ms_retrieval_lexical=latency_ms_lexical,
+            topics=topics,
+        )
+
+    async def retrieve_many(self, questions: Sequence[str]) -> list[RagRetrieval]:
+        """
+        Embed and retrieve a batch of questions with one embed_many call and one
+        find_top_k_many call. Each retrieval reports its amortized share of the
+        batch latencies.
+        """
+        if not questions:
+            return []
+
+        t_embed_start = time.perf_counter()
+        query_vecs = await self._embeddings.embed_many(questions)
+        t_embed_end = time.perf_counter()
+        if len(query_vecs) != len(questions):
+            raise RuntimeError("Unexpected embeddings count")
+
+        t_retrieval_start = time.perf_counter()
+        topics_per_question = [self._route(query_vec) for query_vec in query_vecs]
+        vector_search = self._find_top_k_many_routed(query_vecs, topics_per_question)
+        batch_ms_lexical: Optional[int] = None
+        hits_per_question: Sequence[Sequence[QaPairHit]]
+        if self._lexical is None:
+            hits_per_question, batch_ms_vector = await _timed(vector_search)
+        else:
+            (vector_hits, batch_ms_vector), (
+                lexical_hits,
+                batch_ms_lexical,
+            ) = await asyncio.gather(
+                _timed(vector_search),
+                _timed(self._find_lexical_many(questions, query_vecs)),
+            )
+            hits_per_question = [
+                self._fuse(vector, lexical)
+                for vector, lexical in zip(vector_hits, lexical_hits, strict=True)
+            ]
+        hits_per_question = await self._diversify_many(hits_per_question)
+        t_retrieval_end = time.perf_counter()
+
+        batch_ms_embedding = int((t_embed_end - t_embed_start) * 1000)
+        batch_ms_retrieval = int((t_retrieval_end - t_retrieval_start) * 1000)
+        logger.info(
+            "RAG batch retrieval done (questions={}, embedding_ms={}, retrieval_ms={}, vector_ms={}, lexical_ms={})",
+            len(questions),
+            batch_ms_embedding,
+            batch_ms_retrieval,
+            batch_ms_vector,
+            batch_ms_lexical,
+        )
+        latency_ms_embedding = round(batch_ms_embedding / len(questions))
+        latency_ms_retrieval = round(batch_ms_retrieval / len(questions))
+        latency_ms_vector = round(batch_ms_vector / len(questions))
+        latency_ms_lexical = (
+            round(batch_ms_lexical / len(questions))
+            if batch_ms_lexical is not None
+            else None
+        )
+        return [
+            RagRetrieval(
+                question=question,
+                query_embedding=query_vec,
+                hits=hits,
+                latency_ms_embedding=latency_ms_embedding,
+                latency_ms_retrieval=latency_ms_retrieval,
+                latency_ms_retrieval_vector=latency_ms_vector,
+                latency_ms_retrieval_lexical=latency_ms_lexical,
+                topics=topics,
+            )
+            for question, query_vec, hits, topics in zip(
+                questions,
+                query_vecs,
+                hits_per_question,
+                topics_per_question,
+                strict=True,
+            )
+        ]
+
+    async def answer_many_detailed(
+        self,
+        questions: Sequence[str],
+        user_id: Optional[int] = None,
+        concurrency: int = 4,
+    ) -> list[RagAnswerDetails]:
+        retrievals = await self.retrieve_many(questions)
+        sem = asyncio.Semaphore(max(1, int(concurrency)))
+
+        async def _answer(retrieval: RagRetrieval) -> RagAnswerDetails:
+            async with sem:
+                return await self.answer_detailed(
+                    retrieval.question, user_id=user_id, retrieval=retrieval
+                )
+
+        return list(await asyncio.gather(*(_answer(r) for r in retrievals)))
+
     async def answer_detailed(
-        self, question: str, user_id: Optional[int] = None
+        self,
+        question: str,
+        user_id: Optional[int] = None,
+        retrieval: Optional[RagRetrieval] = None,
+        on_delta: Optional[LlmDeltaHandler] = None,
     ) -> RagAnswerDetails:
+        """
+        With `on_delta` the answer is streamed into it as it is generated and
+        the time to the first fragment is recorded.
+        """
         t_total_start = time.perf_counter()
         logger.info(
             "RAG pipeline started (question_len={}, top_k={}, min_similarity={}, question={})",
@@ -86,21 +526,14 @@ class RagService:
             question,
         )
 
-        t_embed_start = time.perf_counter()
-        query_vec = await self._embeddings.embed(question)  # 1
-        t_embed_end = time.perf_counter()
-        logger.debug("Embedding generated (dimension={})", len(query_vec))
-
-        t_retrieval_start = time.perf_counter()
-        retrieved_hits = await self._qa_repo.find_top_k(
-            query_vec,
-            self._top_k,
-        )  # 2
-        t_retrieval_end = time.perf_counter()
+        # A precomputed (batched) retrieval is not part of this call's wall
+        # time, so its latencies are added to the total explicitly below.
+        precomputed = retrieval is not None
+        if retrieval is None:
+            retrieval = await self.retrieve(question)
+        retrieved_hits = retrieval.hits
 
-        used_hits = [
-            hit for hit in retrieved_hits if hit.similarity >= self._min_similarity
-        ]
+        used_hits = [hit for hit in retrieved_hits if self._is_usable(hit)]
         logger.info("RAG min_similarity configured: {}", self._min_similarity)
         logger.info(
             "RAG hits used in context (used/total={} / {}): {}",
@@ -109,19 +542,64 @@ class RagService:
             [hit.rank for hit in used_hits],
         )
 
-        context_qas = [hit.qa_pair for hit in used_hits]
+        context_qas, budget = self._fit_context([hit.qa_pair for hit in used_hits])
+        if budget.pairs_truncated or budget.pairs_dropped:
+            logger.info(
+                "RAG context fitted into {} tokens (used={}, truncated={}, dropped={})",
+                budget.budget_tokens,
+                budget.used_tokens,
+                budget.pairs_truncated,
+                budget.pairs_dropped,
+            )
+        context_ids = {qa.id for qa in context_qas}
         context_text = self._build_context(context_qas)
         logger.info("RAG prompt context built:\n{}", context_text)
 
         prompt = self._build_prompt(question, context_text)  # 3
         logger.info("RAG final prompt:\n{}", prompt)
 
+        context_key: Optional[str] = None
+        cached: Optional[CachedAnswer] = None
+        if self._answer_cache is not None:
+            context_key = self._context_key(context_text)
+            cached = await self._lookup_answer(context_key, retrieval.query_embedding)
+
         t_llm_start = time.perf_counter()
-        generation = await self._llm.generate(prompt)  # 4
+        t_first_token: Optional[float] = None
+
+        async def _on_delta(delta: str) -> None:
+            nonlocal t_first_token
+            if t_first_token is None:
+                t_first_token = time.perf_counter()
+            if on_delta is not None:
+                await on_delta(delta)
+
+        if cached is not None:
+            logger.info(
+                "RAG answer served from cache (rag_run_id={}, similarity={:.4f})",
+                cached.rag_run_id,
+                cached.similarity,
+            )
+            generation = LlmGeneration(
+                text=cached.answer_text,
+                model=cached.model_name,
+                usage=LlmUsage(prompt_tokens=0, completion_tokens=0, total_tokens=0),
+            )
+            if on_delta is not None:
+                await _on_delta(cached.answer_text)
+        elif on_delta is None:
+            generation = await self._llm.generate(prompt)  # 4
+        else:
+            generation = await self._llm.generate_stream(prompt, _on_delta)  # 4
         t_llm_end = time.perf_counter()
+        latency_ms_llm_first_token = (
+            int((t_first_token - t_llm_start) * 1000)
+            if t_first_token is not None
+            else None
+        )
 
         answer = generation.text
-        model_name = generation.model or (OPENROUTER_MODEL_NAME or "")
+        model_name = generation.model or self._llm_model_name
         cost_usd = estimate_llm_cost_usd(
             model_name=model_name,
             prompt_tokens=generation.usage.prompt_tokens if generation.usage else None,
@@ -133,11 +611,36 @@ class RagService:
 
         t_total_end = time.perf_counter()
         latency_ms_total = int((t_total_end - t_total_start) * 1000)
-        latency_ms_retrieval = int((t_retrieval_end - t_retrieval_start) * 1000)
+        latency_ms_retrieval = retrieval.latency_ms_retrieval
         latency_ms_llm = int((t_llm_end - t_llm_start) * 1000)
-        latency_ms_embedding = int((t_embed_end - t_embed_start) * 1000)
+        latency_ms_embedding = retrieval.latency_ms_embedding
+        if precomputed:
+            latency_ms_total += latency_ms_embedding + latency_ms_retrieval
 
         if self._run_repo is not None:
+            extra_params = self._extra_params(retrieval)
+            if self._answer_cache is not None:
+                extra_params["answer_cache"] = {
+                    "hit": cached is not None,
+                    "similarity": cached.similarity if cached else None,
+                }
+            if generation.cached:
+                extra_params["llm_cache_hit"] = True
+            if budget.budget_tokens is not None:
+                extra_params["context_budget"] = {
+                    "pairs_used": budget.pairs_used,
+                    "pairs_truncated": budget.pairs_truncated,
+                    "pairs_dropped": budget.pairs_dropped,
+                }
+            if generation.call is not None:
+                extra_params["llm"] = {
+                    "model": generation.call.model,
+                    "attempts": generation.call.attempts,
+                    "hedged": generation.call.hedged,
+                    "queue_wait_ms": generation.call.queue_wait_ms,
+                }
+            # Only fresh answers become cache entries; hits point at their source.
+            is_entry = context_key is not None and cached is None
             run = RagRun(
                 id=None,
                 created_at=None,
@@ -149,12 +652,8 @@ class RagService:
                 context_text=context_text,
                 final_prompt_text=prompt,
                 model_name=model_name,
-                temperature=OPENROUTER_TEMPERATURE,
-                extra_params={
-                    "system_prompt_name": SYSTEM_PROMPT_NAME,
-                    "qa_prompt_name": self._qa_prompt_name,
-                    "embedding_model_name": EMBEDDING_MODEL_NAME,
-                },
+                temperature=self._llm_temperature,
+                extra_params=extra_params,
                 answer_text=answer,
                 usage_prompt_tokens=(
                     generation.usage.prompt_tokens if generation.usage else None
@@ -170,6 +669,14 @@ class RagService:
                 latency_ms_retrieval=latency_ms_retrieval,
                 latency_ms_llm=latency_ms_llm,
                 latency_ms_embedding=latency_ms_embedding,
+                latency_ms_retrieval_vector=retrieval.latency_ms_retrieval_vector,
+                latency_ms_retrieval_lexical=retrieval.latency_ms_retrieval_lexical,
+                latency_ms_llm_first_token=latency_ms_llm_first_token,
+                context_tokens=budget.used_tokens,
+                context_token_budget=budget.budget_tokens,
+                question_embedding=retrieval.query_embedding if is_entry else None,
+                context_key=context_key if is_entry else None,
+                answer_cache_source_id=cached.rag_run_id if cached else None,
             )
 
             run_hits: list[RagRunHit] = [
@@ -179,12 +686,14 @@ class RagService:
                     qa_pair_id=hit.qa_pair.id,
                     distance=hit.distance,
                     similarity=hit.similarity,
-                    used_in_context=(hit.similarity >= self._min_similarity),
+                    used_in_context=self._is_usable(hit)
+                    and hit.qa_pair.id in context_ids,
                 )
                 for hit in retrieved_hits
             ]
 
-            run_id = await self._run_repo.add_run(run, run_hits)
+            async with self._run_repo_lock:
+                run_id = await self._run_repo.add_run(run, run_hits)
             logger.info("RAG run persisted (rag_run_id={})", run_id)
         # lang + chain
         # _embeddings.embed | _qa_repo.find_top_k(query_vec, k=self._top_k) | _build_prompt(question, context_qas) | _llm.generate(prompt)
@@ -228,4 +737,8 @@ class RagService:
             latency_ms_retrieval=latency_ms_retrieval,
             latency_ms_llm=latency_ms_llm,
             latency_ms_embedding=latency_ms_embedding,
+            latency_ms_retrieval_vector=retrieval.latency_ms_retrieval_vector,
+            latency_ms_retrieval_lexical=retrieval.latency_ms_retrieval_lexical,
+            latency_ms_llm_first_token=latency_ms_llm_first_token,
+            llm_cached=generation.cached,
         )
@@ -0,0 +1,10 @@
+from typing import Optional, Protocol
+
+from app.domain.models.embedding import Embedding
+from app.domain.models.rag_run import CachedAnswer
+
+
+class AnswerCache(Protocol):
+    async def lookup(
+        self, context_key: str, query_embedding: Embedding
+    ) -> Optional[CachedAnswer]: ...
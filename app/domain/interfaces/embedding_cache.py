@@ -0,0 +1,13 @@
+from typing import Mapping, Protocol, Sequence
+
+from app.domain.models.embedding import Embedding
+
+
+class EmbeddingCache(Protocol):
+    async def get_many(
+        self, model_name: str, keys: Sequence[str]
+    ) -> Mapping[str, Embedding]: ...
+
+    async def put_many(
+        self, model_name: str, embeddings: Mapping[str, Embedding]
+    ) -> None: ...
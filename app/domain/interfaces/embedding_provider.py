@@ -1,7 +1,11 @@
 from typing import Protocol, Sequence
 
+from app.domain.models.embedding import Embedding
+
 
 class EmbeddingProvider(Protocol):
-    async def embed(self, text: str) -> Sequence[float]: ...
+    async def embed(self, text: str) -> Embedding: ...
+
+    async def embed_many(self, texts: Sequence[str]) -> Sequence[Embedding]: ...
 
-    async def embed_many(self, texts: Sequence[str]) -> Sequence[Sequence[float]]: ...
+    async def close(self) -> None: ...
@@ -1,7 +1,18 @@
-from typing import Protocol
+from typing import Awaitable, Callable, Protocol
 
 from app.domain.models.llm_generation import LlmGeneration
 
+# Receives each text fragment of a streamed answer as it arrives.
+LlmDeltaHandler = Callable[[str], Awaitable[None]]
+
 
 class LlmClient(Protocol):
     async def generate(self, prompt: str) -> LlmGeneration: ...
+
+    async def generate_stream(
+        self, prompt: str, on_delta: LlmDeltaHandler
+    ) -> LlmGeneration:
+        """Stream the answer into `on_delta`, then return the whole generation."""
+        ...
+
+    async def close(self) -> None: ...
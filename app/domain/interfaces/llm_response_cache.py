@@ -0,0 +1,11 @@
+from typing import Optional, Protocol
+
+from app.domain.models.llm_generation import LlmGeneration
+
+
+class LlmResponseCache(Protocol):
+    async def get(self, key: str) -> Optional[LlmGeneration]: ...
+
+    async def put(
+        self, key: str, model_name: str, generation: LlmGeneration
+    ) -> None: ...
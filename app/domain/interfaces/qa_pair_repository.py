@@ -1,4 +1,5 @@
-from typing import Protocol, Sequence
+from typing import Mapping, Optional, Protocol, Sequence
+from app.domain.models.embedding import Embedding
 from app.domain.models.qa_pair import QaPair, QaPairHit
 
 
@@ -9,8 +10,46 @@ class QaPairRepository(Protocol):
 
     async def list_all(self) -> Sequence[QaPair]: ...
 
+    async def get_embeddings(self, ids: Sequence[int]) -> Mapping[int, Embedding]: ...
+
     async def find_top_k(
         self,
-        query_embedding: Sequence[float],
+        query_embedding: Embedding,
+        k: int,
+        max_distance: Optional[float] = None,
+        topics: Optional[Sequence[str]] = None,
+    ) -> Sequence[QaPairHit]:
+        """
+        Nearest QA pairs by cosine distance. With `topics`, only pairs of those
+        topics are searched.
+        """
+        ...
+
+    async def find_top_k_many(
+        self,
+        query_embeddings: Sequence[Embedding],
+        k: int,
+        max_distance: Optional[float] = None,
+        topics: Optional[Sequence[str]] = None,
+    ) -> Sequence[Sequence[QaPairHit]]: ...
+
+
+class LexicalQaPairRetriever(Protocol):
+    async def find_top_k_lexical(
+        self,
+        query_text: str,
+        query_embedding: Embedding,
+        k: int,
+    ) -> Sequence[QaPairHit]:
+        """
+        Full-text matches for `query_text`, best first. `query_embedding` is
+        only used to fill in the cosine distance of each hit.
+        """
+        ...
+
+    async def find_top_k_lexical_many(
+        self,
+        query_texts: Sequence[str],
+        query_embeddings: Sequence[Embedding],
         k: int,
-    ) -> Sequence[QaPairHit]: ...
+    ) -> Sequence[Sequence[QaPairHit]]: ...
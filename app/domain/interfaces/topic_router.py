@@ -0,0 +1,11 @@
+from typing import Protocol, Sequence
+
+from app.domain.models.embedding import Embedding
+
+
+class TopicRouter(Protocol):
+    def route(self, query_embedding: Embedding) -> Sequence[str]:
+        """
+        Candidate topics for the query, best first. Empty means "search all".
+        """
+        ...
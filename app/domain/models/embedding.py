@@ -0,0 +1,56 @@
+from typing import Optional, Sequence, TypeAlias, Union
+
+import numpy as np
+import numpy.typing as npt
+
+# One embedding: a 1-D float32 array. Batches are (n, dim) float32 matrices
+# or sequences of such rows.
+Embedding: TypeAlias = npt.NDArray[np.float32]
+
+
+def as_embedding(values: Union[Embedding, Sequence[float]]) -> Embedding:
+    """1-D float32 array of `values`; no copy if it already is one."""
+    return np.asarray(values, dtype=np.float32).reshape(-1)
+
+
+def as_embedding_matrix(
+    values: Union[
+        npt.NDArray[np.float32], Sequence[Embedding], Sequence[Sequence[float]]
+    ],
+) -> npt.NDArray[np.float32]:
+    """(n, dim) float32 matrix of a batch of embeddings."""
+    return np.asarray(values, dtype=np.float32)
+
+
+def l2_normalize_rows(matrix: npt.NDArray[np.float32]) -> npt.NDArray[np.float32]:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(matrix / norms, dtype=np.float32)
+
+
+def l2_normalize(embedding: Embedding) -> Embedding:
+    norm = float(np.linalg.norm(embedding))
+    return embedding / np.float32(norm) if norm else embedding
+
+
+def cosine_similarity(a: Embedding, b: Embedding) -> float:
+    norm = float(np.linalg.norm(a) * np.linalg.norm(b))
+    return float(np.dot(a, b)) / norm if norm else 0.0
+
+
+class EmbeddingModelMismatchError(ValueError):
+    """Stored vectors were produced by a different model than the live one."""
+
+
+def ensure_embedding_model(
+    source: str, found: Optional[str], expected: Optional[str]
+) -> None:
+    """
+    Raise when `source` (a snapshot, centroids file, ...) was built with a
+    model other than `expected`. Without an expected model nothing is checked;
+    a source that does not record its model is rejected, as it cannot be trusted.
+    """
+    if expected and found != expected:
+        raise EmbeddingModelMismatchError(
+            f"{source} was built with embedding model {found}, active model is {expected}"
+        )
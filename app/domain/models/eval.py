@@ -45,3 +45,5 @@ class EvalResult:
     tokens_total: Optional[int]
     judge_cost_usd: Optional[float]
     judge_tokens_total: Optional[int]
+    answer_cached: bool = False
+    judge_cached: bool = False
@@ -9,8 +9,22 @@ class LlmUsage:
     total_tokens: Optional[int]
 
 
+@dataclass(frozen=True)
+class LlmCallStats:
+    # Model that produced the answer (the requested one or a fallback).
+    model: str
+    attempts: int
+    # Won by a duplicate request sent after the hedging delay.
+    hedged: bool = False
+    # Time spent waiting for the shared rate limiter before the request.
+    queue_wait_ms: Optional[int] = None
+
+
 @dataclass(frozen=True)
 class LlmGeneration:
     text: str
     model: Optional[str]
     usage: Optional[LlmUsage]
+    # Served from the response cache; usage is that of the original call.
+    cached: bool = False
+    call: Optional[LlmCallStats] = None
@@ -1,6 +1,8 @@
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, Sequence
+from typing import Optional
+
+from app.domain.models.embedding import Embedding
 
 
 @dataclass
@@ -11,13 +13,51 @@ class QaPair:
     source_url: Optional[str]
     topic: str
     is_generated: bool
-    embedding: Sequence[float]
+    embedding: Embedding
     created_at: Optional[datetime] = None
+    # Canonical pair this one was flagged as a near-duplicate of; such pairs
+    # are kept in the table but excluded from retrieval.
+    duplicate_of: Optional[int] = None
+    # Embedding model that produced `embedding`, when known.
+    embedding_model: Optional[str] = None
+    # Question + answer tokens, precomputed at seed time for context budgeting.
+    token_count: Optional[int] = None
+
+    def to_projection(self) -> "QaPairProjection":
+        return QaPairProjection(
+            id=self.id,
+            question=self.question,
+            answer=self.answer,
+            topic=self.topic,
+            source_url=self.source_url,
+            is_generated=self.is_generated,
+            token_count=self.token_count,
+        )
+
+
+@dataclass(frozen=True)
+class QaPairProjection:
+    """
+    QA pair as returned by retrieval: everything but the embedding, which can
+    be loaded on demand via QaPairRepository.get_embeddings.
+    """
+
+    id: Optional[int]
+    question: str
+    answer: str
+    topic: str
+    source_url: Optional[str]
+    is_generated: bool
+    token_count: Optional[int] = None
 
 
 @dataclass
 class QaPairHit:
-    qa_pair: QaPair
+    qa_pair: QaPairProjection
     rank: int
     distance: float
     similarity: float
+    # Set for hits matched by full-text search (rank within the lexical list).
+    lexical_rank: Optional[int] = None
+    # Reciprocal rank fusion score when the hit comes from hybrid retrieval.
+    fusion_score: Optional[float] = None
@@ -3,6 +3,8 @@ from datetime import datetime
 from typing import Any, Optional
 from uuid import UUID
 
+from app.domain.models.embedding import Embedding
+
 
 @dataclass
 class RagRun:
@@ -27,6 +29,26 @@ class RagRun:
     latency_ms_retrieval: Optional[int]
     latency_ms_llm: Optional[int]
     latency_ms_embedding: Optional[int]
+    latency_ms_retrieval_vector: Optional[int] = None
+    latency_ms_retrieval_lexical: Optional[int] = None
+    # Time to the first streamed answer fragment; None for non-streamed runs.
+    latency_ms_llm_first_token: Optional[int] = None
+    # Estimated context tokens and the budget they were fitted into.
+    context_tokens: Optional[int] = None
+    context_token_budget: Optional[int] = None
+    # Answer cache entry: set only for runs that can serve later questions.
+    question_embedding: Optional[Embedding] = None
+    context_key: Optional[str] = None
+    # Run whose stored answer was returned instead of calling the LLM.
+    answer_cache_source_id: Optional[UUID] = None
+
+
+@dataclass(frozen=True)
+class CachedAnswer:
+    rag_run_id: UUID
+    answer_text: str
+    model_name: str
+    similarity: float
 
 
 @dataclass
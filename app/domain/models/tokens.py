@@ -0,0 +1,41 @@
+import re
+from typing import Callable
+
+# Offline token estimate for a text; exact counts come back in LLM usage.
+TokenEstimator = Callable[[str], int]
+
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), good enough for budgeting."""
+    return max(1, len(text) // 4) if text else 0
+
+
+def estimate_tokens_pieces(text: str) -> int:
+    """
+    Words and punctuation marks counted separately: a word is about one token
+    per 4 characters (at least one), a punctuation mark is one token. Closer
+    than `estimate_tokens` for short words, numbers and lists.
+    """
+    return sum(max(1, (len(piece) + 3) // 4) for piece in _PIECE_RE.findall(text))
+
+
+TOKEN_ESTIMATORS: dict[str, TokenEstimator] = {
+    "chars": estimate_tokens,
+    "pieces": estimate_tokens_pieces,
+}
+
+
+def get_token_estimator(name: str) -> TokenEstimator:
+    try:
+        return TOKEN_ESTIMATORS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown token estimator: {name} (expected one of {sorted(TOKEN_ESTIMATORS)})"
+        ) from None
+
+
+def count_qa_pair_tokens(question: str, answer: str, estimator: TokenEstimator) -> int:
+    """Tokens of a pair's question and answer (without context formatting)."""
+    return estimator(question) + estimator(answer)
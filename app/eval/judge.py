@@ -6,8 +6,8 @@ from typing import Optional
 
 from loguru import logger
 
+from app.domain.interfaces.llm_client import LlmClient
 from app.domain.models.llm_generation import LlmGeneration
-from app.infrastructure.llm.openrouter_llm_client import OpenRouterLlmClient
 from app.prompts.loader import load_prompt
 
 
@@ -21,7 +21,7 @@ class JudgeResult:
 
 class LlmJudge:
 
-    def __init__(self, llm_client: OpenRouterLlmClient, prompt_name: str) -> None:
+    def __init__(self, llm_client: LlmClient, prompt_name: str) -> None:
         self._llm = llm_client
         self._template = load_prompt(prompt_name)
 
@@ -9,32 +9,60 @@ from typing import Optional, Sequence
 from uuid import UUID
 
 from loguru import logger
-
-from app.application.rag_service import RagAnswerDetails, RagService
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.application.rag_service import RagAnswerDetails, RagRetrieval, RagService
+from app.domain.interfaces.embedding_provider import EmbeddingProvider
+from app.domain.interfaces.llm_client import LlmClient
+from app.domain.interfaces.qa_pair_repository import QaPairRepository
+from app.domain.interfaces.topic_router import TopicRouter
+from app.domain.models.embedding import cosine_similarity
 from app.domain.models.eval import EvalCase, EvalResult, EvalRun
 from app.eval.judge import LlmJudge
 from app.eval.metrics import rouge_1_f1, rouge_l_f1
 from app.pricing.pricing import estimate_llm_cost_usd
 from app.infrastructure.config import (
+    EMBEDDING_BACKEND,
     EMBEDDING_BASE_URL,
     EMBEDDING_TIMEOUT,
     EMBEDDING_MODEL_NAME,
+    EVAL_LLM_CACHE,
+    LLM_BACKEND,
     OPENROUTER_BASE_URL,
     OPENROUTER_TIMEOUT,
     OPENROUTER_TEMPERATURE,
     OPENROUTER_MODEL_NAME,
+    RAG_HYBRID_SEARCH,
+    RAG_MATRYOSHKA,
+    RAG_CONTEXT_TOKEN_BUDGET,
     RAG_MIN_SIMILARITY,
+    RAG_MMR,
     RAG_QA_PROMPT_NAME,
+    RAG_RETRIEVER_BACKEND,
+    RAG_SHORT_EMBEDDING_DIM,
+    RAG_TOKEN_ESTIMATOR,
     RAG_TOP_K,
+    RAG_TOPIC_ROUTING,
     SYSTEM_PROMPT_NAME,
 )
 from app.infrastructure.db.base import SessionLocal
-from app.infrastructure.db.crud import SqlAlchemyQaPairRepository
+from app.infrastructure.db.crud import (
+    SqlAlchemyLexicalQaPairRetriever,
+    SqlAlchemyQaPairRepository,
+)
 from app.infrastructure.db.eval_repository import SqlAlchemyEvalRepository
-from app.infrastructure.llm.openrouter_embedding_provider import (
-    OpenRouterEmbeddingProvider,
+from app.infrastructure.db.models import QA_PAIRS_SHORT_EMBEDDING_DIM
+from app.infrastructure.llm.factory import (
+    create_embedding_provider,
+    create_llm_client,
+)
+from app.infrastructure.llm.http_pool import close_http_pool
+from app.infrastructure.llm.rate_limiter import log_rate_limiter_stats
+from app.infrastructure.vector.loader import (
+    RETRIEVER_BACKEND_POSTGRES,
+    load_in_memory_qa_repository,
+    load_topic_router,
 )
-from app.infrastructure.llm.openrouter_llm_client import OpenRouterLlmClient
 
 
 @dataclass(frozen=True)
@@ -46,6 +74,16 @@ class EvalPipelineConfig:
     rag_top_k: int = RAG_TOP_K
     rag_min_similarity: float = RAG_MIN_SIMILARITY
     rag_qa_prompt_name: str = RAG_QA_PROMPT_NAME
+    rag_retriever_backend: str = RAG_RETRIEVER_BACKEND
+    rag_hybrid_search: bool = RAG_HYBRID_SEARCH
+    rag_topic_routing: bool = RAG_TOPIC_ROUTING
+    rag_mmr: bool = RAG_MMR
+    rag_context_token_budget: int = RAG_CONTEXT_TOKEN_BUDGET
+
+    embedding_backend: str = EMBEDDING_BACKEND
+    llm_backend: str = LLM_BACKEND
+    # Reuse stored answers and judge verdicts for identical requests.
+    llm_cache: bool = EVAL_LLM_CACHE
 
     answer_model_name: str = OPENROUTER_MODEL_NAME or ""
     answer_temperature: float = OPENROUTER_TEMPERATURE
@@ -66,6 +104,7 @@ class EvalPipelineConfig:
 
     concurrency: int = 3
     limit_cases: Optional[int] = None
+    retrieval_batch_size: int = 128
 
 
 class EvalPipeline:
@@ -124,6 +163,12 @@ class EvalPipeline:
                 f"Load it first from CSV."
             )
 
+        async with self._session_factory() as session:
+            embedding_model = (
+                await SqlAlchemyQaPairRepository(session).active_embedding_model()
+                or EMBEDDING_MODEL_NAME
+            )
+
         run_id = uuid.uuid4()
         await self._create_run(
             config=config,
@@ -136,9 +181,28 @@ class EvalPipeline:
                     "top_k": config.rag_top_k,
                     "min_similarity": config.rag_min_similarity,
                     "distance_metric": "cosine",
-                    "embedding_model_name": EMBEDDING_MODEL_NAME,
+                    "embedding_model_name": embedding_model,
+                    "embedding_backend": config.embedding_backend,
+                    "retriever_backend": config.rag_retriever_backend,
+                    "hybrid_search": config.rag_hybrid_search,
+                    "topic_routing": config.rag_topic_routing,
+                    "mmr": config.rag_mmr,
+                    "context_token_budget": config.rag_context_token_budget,
+                    "token_estimator": RAG_TOKEN_ESTIMATOR,
+                    "matryoshka_dim": (
+                        (
+                            QA_PAIRS_SHORT_EMBEDDING_DIM
+                            if config.rag_retriever_backend
+                            == RETRIEVER_BACKEND_POSTGRES
+                            else RAG_SHORT_EMBEDDING_DIM
+                        )
+                        if RAG_MATRYOSHKA
+                        else None
+                    ),
                 },
                 llm_config_json={
+                    "llm_backend": config.llm_backend,
+                    "llm_cache": config.llm_cache,
                     "answer_model_name": config.answer_model_name,
                     "answer_temperature": config.answer_temperature,
                     "answer_system_prompt_name": config.answer_system_prompt_name,
@@ -152,34 +216,61 @@ class EvalPipeline:
             ),
         )
 
-        answer_embedder = OpenRouterEmbeddingProvider()
-        answer_llm = OpenRouterLlmClient(
+        shared_qa_repo = await load_in_memory_qa_repository(
+            config.rag_retriever_backend, embedding_model=embedding_model
+        )
+        topic_router = await load_topic_router(
+            shared_qa_repo,
+            enabled=config.rag_topic_routing,
+            embedding_model=embedding_model,
+        )
+        answer_embedder = create_embedding_provider(
+            model_name=embedding_model, backend=config.embedding_backend
+        )
+        answer_llm = create_llm_client(
             model_name=config.answer_model_name,
             temperature=config.answer_temperature,
             system_prompt_name=config.answer_system_prompt_name,
             base_url=config.answer_base_url,
             timeout=config.answer_timeout,
+            backend=config.llm_backend,
+            cache=config.llm_cache,
+            # Scores must come from the configured models only.
+            fallback_models=(),
         )
 
-        judge_llm = OpenRouterLlmClient(
+        judge_llm = create_llm_client(
             model_name=config.judge_model_name,
             temperature=config.judge_temperature,
             system_prompt_name=config.judge_system_prompt_name,
             base_url=config.judge_base_url,
             timeout=config.judge_timeout,
+            backend=config.llm_backend,
+            cache=config.llm_cache,
+            fallback_models=(),
         )
         judge = LlmJudge(judge_llm, prompt_name=config.judge_prompt_name)
 
         metrics_embedder = (
-            OpenRouterEmbeddingProvider(
+            create_embedding_provider(
                 model_name=config.metrics_embedding_model_name,
                 base_url=config.metrics_embedding_base_url,
                 timeout=config.metrics_embedding_timeout,
+                backend=config.embedding_backend,
             )
             if config.metrics_embedding_model_name
             else None
         )
 
+        retrievals = await self._retrieve_cases(
+            cases=cases,
+            config=config,
+            shared_qa_repo=shared_qa_repo,
+            topic_router=topic_router,
+            answer_embedder=answer_embedder,
+            answer_llm=answer_llm,
+        )
+
         sem = asyncio.Semaphore(max(1, int(config.concurrency)))
         tasks = [
             asyncio.create_task(
@@ -188,6 +279,9 @@ class EvalPipeline:
                     run_id=run_id,
                     case=case,
                     config=config,
+                    shared_qa_repo=shared_qa_repo,
+                    topic_router=topic_router,
+                    retrieval=retrievals.get(case.case_id),
                     answer_embedder=answer_embedder,
                     answer_llm=answer_llm,
                     judge=judge,
@@ -204,6 +298,8 @@ class EvalPipeline:
         await judge_llm.close()
         if metrics_embedder is not None:
             await metrics_embedder.close()
+        log_rate_limiter_stats()
+        await close_http_pool()
 
         return run_id
 
@@ -234,6 +330,96 @@ class EvalPipeline:
                 config.concurrency,
             )
 
+    def _build_rag_service(
+        self,
+        *,
+        session: AsyncSession,
+        config: EvalPipelineConfig,
+        shared_qa_repo: Optional[QaPairRepository],
+        topic_router: Optional[TopicRouter],
+        answer_embedder: EmbeddingProvider,
+        answer_llm: LlmClient,
+    ) -> RagService:
+        qa_repo = (
+            shared_qa_repo
+            if shared_qa_repo is not None
+            else SqlAlchemyQaPairRepository(session)
+        )
+        return RagService(
+            qa_repo=qa_repo,
+            embedding_provider=answer_embedder,
+            llm_client=answer_llm,
+            run_repo=None,
+            top_k=config.rag_top_k,
+            qa_prompt_name=config.rag_qa_prompt_name,
+            min_similarity=config.rag_min_similarity,
+            lexical_retriever=(
+                SqlAlchemyLexicalQaPairRetriever(self._session_factory)
+                if config.rag_hybrid_search
+                else None
+            ),
+            topic_router=topic_router,
+            mmr=config.rag_mmr,
+            context_token_budget=config.rag_context_token_budget,
+            llm_model_name=config.answer_model_name,
+            llm_temperature=config.answer_temperature,
+            system_prompt_name=config.answer_system_prompt_name,
+        )
+
+    async def _retrieve_cases(
+        self,
+        *,
+        cases: Sequence[EvalCase],
+        config: EvalPipelineConfig,
+        shared_qa_repo: Optional[QaPairRepository],
+        topic_router: Optional[TopicRouter],
+        answer_embedder: EmbeddingProvider,
+        answer_llm: LlmClient,
+    ) -> dict[int, RagRetrieval]:
+        """
+        Batched embedding + retrieval for all cases. A failed batch is logged
+        and its cases fall back to per-case retrieval in `_answer_case`.
+        """
+        retrievals: dict[int, RagRetrieval] = {}
+        batch_size = max(1, int(config.retrieval_batch_size))
+
+        async with self._session_factory() as session:
+            rag = self._build_rag_service(
+                session=session,
+                config=config,
+                shared_qa_repo=shared_qa_repo,
+                topic_router=topic_router,
+                answer_embedder=answer_embedder,
+                answer_llm=answer_llm,
+            )
+            for start in range(0, len(cases), batch_size):
+                batch = list(cases[start : start + batch_size])
+                try:
+                    batch_retrievals = await rag.retrieve_many(
+                        [case.question_text for case in batch]
+                    )
+                except Exception as exc:
+                    logger.exception(
+                        "Batched retrieval failed (cases={}..{}): {}",
+                        batch[0].case_id,
+                        batch[-1].case_id,
+                        exc,
+                    )
+                    await session.rollback()
+                    continue
+                for case, retrieval in zip(batch, batch_retrievals, strict=True):
+                    retrievals[case.case_id] = retrieval
+                # End the read transaction so SET LOCAL does not leak across batches.
+                await session.commit()
+
+        logger.info(
+            "Eval retrieval prefetched (cases={}, retrieved={}, batch_size={})",
+            len(cases),
+            len(retrievals),
+            batch_size,
+        )
+        return retrievals
+
     async def _process_case(
         self,
         *,
@@ -241,10 +427,13 @@ class EvalPipeline:
         run_id: UUID,
         case: EvalCase,
         config: EvalPipelineConfig,
-        answer_embedder: OpenRouterEmbeddingProvider,
-        answer_llm: OpenRouterLlmClient,
+        shared_qa_repo: Optional[QaPairRepository],
+        topic_router: Optional[TopicRouter],
+        retrieval: Optional[RagRetrieval],
+        answer_embedder: EmbeddingProvider,
+        answer_llm: LlmClient,
         judge: LlmJudge,
-        metrics_embedder: Optional[OpenRouterEmbeddingProvider],
+        metrics_embedder: Optional[EmbeddingProvider],
     ) -> None:
         async with sem:
             answer_details: Optional[RagAnswerDetails] = None
@@ -254,6 +443,9 @@ class EvalPipeline:
                 answer_details, answer_text = await self._answer_case(
                     case=case,
                     config=config,
+                    shared_qa_repo=shared_qa_repo,
+                    topic_router=topic_router,
+                    retrieval=retrieval,
                     answer_embedder=answer_embedder,
                     answer_llm=answer_llm,
                 )
@@ -297,6 +489,7 @@ class EvalPipeline:
             judge_score: Optional[int] = None
             judge_cost_usd: Optional[float] = None
             judge_tokens_total: Optional[int] = None
+            judge_cached = False
 
             try:
                 judged = await judge.judge(
@@ -305,6 +498,7 @@ class EvalPipeline:
                     model_answer=answer_text,
                 )
                 judge_score = judged.score
+                judge_cached = judged.generation.cached
                 judge_tokens_total = (
                     judged.generation.usage.total_tokens
                     if judged.generation.usage
@@ -345,6 +539,8 @@ class EvalPipeline:
                     tokens_total=answer_tokens_total,
                     judge_cost_usd=judge_cost_usd,
                     judge_tokens_total=judge_tokens_total,
+                    answer_cached=answer_details.llm_cached,
+                    judge_cached=judge_cached,
                 )
             )
 
@@ -353,21 +549,24 @@ class EvalPipeline:
         *,
         case: EvalCase,
         config: EvalPipelineConfig,
-        answer_embedder: OpenRouterEmbeddingProvider,
-        answer_llm: OpenRouterLlmClient,
+        shared_qa_repo: Optional[QaPairRepository],
+        topic_router: Optional[TopicRouter],
+        retrieval: Optional[RagRetrieval],
+        answer_embedder: EmbeddingProvider,
+        answer_llm: LlmClient,
     ) -> tuple[RagAnswerDetails, str]:
         async with self._session_factory() as session:
-            qa_repo = SqlAlchemyQaPairRepository(session)
-            rag = RagService(
-                qa_repo=qa_repo,
-                embedding_provider=answer_embedder,
-                llm_client=answer_llm,
-                run_repo=None,
-                top_k=config.rag_top_k,
-                qa_prompt_name=config.rag_qa_prompt_name,
-                min_similarity=config.rag_min_similarity,
+            rag = self._build_rag_service(
+                session=session,
+                config=config,
+                shared_qa_repo=shared_qa_repo,
+                topic_router=topic_router,
+                answer_embedder=answer_embedder,
+                answer_llm=answer_llm,
+            )
+            details = await rag.answer_detailed(
+                case.question_text, user_id=None, retrieval=retrieval
             )
-            details = await rag.answer_detailed(case.question_text, user_id=None)
             return details, details.answer_text
 
     async def _persist_result(self, result: EvalResult) -> None:
@@ -396,13 +595,11 @@ def _read_cases_csv(csv_path: str) -> list[tuple[str, str]]:
     return cases
 
 
-async def _embedding_similarity(
-    embedder: OpenRouterEmbeddingProvider, a: str, b: str
-) -> float:
+async def _embedding_similarity(embedder: EmbeddingProvider, a: str, b: str) -> float:
     vecs = await embedder.embed_many([a, b])
     if len(vecs) != 2:
         raise RuntimeError("Unexpected embeddings count")
     va, vb = vecs[0], vecs[1]
     if len(va) != len(vb):
         raise RuntimeError("Embedding dimension mismatch")
-    return float(sum(x * y for x, y in zip(va, vb, strict=False)))
+    return cosine_similarity(va, vb)
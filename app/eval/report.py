@@ -26,11 +26,19 @@ class EvalSummary:
     bert_score_mean: Optional[float]
     rouge_1_mean: Optional[float]
     rouge_l_mean: Optional[float]
+    # Over freshly generated answers only: cached ones take near-zero time
+    # and would make runs with different hit rates incomparable.
     latency_ms_mean: Optional[float]
+    latency_ms_mean_cached: Optional[float]
     cost_usd_mean: Optional[float]
     tokens_total_mean: Optional[float]
     judge_cost_usd_mean: Optional[float]
     judge_tokens_total_mean: Optional[float]
+    # LLM response cache: answers/verdicts reused and what they would have cost.
+    llm_cache_answer_hits: int
+    llm_cache_judge_hits: int
+    llm_cache_saved_tokens: int
+    llm_cache_saved_cost_usd: float
 
 
 def summarize_run(eval_run_id: UUID, results: Sequence[EvalResult]) -> EvalSummary:
@@ -43,6 +51,9 @@ def summarize_run(eval_run_id: UUID, results: Sequence[EvalResult]) -> EvalSumma
         else None
     )
 
+    answer_hits = [r for r in results if r.answer_cached]
+    judge_hits = [r for r in results if r.judge_cached]
+
     return EvalSummary(
         eval_run_id=eval_run_id,
         cases_total=len(results),
@@ -52,11 +63,18 @@ def summarize_run(eval_run_id: UUID, results: Sequence[EvalResult]) -> EvalSumma
         bert_score_mean=_mean(r.bert_score for r in results),
         rouge_1_mean=_mean(r.rouge_1 for r in results),
         rouge_l_mean=_mean(r.rouge_l for r in results),
-        latency_ms_mean=_mean(r.latency_ms for r in results),
+        latency_ms_mean=_mean(r.latency_ms for r in results if not r.answer_cached),
+        latency_ms_mean_cached=_mean(r.latency_ms for r in answer_hits),
         cost_usd_mean=_mean(r.cost_usd for r in results),
         tokens_total_mean=_mean(r.tokens_total for r in results),
         judge_cost_usd_mean=_mean(r.judge_cost_usd for r in results),
         judge_tokens_total_mean=_mean(r.judge_tokens_total for r in results),
+        llm_cache_answer_hits=len(answer_hits),
+        llm_cache_judge_hits=len(judge_hits),
+        llm_cache_saved_tokens=sum(r.tokens_total or 0 for r in answer_hits)
+        + sum(r.judge_tokens_total or 0 for r in judge_hits),
+        llm_cache_saved_cost_usd=sum(r.cost_usd or 0.0 for r in answer_hits)
+        + sum(r.judge_cost_usd or 0.0 for r in judge_hits),
     )
 
 
@@ -81,10 +99,19 @@ def format_summary(summary: EvalSummary) -> str:
     lines.append(f"rouge_1_mean={_fmt(summary.rouge_1_mean)}")
     lines.append(f"rouge_l_mean={_fmt(summary.rouge_l_mean)}")
     lines.append(f"latency_ms_mean={_fmt(summary.latency_ms_mean)}")
+    if summary.llm_cache_answer_hits:
+        lines.append(f"latency_ms_mean_cached={_fmt(summary.latency_ms_mean_cached)}")
     lines.append(f"cost_usd_mean={_fmt(summary.cost_usd_mean)}")
     lines.append(f"tokens_total_mean={_fmt(summary.tokens_total_mean)}")
     lines.append(f"judge_cost_usd_mean={_fmt(summary.judge_cost_usd_mean)}")
     lines.append(f"judge_tokens_total_mean={_fmt(summary.judge_tokens_total_mean)}")
+    lines.append(
+        "llm_cache: "
+        f"answer_hits={summary.llm_cache_answer_hits} "
+        f"judge_hits={summary.llm_cache_judge_hits} "
+        f"saved_tokens={summary.llm_cache_saved_tokens} "
+        f"saved_cost_usd={_fmt(summary.llm_cache_saved_cost_usd)}"
+    )
 
     return "\n".join(lines)
 
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class RetrievalBenchmark:
+    label: str
+    queries: int
+    recall_at_k: Optional[float]
+    latency_ms_p50: float
+    latency_ms_p95: float
+
+
+def recall_at_k(
+    expected_ids: Sequence[int], actual_ids: Sequence[int], k: int
+) -> float:
+    expected = set(list(expected_ids)[:k])
+    if not expected:
+        return 1.0
+    actual = set(list(actual_ids)[:k])
+    return len(expected & actual) / len(expected)
+
+
+def mean_recall_at_k(
+    expected: Sequence[Sequence[int]], actual: Sequence[Sequence[int]], k: int
+) -> float:
+    if len(expected) != len(actual):
+        raise ValueError("expected and actual must have the same number of queries")
+    if not expected:
+        return 1.0
+    return float(
+        np.mean([recall_at_k(e, a, k) for e, a in zip(expected, actual, strict=True)])
+    )
+
+
+def summarize_benchmark(
+    label: str,
+    latencies_ms: Sequence[float],
+    recall: Optional[float] = None,
+) -> RetrievalBenchmark:
+    values = np.asarray(latencies_ms, dtype=np.float64)
+    return RetrievalBenchmark(
+        label=label,
+        queries=int(values.size),
+        recall_at_k=recall,
+        latency_ms_p50=float(np.percentile(values, 50)) if values.size else 0.0,
+        latency_ms_p95=float(np.percentile(values, 95)) if values.size else 0.0,
+    )
+
+
+def format_benchmark(bench: RetrievalBenchmark, k: int) -> str:
+    recall = "n/a" if bench.recall_at_k is None else f"{bench.recall_at_k:.4f}"
+    return (
+        f"{bench.label}: queries={bench.queries} recall@{k}={recall} "
+        f"p50={bench.latency_ms_p50:.2f}ms p95={bench.latency_ms_p95:.2f}ms"
+    )
@@ -3,6 +3,14 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+
+def _getenv_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("true", "1", "yes", "y", "t")
+
+
 DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_PORT = os.getenv("DB_PORT", "5432")
 DB_NAME = os.getenv("DB_NAME", "mirea_rag")
@@ -22,24 +30,124 @@ OPENROUTER_MODEL_NAME = os.getenv("OPENROUTER_MODEL_NAME")
 OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
 OPENROUTER_TIMEOUT = float(os.getenv("OPENROUTER_TIMEOUT", "60.0"))
 OPENROUTER_TEMPERATURE = float(os.getenv("OPENROUTER_TEMPERATURE", "0.1"))
+# Process-wide limits shared by LLM and embedding calls to one API host
+# (0 disables the requests/min or tokens/min bucket).
+OPENROUTER_RATE_LIMITER = _getenv_bool("OPENROUTER_RATE_LIMITER", True)
+OPENROUTER_RPM = int(os.getenv("OPENROUTER_RPM", "0"))
+OPENROUTER_TPM = int(os.getenv("OPENROUTER_TPM", "0"))
+OPENROUTER_CONCURRENCY_INITIAL = int(os.getenv("OPENROUTER_CONCURRENCY_INITIAL", "8"))
+OPENROUTER_CONCURRENCY_MIN = int(os.getenv("OPENROUTER_CONCURRENCY_MIN", "1"))
+OPENROUTER_CONCURRENCY_MAX = int(os.getenv("OPENROUTER_CONCURRENCY_MAX", "32"))
+# One keep-alive httpx pool for every OpenRouter/embedding client in the
+# process; HTTP/2 needs the `h2` package and falls back to HTTP/1.1 without it.
+HTTP_POOL_SHARED = _getenv_bool("HTTP_POOL_SHARED", True)
+HTTP_POOL_HTTP2 = _getenv_bool("HTTP_POOL_HTTP2", True)
+HTTP_POOL_MAX_CONNECTIONS = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "20"))
+HTTP_POOL_MAX_KEEPALIVE = int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", "10"))
+HTTP_POOL_KEEPALIVE_EXPIRY_S = float(os.getenv("HTTP_POOL_KEEPALIVE_EXPIRY_S", "60.0"))
+HTTP_POOL_WARMUP = _getenv_bool("HTTP_POOL_WARMUP", True)
 SYSTEM_PROMPT_NAME = os.getenv("SYSTEM_PROMPT_NAME", "system_prompt.md")
+LLM_RETRIES = int(os.getenv("LLM_RETRIES", "2"))
+LLM_RETRY_BACKOFF_S = float(os.getenv("LLM_RETRY_BACKOFF_S", "0.5"))
+LLM_FALLBACK_MODELS = [
+    name.strip()
+    for name in os.getenv("LLM_FALLBACK_MODELS", "").split(",")
+    if name.strip()
+]
+LLM_HEDGE = _getenv_bool("LLM_HEDGE", False)
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+LLM_HEDGE_DELAY_S = float(os.getenv("LLM_HEDGE_DELAY_S", "10.0"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_CACHE = _getenv_bool("LLM_CACHE", False)
+LLM_CACHE_TTL_S = int(os.getenv("LLM_CACHE_TTL_S", "2592000"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "50000"))
 
 EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME")
 EMBEDDING_BASE_URL = os.getenv("EMBEDDING_BASE_URL", OPENROUTER_BASE_URL)
 EMBEDDING_TIMEOUT = float(os.getenv("EMBEDDING_TIMEOUT", "30.0"))
+EMBEDDING_CACHE = _getenv_bool("EMBEDDING_CACHE", True)
+EMBEDDING_CACHE_MEMORY_SIZE = int(os.getenv("EMBEDDING_CACHE_MEMORY_SIZE", "2048"))
+EMBEDDING_MICRO_BATCHING = _getenv_bool("EMBEDDING_MICRO_BATCHING", False)
+EMBEDDING_BATCH_MAX_SIZE = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "32"))
+EMBEDDING_BATCH_MAX_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "5.0"))
+EMBEDDING_MODEL_CHECK_INTERVAL_S = float(
+    os.getenv("EMBEDDING_MODEL_CHECK_INTERVAL_S", "30.0")
+)
+
+# Backends: openrouter | fake | record | replay
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openrouter").strip().lower()
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openrouter").strip().lower()
+RECORDINGS_PATH = os.getenv("RECORDINGS_PATH", "data/recordings")
+FAKE_SEED = int(os.getenv("FAKE_SEED", "0"))
+FAKE_LATENCY_DISTRIBUTION = (
+    os.getenv("FAKE_LATENCY_DISTRIBUTION", "lognormal").strip().lower()
+)
+FAKE_LATENCY_SPREAD = float(os.getenv("FAKE_LATENCY_SPREAD", "0.5"))
+EMBEDDING_FAKE_DIM = int(os.getenv("EMBEDDING_FAKE_DIM", "1024"))
+EMBEDDING_FAKE_LATENCY_MS = float(os.getenv("EMBEDDING_FAKE_LATENCY_MS", "50.0"))
+LLM_FAKE_LATENCY_MS = float(os.getenv("LLM_FAKE_LATENCY_MS", "800.0"))
+LLM_FAKE_COMPLETION_TOKENS = int(os.getenv("LLM_FAKE_COMPLETION_TOKENS", "200"))
+LLM_FAKE_FAILURE_RATE = float(os.getenv("LLM_FAKE_FAILURE_RATE", "0.0"))
 
 RAG_TOP_K = int(os.getenv("RAG_TOP_K", "5"))
 RAG_QA_PROMPT_NAME = os.getenv("RAG_QA_PROMPT_NAME", "qa_prompt.md")
 RAG_MIN_SIMILARITY = float(os.getenv("RAG_MIN_SIMILARITY", "0.6"))
+RAG_PUSHDOWN_MIN_SIMILARITY = _getenv_bool("RAG_PUSHDOWN_MIN_SIMILARITY", False)
+RAG_HYBRID_SEARCH = _getenv_bool("RAG_HYBRID_SEARCH", False)
+RAG_LEXICAL_TOP_K = int(os.getenv("RAG_LEXICAL_TOP_K", str(RAG_TOP_K)))
+RAG_RRF_K = int(os.getenv("RAG_RRF_K", "60"))
+RAG_MMR = _getenv_bool("RAG_MMR", False)
+RAG_MMR_LAMBDA = float(os.getenv("RAG_MMR_LAMBDA", "0.7"))
+RAG_MMR_CANDIDATES = int(os.getenv("RAG_MMR_CANDIDATES", "20"))
+RAG_MMR_DUPLICATE_SIMILARITY = float(os.getenv("RAG_MMR_DUPLICATE_SIMILARITY", "0.95"))
+# Token budget for the QA context (0: no limit). Pairs are counted with
+# RAG_TOKEN_ESTIMATOR; counts stored in qa_pairs.token_count are used as is.
+RAG_CONTEXT_TOKEN_BUDGET = int(os.getenv("RAG_CONTEXT_TOKEN_BUDGET", "1500"))
+RAG_CONTEXT_MIN_ANSWER_TOKENS = int(os.getenv("RAG_CONTEXT_MIN_ANSWER_TOKENS", "40"))
+RAG_TOKEN_ESTIMATOR = os.getenv("RAG_TOKEN_ESTIMATOR", "pieces")
+RAG_TOPIC_ROUTING = _getenv_bool("RAG_TOPIC_ROUTING", False)
+RAG_TOPIC_ROUTER_MAX_TOPICS = int(os.getenv("RAG_TOPIC_ROUTER_MAX_TOPICS", "2"))
+RAG_TOPIC_ROUTER_MARGIN = float(os.getenv("RAG_TOPIC_ROUTER_MARGIN", "0.05"))
+RAG_TOPIC_CENTROIDS_PATH = os.getenv(
+    "RAG_TOPIC_CENTROIDS_PATH", "data/topic_centroids.json"
+)
+RAG_ANSWER_CACHE = _getenv_bool("RAG_ANSWER_CACHE", False)
+RAG_ANSWER_CACHE_MIN_SIMILARITY = float(
+    os.getenv("RAG_ANSWER_CACHE_MIN_SIMILARITY", "0.97")
+)
+RAG_ANSWER_CACHE_TTL_S = int(os.getenv("RAG_ANSWER_CACHE_TTL_S", "604800"))
+
+RAG_RETRIEVER_BACKEND = os.getenv("RAG_RETRIEVER_BACKEND", "postgres").strip().lower()
+RAG_SNAPSHOT_PATH = os.getenv("RAG_SNAPSHOT_PATH", "data/qa_snapshot")
+RAG_QUANTIZATION = os.getenv("RAG_QUANTIZATION", "").strip().lower()
+RAG_QUANTIZATION_RESCORE_FACTOR = int(os.getenv("RAG_QUANTIZATION_RESCORE_FACTOR", "4"))
+RAG_QUANTIZATION_RECALL_SAMPLE = int(os.getenv("RAG_QUANTIZATION_RECALL_SAMPLE", "100"))
+RAG_VECTOR_INDEX = os.getenv("RAG_VECTOR_INDEX", "hnsw").strip().lower()
+RAG_HNSW_M = int(os.getenv("RAG_HNSW_M", "16"))
+RAG_HNSW_EF_CONSTRUCTION = int(os.getenv("RAG_HNSW_EF_CONSTRUCTION", "64"))
+RAG_HNSW_EF_SEARCH = int(os.getenv("RAG_HNSW_EF_SEARCH", "40"))
+RAG_IVFFLAT_LISTS = int(os.getenv("RAG_IVFFLAT_LISTS", "0"))
+RAG_IVFFLAT_PROBES = int(os.getenv("RAG_IVFFLAT_PROBES", "10"))
+RAG_SHORT_EMBEDDING_DIM = int(os.getenv("RAG_SHORT_EMBEDDING_DIM", "256"))
+RAG_MATRYOSHKA = _getenv_bool("RAG_MATRYOSHKA", False)
+RAG_MATRYOSHKA_RESCORE_FACTOR = int(os.getenv("RAG_MATRYOSHKA_RESCORE_FACTOR", "4"))
+RAG_VECTOR_TUNING_PATH = os.getenv(
+    "RAG_VECTOR_TUNING_PATH", "data/vector_index_tuning.json"
+)
 
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_WELCOME_PROMPT = os.getenv("TELEGRAM_WELCOME_PROMPT", "telegram_welcome.md")
+TELEGRAM_STREAMING = _getenv_bool("TELEGRAM_STREAMING", True)
+TELEGRAM_STREAM_EDIT_INTERVAL_S = float(
+    os.getenv("TELEGRAM_STREAM_EDIT_INTERVAL_S", "1.0")
+)
 
 # EVAL / METRICS
 SYSTEM_VERSION = os.getenv("SYSTEM_VERSION", "unknown")
 
 EVAL_DATASET_NAME = os.getenv("EVAL_DATASET_NAME", "golden_set_v1")
 EVAL_CONCURRENCY = int(os.getenv("EVAL_CONCURRENCY", "3"))
+EVAL_LLM_CACHE = _getenv_bool("EVAL_LLM_CACHE", True)
 EVAL_RAG_TOP_K = int(os.getenv("EVAL_RAG_TOP_K", str(RAG_TOP_K)))
 EVAL_RAG_MIN_SIMILARITY = float(
     os.getenv("EVAL_RAG_MIN_SIMILARITY", str(RAG_MIN_SIMILARITY))
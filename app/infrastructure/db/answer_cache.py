@@ -0,0 +1,147 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.domain.interfaces.answer_cache import AnswerCache
+from app.domain.models.embedding import Embedding
+from app.domain.models.rag_run import CachedAnswer
+from app.infrastructure.config import (
+    RAG_ANSWER_CACHE_MIN_SIMILARITY,
+    RAG_ANSWER_CACHE_TTL_S,
+)
+from app.infrastructure.db.base import SessionLocal
+from app.infrastructure.db.models import RagRunORM
+from app.infrastructure.logging import setup_logging
+
+
+async def invalidate_answer_cache(session: AsyncSession) -> None:
+    """Detach every stored run from the cache; joins the caller's transaction."""
+    await session.execute(
+        update(RagRunORM)
+        .where(RagRunORM.context_key.is_not(None))
+        .values(context_key=None)
+        .execution_options(synchronize_session=False)
+    )
+
+
+class SqlAlchemyAnswerCache(AnswerCache):
+    """
+    Semantic answer cache over rag_runs. A past run is reused when it was built
+    from byte-identical context (same context_key), is younger than `ttl_s`,
+    and its question embedding is within `min_similarity` cosine of the new
+    one. Candidates are narrowed by the indexed key first, so the distance is
+    computed exactly over a handful of rows and needs no vector index.
+
+    Editing or removing a QA pair changes the context of every question that
+    retrieved it, so stale answers stop matching without explicit purges.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        *,
+        min_similarity: float = RAG_ANSWER_CACHE_MIN_SIMILARITY,
+        ttl_s: int = RAG_ANSWER_CACHE_TTL_S,
+    ) -> None:
+        self._session_factory = session_factory
+        self._max_distance = 1.0 - float(min_similarity)
+        self._ttl = timedelta(seconds=max(0, int(ttl_s)))
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    async def lookup(
+        self, context_key: str, query_embedding: Embedding
+    ) -> Optional[CachedAnswer]:
+        distance = RagRunORM.question_embedding.cosine_distance(query_embedding)
+        async with self._session_factory() as session:
+            row = (
+                await session.execute(
+                    select(
+                        RagRunORM.id,
+                        RagRunORM.answer_text,
+                        RagRunORM.model_name,
+                        distance.label("distance"),
+                    )
+                    .where(
+                        RagRunORM.context_key == context_key,
+                        RagRunORM.question_embedding.is_not(None),
+                        RagRunORM.created_at >= datetime.now(timezone.utc) - self._ttl,
+                        distance <= self._max_distance,
+                    )
+                    .order_by(distance)
+                    .limit(1)
+                )
+            ).first()
+
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return CachedAnswer(
+            rag_run_id=row.id,
+            answer_text=row.answer_text,
+            model_name=row.model_name,
+            similarity=1.0 - float(row.distance),
+        )
+
+    def log_stats(self) -> None:
+        logger.info(
+            "Answer cache stats (hits={}, misses={}, hit_ratio={:.3f})",
+            self.hits,
+            self.misses,
+            self.hit_ratio,
+        )
+
+
+async def answer_cache_status(days: int) -> dict[str, int]:
+    """Cache-eligible runs and served hits over the last `days` days."""
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    async with SessionLocal() as session:
+        row = (
+            await session.execute(
+                select(
+                    func.count(RagRunORM.context_key),
+                    func.count(RagRunORM.answer_cache_source_id),
+                    func.count(),
+                ).where(RagRunORM.created_at >= since)
+            )
+        ).one()
+    return {"entries": int(row[0]), "hits": int(row[1]), "runs": int(row[2])}
+
+
+async def _invalidate() -> None:
+    async with SessionLocal() as session:
+        await invalidate_answer_cache(session)
+        await session.commit()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    setup_logging()
+
+    parser = argparse.ArgumentParser(description="Semantic answer cache in rag_runs")
+    sub = parser.add_subparsers(dest="command", required=True)
+    status_parser = sub.add_parser("status", help="Entries and hits per period")
+    status_parser.add_argument("--days", type=int, default=7)
+    sub.add_parser("invalidate", help="Drop every cached answer")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        report = asyncio.run(answer_cache_status(args.days))
+        print(
+            f"runs={report['runs']} entries={report['entries']} hits={report['hits']} "
+            f"hit_rate={report['hits'] / max(1, report['runs']):.4f}"
+        )
+    elif args.command == "invalidate":
+        asyncio.run(_invalidate())
+        print("Answer cache invalidated.")
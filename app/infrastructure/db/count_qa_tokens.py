@@ -0,0 +1,84 @@
+import asyncio
+
+from loguru import logger
+from sqlalchemy import select, update
+
+from app.domain.models.tokens import count_qa_pair_tokens, get_token_estimator
+from app.infrastructure.config import RAG_TOKEN_ESTIMATOR
+from app.infrastructure.db.base import SessionLocal
+from app.infrastructure.db.models import QaPairORM
+from app.infrastructure.logging import setup_logging
+
+
+async def count_qa_tokens(
+    *,
+    estimator_name: str = RAG_TOKEN_ESTIMATOR,
+    recount: bool = False,
+    batch_size: int = 1000,
+) -> int:
+    """
+    Fill qa_pairs.token_count for rows seeded before it existed, or for all
+    rows with `recount` (after changing RAG_TOKEN_ESTIMATOR). Offline: only
+    the estimator runs, no API calls.
+    """
+    estimator = get_token_estimator(estimator_name)
+    counted = 0
+    last_id = 0
+    while True:
+        async with SessionLocal() as session:
+            stmt = (
+                select(QaPairORM.id, QaPairORM.question, QaPairORM.answer)
+                .where(QaPairORM.id > last_id)
+                .order_by(QaPairORM.id.asc())
+                .limit(batch_size)
+            )
+            if not recount:
+                stmt = stmt.where(QaPairORM.token_count.is_(None))
+            rows = (await session.execute(stmt)).all()
+            if not rows:
+                break
+            # Bulk UPDATE ... WHERE id = :id, one executemany per batch.
+            await session.execute(
+                update(QaPairORM),
+                [
+                    {
+                        "id": row.id,
+                        "token_count": count_qa_pair_tokens(
+                            row.question, row.answer, estimator
+                        ),
+                    }
+                    for row in rows
+                ],
+            )
+            await session.commit()
+        counted += len(rows)
+        last_id = int(rows[-1].id)
+
+    logger.info(
+        "QA pair token counts updated (estimator={}, rows={})", estimator_name, counted
+    )
+    return counted
+
+
+if __name__ == "__main__":
+    import argparse
+
+    setup_logging()
+
+    parser = argparse.ArgumentParser(
+        description="Precompute qa_pairs.token_count for context budgeting"
+    )
+    parser.add_argument("--estimator", default=RAG_TOKEN_ESTIMATOR)
+    parser.add_argument(
+        "--recount", action="store_true", help="Recount rows that already have one"
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    asyncio.run(
+        count_qa_tokens(
+            estimator_name=args.estimator,
+            recount=args.recount,
+            batch_size=args.batch_size,
+        )
+    )
@@ -1,18 +1,97 @@
-from typing import Sequence
+from typing import Any, Mapping, Optional, Sequence
 
 from loguru import logger
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import (
+    Integer,
+    Row,
+    Select,
+    cast,
+    column,
+    func,
+    literal,
+    select,
+    text,
+    true,
+    union_all,
+    values,
+)
+from sqlalchemy.sql import ColumnElement, FromClause
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.domain.interfaces.qa_pair_repository import QaPairRepository
-from app.domain.models.qa_pair import QaPair, QaPairHit
-from app.infrastructure.db.models import QaPairORM
+from app.domain.interfaces.qa_pair_repository import (
+    LexicalQaPairRetriever,
+    QaPairRepository,
+)
+from app.domain.models.embedding import Embedding, as_embedding
+from app.domain.models.qa_pair import QaPair, QaPairHit, QaPairProjection
+from app.infrastructure.config import (
+    RAG_HNSW_EF_SEARCH,
+    RAG_IVFFLAT_PROBES,
+    RAG_MATRYOSHKA,
+    RAG_MATRYOSHKA_RESCORE_FACTOR,
+    RAG_VECTOR_INDEX,
+)
+from app.infrastructure.db.models import QA_PAIRS_FTS_CONFIG, QaPairORM
+from app.infrastructure.db.vector_index import (
+    INDEX_KIND_HNSW,
+    INDEX_KIND_IVFFLAT,
+    tuned_ivfflat_probes,
+)
+from app.infrastructure.vector.matryoshka import truncate_embedding
+
+_PROJECTION_COLUMNS = (
+    QaPairORM.id,
+    QaPairORM.question,
+    QaPairORM.answer,
+    QaPairORM.topic,
+    QaPairORM.source_url,
+    QaPairORM.is_generated,
+    QaPairORM.token_count,
+)
 
 
 class SqlAlchemyQaPairRepository(QaPairRepository):
 
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+        self,
+        session: AsyncSession,
+        *,
+        index_kind: str = RAG_VECTOR_INDEX,
+        ef_search: Optional[int] = RAG_HNSW_EF_SEARCH,
+        probes: Optional[int] = None,
+        exact: bool = False,
+        matryoshka: bool = RAG_MATRYOSHKA,
+        rescore_factor: int = RAG_MATRYOSHKA_RESCORE_FACTOR,
+        shadow: bool = False,
+    ) -> None:
         self._session: AsyncSession = session
+        self._index_kind = index_kind
+        self._ef_search = ef_search
+        self._probes = probes or tuned_ivfflat_probes() or RAG_IVFFLAT_PROBES
+        self._exact = exact
+        # Two-stage search: shortlist on embedding_short, rescore on embedding.
+        # Exact mode always scans the full vectors.
+        self._matryoshka = matryoshka and not exact and not shadow
+        self._rescore_factor = max(1, int(rescore_factor))
+        # Shadow mode searches the re-embedding target column (and its own
+        # index), e.g. to compare a new model before flipping to it.
+        self._shadow = shadow
+        self._embedding_column = (
+            QaPairORM.embedding_shadow if shadow else QaPairORM.embedding
+        )
+
+    def _present_filter(self) -> Optional[ColumnElement[bool]]:
+        # The shadow column is only filled for rows re-embedded so far.
+        return self._embedding_column.is_not(None) if self._shadow else None
+
+    @staticmethod
+    def _short_dim() -> int:
+        return int(QaPairORM.__table__.c.embedding_short.type.dim)
+
+    def _candidates(self, k: int) -> Optional[int]:
+        return k * self._rescore_factor if self._matryoshka else None
 
     @staticmethod
     def _to_domain(row: QaPairORM) -> QaPair:
@@ -23,8 +102,23 @@ class SqlAlchemyQaPairRepository(QaPairRepository):
             source_url=row.source_url,
             topic=row.topic,
             is_generated=row.is_generated,
-            embedding=list(row.embedding),
+            embedding=as_embedding(row.embedding),
             created_at=row.created_at,
+            duplicate_of=row.duplicate_of,
+            embedding_model=row.embedding_model,
+            token_count=row.token_count,
+        )
+
+    @staticmethod
+    def _to_projection(row: Row[Any]) -> QaPairProjection:
+        return QaPairProjection(
+            id=row.id,
+            question=row.question,
+            answer=row.answer,
+            topic=row.topic,
+            source_url=row.source_url,
+            is_generated=row.is_generated,
+            token_count=row.token_count,
         )
 
     async def add(self, qa: QaPair) -> QaPair:
@@ -34,7 +128,9 @@ class SqlAlchemyQaPairRepository(QaPairRepository):
             source_url=qa.source_url,
             topic=qa.topic,
             is_generated=qa.is_generated,
-            embedding=list(qa.embedding),
+            embedding=qa.embedding,
+            embedding_model=qa.embedding_model,
+            token_count=qa.token_count,
         )
         self._session.add(orm_obj)
         await self._session.flush()
@@ -56,53 +152,165 @@ class SqlAlchemyQaPairRepository(QaPairRepository):
                 source_url=qa.source_url,
                 topic=qa.topic,
                 is_generated=qa.is_generated,
-                embedding=list(qa.embedding),
+                embedding=qa.embedding,
+                embedding_model=qa.embedding_model,
+                token_count=qa.token_count,
             )
             self._session.add(orm_obj)
 
         await self._session.flush()
         logger.info("Inserted batch of QA pairs (count={})", len(qa_list))
 
+    async def active_embedding_model(self) -> Optional[str]:
+        """
+        Model of the live `embedding` column. A flip swaps every row in one
+        transaction, so any row is representative.
+        """
+        return await self._session.scalar(
+            select(QaPairORM.embedding_model)
+            .where(QaPairORM.embedding_model.is_not(None))
+            .limit(1)
+        )
+
     async def list_all(self) -> Sequence[QaPair]:
         result = await self._session.scalars(select(QaPairORM))
         rows = result.all()
         logger.debug("Fetched all QA pairs (count={})", len(rows))
         return [self._to_domain(row) for row in rows]
 
+    async def _apply_search_params(self, k: int) -> None:
+        # SET LOCAL only lasts until the end of the current transaction.
+        if self._exact:
+            await self._session.execute(text("SET LOCAL enable_indexscan = off"))
+            return
+        if self._index_kind == INDEX_KIND_HNSW and self._ef_search:
+            ef_search = max(int(self._ef_search), int(self._candidates(k) or k))
+            await self._session.execute(text(f"SET LOCAL hnsw.ef_search = {ef_search}"))
+        elif self._index_kind == INDEX_KIND_IVFFLAT and self._probes:
+            await self._session.execute(
+                text(f"SET LOCAL ivfflat.probes = {int(self._probes)}")
+            )
+
+    async def get_embeddings(self, ids: Sequence[int]) -> Mapping[int, Embedding]:
+        if not ids:
+            return {}
+        result = await self._session.execute(
+            select(QaPairORM.id, self._embedding_column.label("embedding")).where(
+                QaPairORM.id.in_(list(ids)), self._embedding_column.is_not(None)
+            )
+        )
+        return {int(row.id): as_embedding(row.embedding) for row in result.all()}
+
+    @staticmethod
+    def _nearest_stmt(
+        distance_expr: ColumnElement[Any],
+        k: int,
+        max_distance: Optional[float],
+        topics: Optional[Sequence[str]],
+        correlate: Optional[FromClause] = None,
+        short_distance_expr: Optional[ColumnElement[Any]] = None,
+        candidates: Optional[int] = None,
+        extra_filter: Optional[ColumnElement[bool]] = None,
+    ) -> Select[Any]:
+        def _topic_filter(stmt: Select[Any], topic: Optional[str]) -> Select[Any]:
+            if topic is None:
+                return stmt
+            # Inline the topic so the planner can match a per-topic partial
+            # index (`WHERE topic = '...'`) even for generic plans.
+            return stmt.where(QaPairORM.topic == literal(topic, literal_execute=True))
+
+        def _branch(topic: Optional[str]) -> Select[Any]:
+            # Order by the raw distance (ASC) so the planner can use the vector
+            # index. Only projection columns are selected: the embedding never
+            # leaves the DB.
+            stmt = _topic_filter(
+                select(*_PROJECTION_COLUMNS, distance_expr.label("distance")).where(
+                    QaPairORM.duplicate_of.is_(None)
+                ),
+                topic,
+            )
+            if extra_filter is not None:
+                stmt = stmt.where(extra_filter)
+            if correlate is not None:
+                stmt = stmt.correlate(correlate)
+
+            if short_distance_expr is not None and candidates:
+                # First stage walks the short-vector index; its LIMIT keeps the
+                # subquery from being flattened, so only the shortlist is
+                # rescored (sorted) by the full-embedding distance.
+                shortlist = (
+                    stmt.order_by(short_distance_expr)
+                    .limit(candidates)
+                    .subquery("shortlist")
+                )
+                rescored = select(shortlist)
+                if max_distance is not None:
+                    rescored = rescored.where(shortlist.c.distance <= max_distance)
+                return rescored.order_by(shortlist.c.distance).limit(k)
+
+            if max_distance is not None:
+                stmt = stmt.where(distance_expr <= max_distance)
+            return stmt.order_by(distance_expr).limit(k)
+
+        if not topics:
+            return _branch(None)
+        if len(topics) == 1:
+            return _branch(topics[0])
+
+        # One index scan per topic partition, merged by distance.
+        merged = union_all(*(_branch(topic) for topic in topics)).subquery("topic_hits")
+        return select(merged).order_by(merged.c.distance).limit(k)
+
     async def find_top_k(
         self,
-        query_embedding: Sequence[float],
+        query_embedding: Embedding,
         k: int,
+        max_distance: Optional[float] = None,
+        topics: Optional[Sequence[str]] = None,
     ) -> Sequence[QaPairHit]:
-        distance_expr = QaPairORM.embedding.cosine_distance(list(query_embedding))
-        similarity_expr = 1 - distance_expr
-        stmt = (
-            select(
-                QaPairORM,
-                distance_expr.label("distance"),
-                similarity_expr.label("similarity"),
+        distance_expr = self._embedding_column.cosine_distance(
+            as_embedding(query_embedding)
+        )
+        short_distance_expr = (
+            QaPairORM.embedding_short.cosine_distance(
+                truncate_embedding(query_embedding, self._short_dim())
             )
-            .order_by(similarity_expr.desc())
-            .limit(k)
+            if self._matryoshka
+            else None
+        )
+        stmt = self._nearest_stmt(
+            distance_expr,
+            k,
+            max_distance,
+            topics,
+            short_distance_expr=short_distance_expr,
+            candidates=self._candidates(k),
+            extra_filter=self._present_filter(),
         )
 
+        await self._apply_search_params(k)
         result = await self._session.execute(stmt)
         rows = result.all()
         hits: list[QaPairHit] = []
         for rank, row in enumerate(rows):
+            distance = float(row.distance)
             hits.append(
                 QaPairHit(
-                    qa_pair=self._to_domain(row.QaPairORM),
+                    qa_pair=self._to_projection(row),
                     rank=rank,
-                    distance=float(row.distance),
-                    similarity=float(row.similarity),
+                    distance=distance,
+                    similarity=1.0 - distance,
                 )
             )
 
         logger.info(
-            "Vector search returned {} items (k={}):\n{}",
+            "Vector search returned {} items (k={}, max_distance={}, topics={}, matryoshka={}, shadow={}):\n{}",
             len(hits),
             k,
+            max_distance,
+            topics,
+            self._matryoshka,
+            self._shadow,
             "\n".join(
                 [
                     (
@@ -116,3 +324,174 @@ class SqlAlchemyQaPairRepository(QaPairRepository):
             ),
         )
         return hits
+
+    async def find_top_k_many(
+        self,
+        query_embeddings: Sequence[Embedding],
+        k: int,
+        max_distance: Optional[float] = None,
+        topics: Optional[Sequence[str]] = None,
+    ) -> Sequence[Sequence[QaPairHit]]:
+        if not query_embeddings:
+            return []
+
+        dim = int(QaPairORM.__table__.c.embedding.type.dim)
+        short_dim = self._short_dim()
+        queries = values(
+            column("query_idx", Integer),
+            column("query_embedding", Vector(dim)),
+            column("query_embedding_short", Vector(short_dim)),
+            name="queries",
+        ).data(
+            [
+                (
+                    idx,
+                    as_embedding(emb),
+                    truncate_embedding(emb, short_dim) if self._matryoshka else None,
+                )
+                for idx, emb in enumerate(query_embeddings)
+            ]
+        )
+        # VALUES params arrive untyped, so cast back to vector for `<=>`.
+        distance_expr = self._embedding_column.cosine_distance(
+            cast(queries.c.query_embedding, Vector(dim))
+        )
+        short_distance_expr = (
+            QaPairORM.embedding_short.cosine_distance(
+                cast(queries.c.query_embedding_short, Vector(short_dim))
+            )
+            if self._matryoshka
+            else None
+        )
+        hits_subq = self._nearest_stmt(
+            distance_expr,
+            k,
+            max_distance,
+            topics,
+            correlate=queries,
+            short_distance_expr=short_distance_expr,
+            candidates=self._candidates(k),
+            extra_filter=self._present_filter(),
+        ).lateral("hits")
+        stmt = (
+            select(queries.c.query_idx, hits_subq)
+            .select_from(queries)
+            .join(hits_subq, true())
+            .order_by(queries.c.query_idx, hits_subq.c.distance)
+        )
+
+        await self._apply_search_params(k)
+        result = await self._session.execute(stmt)
+
+        hits_per_query: list[list[QaPairHit]] = [[] for _ in query_embeddings]
+        for row in result.all():
+            query_hits = hits_per_query[row.query_idx]
+            distance = float(row.distance)
+            query_hits.append(
+                QaPairHit(
+                    qa_pair=self._to_projection(row),
+                    rank=len(query_hits),
+                    distance=distance,
+                    similarity=1.0 - distance,
+                )
+            )
+
+        logger.info(
+            "Batched vector search returned {} items for {} queries (k={}, max_distance={}, topics={})",
+            sum(len(hits) for hits in hits_per_query),
+            len(query_embeddings),
+            k,
+            max_distance,
+            topics,
+        )
+        return hits_per_query
+
+
+class SqlAlchemyLexicalQaPairRetriever(LexicalQaPairRetriever):
+    """
+    Full-text search over qa_pairs.search_tsv (GIN index). Each call opens its
+    own session, so it can run concurrently with the vector query of the
+    request session.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        self._session_factory = session_factory
+
+    @staticmethod
+    def _build_stmt(query_text: str, query_embedding: Embedding, k: int) -> Select[Any]:
+        ts_query = func.websearch_to_tsquery(
+            cast(literal(QA_PAIRS_FTS_CONFIG), REGCONFIG), query_text
+        )
+        rank_expr = func.ts_rank_cd(QaPairORM.search_tsv, ts_query)
+        distance_expr = QaPairORM.embedding.cosine_distance(
+            as_embedding(query_embedding)
+        )
+        return (
+            select(*_PROJECTION_COLUMNS, distance_expr.label("distance"))
+            .where(
+                QaPairORM.search_tsv.bool_op("@@")(ts_query),
+                QaPairORM.duplicate_of.is_(None),
+            )
+            .order_by(rank_expr.desc(), QaPairORM.id.asc())
+            .limit(k)
+        )
+
+    @staticmethod
+    def _to_hits(rows: Sequence[Row[Any]]) -> list[QaPairHit]:
+        hits: list[QaPairHit] = []
+        for rank, row in enumerate(rows):
+            distance = float(row.distance)
+            hits.append(
+                QaPairHit(
+                    qa_pair=SqlAlchemyQaPairRepository._to_projection(row),
+                    rank=rank,
+                    distance=distance,
+                    similarity=1.0 - distance,
+                    lexical_rank=rank,
+                )
+            )
+        return hits
+
+    async def find_top_k_lexical(
+        self,
+        query_text: str,
+        query_embedding: Embedding,
+        k: int,
+    ) -> Sequence[QaPairHit]:
+        async with self._session_factory() as session:
+            result = await session.execute(
+                self._build_stmt(query_text, query_embedding, k)
+            )
+            hits = self._to_hits(result.all())
+
+        logger.info(
+            "Lexical search returned {} items (k={}): {}",
+            len(hits),
+            k,
+            [(hit.qa_pair.id, round(hit.similarity, 4)) for hit in hits],
+        )
+        return hits
+
+    async def find_top_k_lexical_many(
+        self,
+        query_texts: Sequence[str],
+        query_embeddings: Sequence[Embedding],
+        k: int,
+    ) -> Sequence[Sequence[QaPairHit]]:
+        hits_per_query: list[Sequence[QaPairHit]] = []
+        async with self._session_factory() as session:
+            for query_text, query_embedding in zip(
+                query_texts, query_embeddings, strict=True
+            ):
+                result = await session.execute(
+                    self._build_stmt(query_text, query_embedding, k)
+                )
+                hits_per_query.append(self._to_hits(result.all()))
+
+        logger.info(
+            "Batched lexical search returned {} items for {} queries (k={})",
+            sum(len(hits) for hits in hits_per_query),
+            len(query_texts),
+            k,
+        )
+        return hits_per_query
@@ -0,0 +1,71 @@
+from typing import Mapping, Sequence
+
+from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.domain.interfaces.embedding_cache import EmbeddingCache
+from app.domain.models.embedding import Embedding, as_embedding
+from app.infrastructure.db.models import EmbeddingCacheORM
+
+# Keeps every statement well below the asyncpg bind-parameter limit.
+_CHUNK_SIZE = 1000
+
+
+class SqlAlchemyEmbeddingCache(EmbeddingCache):
+    """
+    embedding_cache table keyed by (model_name, text_hash). Each call opens its
+    own short session, so the cache never joins the caller's transaction.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        self._session_factory = session_factory
+
+    async def get_many(
+        self, model_name: str, keys: Sequence[str]
+    ) -> Mapping[str, Embedding]:
+        found: dict[str, Embedding] = {}
+        async with self._session_factory() as session:
+            for start in range(0, len(keys), _CHUNK_SIZE):
+                result = await session.execute(
+                    select(EmbeddingCacheORM.text_hash, EmbeddingCacheORM.embedding)
+                    .where(EmbeddingCacheORM.model_name == model_name)
+                    .where(
+                        EmbeddingCacheORM.text_hash.in_(
+                            list(keys[start : start + _CHUNK_SIZE])
+                        )
+                    )
+                )
+                found.update(
+                    (row.text_hash, as_embedding(row.embedding)) for row in result.all()
+                )
+        return found
+
+    async def put_many(
+        self, model_name: str, embeddings: Mapping[str, Embedding]
+    ) -> None:
+        if not embeddings:
+            return
+
+        items = list(embeddings.items())
+        async with self._session_factory() as session:
+            for start in range(0, len(items), _CHUNK_SIZE):
+                await session.execute(
+                    insert(EmbeddingCacheORM)
+                    .values(
+                        [
+                            {
+                                "model_name": model_name,
+                                "text_hash": key,
+                                "embedding": embedding,
+                            }
+                            for key, embedding in items[start : start + _CHUNK_SIZE]
+                        ]
+                    )
+                    .on_conflict_do_nothing(index_elements=["model_name", "text_hash"])
+                )
+            await session.commit()
+        logger.debug(
+            "Stored embeddings in cache (model={}, count={})", model_name, len(items)
+        )
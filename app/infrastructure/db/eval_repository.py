@@ -68,6 +68,8 @@ class SqlAlchemyEvalRepository:
                 float(row.judge_cost_usd) if row.judge_cost_usd is not None else None
             ),
             judge_tokens_total=row.judge_tokens_total,
+            answer_cached=row.answer_cached,
+            judge_cached=row.judge_cached,
         )
 
     async def get_dataset_by_name(self, name: str) -> Optional[EvalDataset]:
@@ -174,6 +176,8 @@ class SqlAlchemyEvalRepository:
                 tokens_total=result.tokens_total,
                 judge_cost_usd=result.judge_cost_usd,
                 judge_tokens_total=result.judge_tokens_total,
+                answer_cached=result.answer_cached,
+                judge_cached=result.judge_cached,
             )
             self._session.add(obj)
             await self._session.flush()
@@ -189,6 +193,8 @@ class SqlAlchemyEvalRepository:
         obj.tokens_total = result.tokens_total
         obj.judge_cost_usd = result.judge_cost_usd
         obj.judge_tokens_total = result.judge_tokens_total
+        obj.answer_cached = result.answer_cached
+        obj.judge_cached = result.judge_cached
         await self._session.flush()
 
     async def list_results(self, run_id: UUID) -> Sequence[EvalResult]:
@@ -0,0 +1,75 @@
+import asyncio
+from pathlib import Path
+
+from loguru import logger
+from sqlalchemy import select
+
+from app.domain.models.qa_pair import QaPair
+from app.infrastructure.config import EMBEDDING_MODEL_NAME, RAG_SNAPSHOT_PATH
+from app.infrastructure.db.base import SessionLocal
+from app.infrastructure.db.crud import SqlAlchemyQaPairRepository
+from app.infrastructure.db.models import QaPairORM
+from app.infrastructure.db.vector_index import count_qa_pairs
+from app.infrastructure.logging import setup_logging
+from app.infrastructure.vector.snapshot import SnapshotWriter
+
+
+async def export_snapshot(out_path: str, batch_size: int = 1000) -> Path:
+    dim = int(QaPairORM.__table__.c.embedding.type.dim)
+
+    async with SessionLocal() as session:
+        # One consistent view of the table for both the count and the rows.
+        await session.connection(
+            execution_options={"isolation_level": "REPEATABLE READ"}
+        )
+        count = await count_qa_pairs(session, exclude_duplicates=True)
+        writer = SnapshotWriter(
+            out_path,
+            count=count,
+            dim=dim,
+            embedding_model_name=(
+                await SqlAlchemyQaPairRepository(session).active_embedding_model()
+                or EMBEDDING_MODEL_NAME
+            ),
+        )
+
+        rows = await session.stream_scalars(
+            select(QaPairORM)
+            .where(QaPairORM.duplicate_of.is_(None))
+            # Grouped by topic so each topic is a contiguous slice of the matrix.
+            .order_by(QaPairORM.topic.asc(), QaPairORM.id.asc())
+            .execution_options(yield_per=batch_size)
+        )
+        async for row in rows:
+            writer.append(
+                QaPair(
+                    id=row.id,
+                    question=row.question,
+                    answer=row.answer,
+                    source_url=row.source_url,
+                    topic=row.topic,
+                    is_generated=row.is_generated,
+                    embedding=row.embedding,
+                    created_at=row.created_at,
+                    token_count=row.token_count,
+                )
+            )
+
+    path = writer.close()
+    logger.info("Exported QA pairs snapshot (count={}, path={})", count, path)
+    return path
+
+
+if __name__ == "__main__":
+    import argparse
+
+    setup_logging()
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--out", default=RAG_SNAPSHOT_PATH, help="Snapshot directory to write"
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    asyncio.run(export_snapshot(args.out, batch_size=args.batch_size))
@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.domain.interfaces.llm_response_cache import LlmResponseCache
+from app.domain.models.llm_generation import LlmGeneration, LlmUsage
+from app.infrastructure.config import LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_S
+from app.infrastructure.db.models import LlmResponseCacheORM
+
+# Expired and surplus rows are pruned after this many writes.
+_PRUNE_EVERY_PUTS = 200
+
+
+class SqlAlchemyLlmResponseCache(LlmResponseCache):
+    """
+    llm_response_cache table keyed by the request hash. Entries older than
+    `ttl_s` are ignored and pruned; beyond `max_entries` the least recently
+    used ones are evicted. Each call opens its own short session.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        *,
+        ttl_s: int = LLM_CACHE_TTL_S,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+    ) -> None:
+        self._session_factory = session_factory
+        self._ttl = timedelta(seconds=max(0, int(ttl_s)))
+        self._max_entries = max(1, int(max_entries))
+        self._puts = 0
+
+    def _cutoff(self) -> datetime:
+        return datetime.now(timezone.utc) - self._ttl
+
+    async def get(self, key: str) -> Optional[LlmGeneration]:
+        async with self._session_factory() as session:
+            row = await session.scalar(
+                select(LlmResponseCacheORM).where(
+                    LlmResponseCacheORM.cache_key == key,
+                    LlmResponseCacheORM.created_at >= self._cutoff(),
+                )
+            )
+            if row is None:
+                return None
+            generation = LlmGeneration(
+                text=row.response_text,
+                model=row.response_model,
+                usage=LlmUsage(
+                    prompt_tokens=row.usage_prompt_tokens,
+                    completion_tokens=row.usage_completion_tokens,
+                    total_tokens=row.usage_total_tokens,
+                ),
+                cached=True,
+            )
+            await session.execute(
+                update(LlmResponseCacheORM)
+                .where(LlmResponseCacheORM.cache_key == key)
+                .values(last_used_at=datetime.now(timezone.utc))
+            )
+            await session.commit()
+        return generation
+
+    async def put(self, key: str, model_name: str, generation: LlmGeneration) -> None:
+        usage = generation.usage
+        values = {
+            "model_name": model_name,
+            "response_text": generation.text,
+            "response_model": generation.model,
+            "usage_prompt_tokens": usage.prompt_tokens if usage else None,
+            "usage_completion_tokens": usage.completion_tokens if usage else None,
+            "usage_total_tokens": usage.total_tokens if usage else None,
+            "created_at": datetime.now(timezone.utc),
+            "last_used_at": datetime.now(timezone.utc),
+        }
+        async with self._session_factory() as session:
+            await session.execute(
+                insert(LlmResponseCacheORM).values(cache_key=key, **values)
+                # An expired entry for the same request is refreshed in place.
+                .on_conflict_do_update(index_elements=["cache_key"], set_=values)
+            )
+            await session.commit()
+
+        self._puts += 1
+        if self._puts % _PRUNE_EVERY_PUTS == 0:
+            await self.prune()
+
+    async def prune(self) -> int:
+        async with self._session_factory() as session:
+            expired = await session.execute(
+                delete(LlmResponseCacheORM).where(
+                    LlmResponseCacheORM.created_at < self._cutoff()
+                )
+            )
+            # last_used_at of the first entry past the limit (index scan).
+            threshold = await session.scalar(
+                select(LlmResponseCacheORM.last_used_at)
+                .order_by(LlmResponseCacheORM.last_used_at.desc())
+                .offset(self._max_entries)
+                .limit(1)
+            )
+            surplus = (
+                await session.execute(
+                    delete(LlmResponseCacheORM).where(
+                        LlmResponseCacheORM.last_used_at <= threshold
+                    )
+                )
+                if threshold is not None
+                else None
+            )
+            await session.commit()
+        removed = int(getattr(expired, "rowcount", 0) or 0) + int(
+            getattr(surplus, "rowcount", 0) or 0
+        )
+        logger.info(
+            "LLM response cache pruned (removed={}, max_entries={})",
+            removed,
+            self._max_entries,
+        )
+        return removed
@@ -4,6 +4,7 @@ from typing import Optional
 
 from sqlalchemy import (
     BigInteger,
+    Computed,
     Text,
     Boolean,
     DateTime,
@@ -11,16 +12,23 @@ from sqlalchemy import (
     Float,
     String,
     ForeignKey,
+    Index,
     text,
     Integer,
 )
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import Mapped, mapped_column
 from pgvector.sqlalchemy import Vector
+from app.domain.models.embedding import Embedding
 from app.infrastructure.db.base import Base
 
+# Text search configuration of qa_pairs.search_tsv; changing it needs a migration.
+QA_PAIRS_FTS_CONFIG = "russian"
+# Dimension of qa_pairs.embedding_short; changing it needs a migration.
+QA_PAIRS_SHORT_EMBEDDING_DIM = 256
+
 
 class QaPairORM(Base):
     __tablename__ = "qa_pairs"
@@ -33,10 +41,71 @@ class QaPairORM(Base):
     is_generated: Mapped[bool] = mapped_column(
         Boolean, nullable=False, server_default=text("true")
     )
-    embedding: Mapped[list[float]] = mapped_column(Vector(1024), nullable=False)
+    embedding: Mapped[Embedding] = mapped_column(Vector(1024), nullable=False)
+    # Model that produced `embedding`; retrieval embeds queries with it.
+    embedding_model: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # Re-embedding target, filled in the background and swapped with
+    # `embedding` in one transaction (see reembed_qa_pairs). After a flip it
+    # holds the previous model's vectors, so flipping back is a rollback.
+    embedding_shadow: Mapped[Optional[Embedding]] = mapped_column(
+        Vector(1024), nullable=True, deferred=True
+    )
+    embedding_shadow_model: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )
+    duplicate_of: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("qa_pairs.id", ondelete="SET NULL"), nullable=True
+    )
+    # Question + answer tokens by RAG_TOKEN_ESTIMATOR (see count_qa_tokens).
+    token_count: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    search_tsv: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        Computed(
+            f"to_tsvector('{QA_PAIRS_FTS_CONFIG}'::regconfig, "
+            "question || ' ' || answer)",
+            persisted=True,
+        ),
+        nullable=True,
+        deferred=True,
+    )
+
+    # Re-normalized Matryoshka prefix of `embedding` for two-stage search.
+    embedding_short: Mapped[Optional[Embedding]] = mapped_column(
+        Vector(QA_PAIRS_SHORT_EMBEDDING_DIM),
+        Computed(
+            f"l2_normalize(subvector(embedding, 1, {QA_PAIRS_SHORT_EMBEDDING_DIM}))"
+            f"::vector({QA_PAIRS_SHORT_EMBEDDING_DIM})",
+            persisted=True,
+        ),
+        nullable=True,
+        deferred=True,
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_qa_pairs_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+        Index(
+            "ix_qa_pairs_embedding_short_hnsw",
+            "embedding_short",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding_short": "vector_cosine_ops"},
+        ),
+        Index(
+            "ix_qa_pairs_embedding_shadow_hnsw",
+            "embedding_shadow",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding_shadow": "vector_cosine_ops"},
+        ),
+        Index("ix_qa_pairs_search_tsv_gin", "search_tsv", postgresql_using="gin"),
+    )
 
 
 class RagRunORM(Base):
@@ -77,6 +146,37 @@ class RagRunORM(Base):
     latency_ms_embedding: Mapped[Optional[int]] = mapped_column(
         BigInteger, nullable=True
     )
+    latency_ms_retrieval_vector: Mapped[Optional[int]] = mapped_column(
+        BigInteger, nullable=True
+    )
+    latency_ms_retrieval_lexical: Mapped[Optional[int]] = mapped_column(
+        BigInteger, nullable=True
+    )
+    latency_ms_llm_first_token: Mapped[Optional[int]] = mapped_column(
+        BigInteger, nullable=True
+    )
+    # Estimated context size and the budget it was fitted into (None: no limit).
+    context_tokens: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    context_token_budget: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    # Semantic answer cache: a run with a context_key can answer later
+    # questions that are close to question_embedding and retrieve exactly the
+    # same context (see answer_cache).
+    question_embedding: Mapped[Optional[Embedding]] = mapped_column(
+        Vector(1024), nullable=True, deferred=True
+    )
+    context_key: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    answer_cache_source_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        ForeignKey("rag_runs.id", ondelete="SET NULL"), nullable=True
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_rag_runs_context_key",
+            "context_key",
+            "created_at",
+            postgresql_where=text("context_key IS NOT NULL"),
+        ),
+    )
 
 
 class RagRunHitORM(Base):
@@ -98,6 +198,59 @@ class RagRunHitORM(Base):
     )
 
 
+class EmbeddingCacheORM(Base):
+    __tablename__ = "embedding_cache"
+
+    model_name: Mapped[str] = mapped_column(Text, primary_key=True)
+    # sha256 hex of the normalized input text.
+    text_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    # No fixed dimension: different embedding models share the table.
+    embedding: Mapped[Embedding] = mapped_column(Vector(), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
+class LlmResponseCacheORM(Base):
+    __tablename__ = "llm_response_cache"
+
+    # sha256 of (model, temperature, system prompt hash, prompt hash).
+    cache_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    model_name: Mapped[str] = mapped_column(Text, nullable=False)
+    response_text: Mapped[str] = mapped_column(Text, nullable=False)
+    response_model: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    usage_prompt_tokens: Mapped[Optional[int]] = mapped_column(
+        BigInteger, nullable=True
+    )
+    usage_completion_tokens: Mapped[Optional[int]] = mapped_column(
+        BigInteger, nullable=True
+    )
+    usage_total_tokens: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    # Eviction order once the table outgrows LLM_CACHE_MAX_ENTRIES.
+    last_used_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+    __table_args__ = (Index("ix_llm_response_cache_last_used_at", "last_used_at"),)
+
+
+class SeedCheckpointORM(Base):
+    __tablename__ = "seed_checkpoints"
+
+    # sha256 of the seeded file; chunk boundaries also depend on chunk_size.
+    source_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    chunk_size: Mapped[int] = mapped_column(Integer, primary_key=True)
+    chunk_index: Mapped[int] = mapped_column(Integer, primary_key=True)
+    source_path: Mapped[str] = mapped_column(Text, nullable=False)
+    row_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
 class EvalDatasetORM(Base):
     __tablename__ = "eval_datasets"
 
@@ -165,3 +318,9 @@ class EvalResultORM(Base):
         Numeric(20, 10), nullable=True
     )
     judge_tokens_total: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    answer_cached: Mapped[bool] = mapped_column(
+        Boolean, nullable=False, server_default=text("false")
+    )
+    judge_cached: Mapped[bool] = mapped_column(
+        Boolean, nullable=False, server_default=text("false")
+    )
@@ -38,6 +38,14 @@ class SqlAlchemyRagRunRepository(RagRunRepository):
             latency_ms_retrieval=run.latency_ms_retrieval,
             latency_ms_llm=run.latency_ms_llm,
             latency_ms_embedding=run.latency_ms_embedding,
+            latency_ms_retrieval_vector=run.latency_ms_retrieval_vector,
+            latency_ms_retrieval_lexical=run.latency_ms_retrieval_lexical,
+            latency_ms_llm_first_token=run.latency_ms_llm_first_token,
+            context_tokens=run.context_tokens,
+            context_token_budget=run.context_token_budget,
+            question_embedding=run.question_embedding,
+            context_key=run.context_key,
+            answer_cache_source_id=run.answer_cache_source_id,
         )
         self._session.add(orm_run)
         await self._session.flush()
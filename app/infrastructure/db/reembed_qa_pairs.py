@@ -0,0 +1,312 @@
+import asyncio
+import random
+from typing import Any, Optional, Sequence
+
+from loguru import logger
+from sqlalchemy import Row, func, select, text, update
+
+from app.domain.interfaces.embedding_provider import EmbeddingProvider
+from app.infrastructure.config import EMBEDDING_MODEL_NAME, RAG_TOP_K
+from app.infrastructure.db.answer_cache import invalidate_answer_cache
+from app.infrastructure.db.base import SessionLocal
+from app.infrastructure.db.crud import SqlAlchemyQaPairRepository
+from app.infrastructure.db.models import QaPairORM
+from app.infrastructure.db.seed_qa_pairs import embed_with_retries, qa_embedding_text
+from app.infrastructure.llm.factory import create_embedding_provider
+from app.infrastructure.llm.http_pool import close_http_pool
+from app.infrastructure.logging import setup_logging
+
+
+async def _shadow_batch(
+    *,
+    embedder: EmbeddingProvider,
+    model_name: str,
+    rows: Sequence[Row[Any]],
+    retries: int,
+    backoff_s: float,
+) -> None:
+    embeddings = await embed_with_retries(
+        embedder,
+        [qa_embedding_text(row.question, row.answer) for row in rows],
+        retries=retries,
+        backoff_s=backoff_s,
+    )
+    dim = int(QaPairORM.__table__.c.embedding_shadow.type.dim)
+    if embeddings and len(embeddings[0]) != dim:
+        raise ValueError(
+            f"Model {model_name} returns {len(embeddings[0])}-dim embeddings, "
+            f"qa_pairs stores {dim}; a dimension change needs a migration"
+        )
+
+    async with SessionLocal() as session:
+        await session.execute(
+            update(QaPairORM),
+            [
+                {
+                    "id": row.id,
+                    "embedding_shadow": embedding,
+                    "embedding_shadow_model": model_name,
+                }
+                for row, embedding in zip(rows, embeddings, strict=True)
+            ],
+        )
+        await session.commit()
+
+
+async def reembed_shadow(
+    model_name: str,
+    *,
+    batch_size: int = 256,
+    concurrency: int = 4,
+    retries: int = 3,
+    backoff_s: float = 2.0,
+) -> int:
+    """
+    Embed every QA pair with `model_name` into `embedding_shadow`, in batches
+    and without touching the live column. Rows whose shadow already holds
+    `model_name` are skipped, so an interrupted run resumes where it stopped
+    and a rerun picks up pairs inserted meanwhile.
+    """
+    async with SessionLocal() as session:
+        active_model = await SqlAlchemyQaPairRepository(
+            session
+        ).active_embedding_model()
+    if active_model == model_name:
+        logger.info("Embedding model {} is already active", model_name)
+        return 0
+
+    batch_size = max(1, int(batch_size))
+    logger.info(
+        "Re-embedding QA pairs into shadow column (active={}, target={}, batch_size={}, concurrency={})",
+        active_model,
+        model_name,
+        batch_size,
+        concurrency,
+    )
+    embedder = create_embedding_provider(model_name=model_name)
+    sem = asyncio.Semaphore(max(1, int(concurrency)))
+    failed: list[int] = []
+    embedded_rows = 0
+
+    async def _run(rows: Sequence[Row[Any]]) -> None:
+        nonlocal embedded_rows
+        try:
+            await _shadow_batch(
+                embedder=embedder,
+                model_name=model_name,
+                rows=rows,
+                retries=retries,
+                backoff_s=backoff_s,
+            )
+            embedded_rows += len(rows)
+            logger.info(
+                "Shadow batch embedded (first_id={}, rows={}, total={})",
+                rows[0].id,
+                len(rows),
+                embedded_rows,
+            )
+        except Exception as exc:
+            failed.append(int(rows[0].id))
+            logger.exception(
+                "Failed to re-embed batch starting at id {}: {}", rows[0].id, exc
+            )
+        finally:
+            sem.release()
+
+    tasks: list[asyncio.Task[None]] = []
+    last_id = 0
+    try:
+        while True:
+            await sem.acquire()
+            async with SessionLocal() as session:
+                result = await session.execute(
+                    select(QaPairORM.id, QaPairORM.question, QaPairORM.answer)
+                    .where(
+                        QaPairORM.id > last_id,
+                        QaPairORM.embedding_shadow_model.is_distinct_from(model_name),
+                    )
+                    .order_by(QaPairORM.id)
+                    .limit(batch_size)
+                )
+                rows = result.all()
+            if not rows:
+                sem.release()
+                break
+            last_id = int(rows[-1].id)
+            tasks.append(asyncio.create_task(_run(rows)))
+    finally:
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await embedder.close()
+        await close_http_pool()
+
+    logger.info(
+        "Shadow embeddings written (model={}, rows={})", model_name, embedded_rows
+    )
+    if failed:
+        raise RuntimeError(
+            f"{len(failed)} batch(es) failed (first ids {sorted(failed)}); "
+            "rerun the same command to resume"
+        )
+    return embedded_rows
+
+
+async def shadow_status() -> list[tuple[Optional[str], Optional[str], int]]:
+    """Row counts per (live model, shadow model) pair."""
+    async with SessionLocal() as session:
+        result = await session.execute(
+            select(
+                QaPairORM.embedding_model,
+                QaPairORM.embedding_shadow_model,
+                func.count(),
+            )
+            .group_by(QaPairORM.embedding_model, QaPairORM.embedding_shadow_model)
+            .order_by(func.count().desc())
+        )
+        return [(row[0], row[1], int(row[2])) for row in result.all()]
+
+
+async def verify_shadow(
+    model_name: str, *, sample: int = 100, k: int = RAG_TOP_K, seed: int = 0
+) -> dict[str, float]:
+    """
+    Pre-flip check through the shadow index: how often a sampled pair finds
+    itself first by its shadow vector, and how much of its top-k neighbourhood
+    survives the model change (mean overlap@k of live vs shadow search).
+    """
+    async with SessionLocal() as session:
+        ids = list(
+            (
+                await session.scalars(
+                    select(QaPairORM.id).where(
+                        QaPairORM.embedding_shadow_model == model_name,
+                        QaPairORM.duplicate_of.is_(None),
+                    )
+                )
+            ).all()
+        )
+        if not ids:
+            raise RuntimeError(f"No shadow embeddings for model {model_name}")
+        ids = random.Random(seed).sample(ids, min(int(sample), len(ids)))
+
+        live = SqlAlchemyQaPairRepository(session, matryoshka=False)
+        shadow = SqlAlchemyQaPairRepository(session, shadow=True)
+        live_embeddings = await live.get_embeddings(ids)
+        shadow_embeddings = await shadow.get_embeddings(ids)
+        live_hits = await live.find_top_k_many(
+            [live_embeddings[qa_id] for qa_id in ids], k
+        )
+        shadow_hits = await shadow.find_top_k_many(
+            [shadow_embeddings[qa_id] for qa_id in ids], k
+        )
+
+    self_hits = 0
+    overlap = 0.0
+    for qa_id, old, new in zip(ids, live_hits, shadow_hits, strict=True):
+        new_ids = {hit.qa_pair.id for hit in new}
+        self_hits += int(bool(new) and new[0].qa_pair.id == qa_id)
+        overlap += len(new_ids & {hit.qa_pair.id for hit in old}) / max(1, k)
+    return {
+        "sample": float(len(ids)),
+        "self_hit_rate": self_hits / len(ids),
+        "overlap_at_k": overlap / len(ids),
+    }
+
+
+async def flip_embeddings(model_name: str) -> int:
+    """
+    Make `model_name` live: swap `embedding` and `embedding_shadow` (and their
+    model names) for every row in one transaction. Readers see either the old
+    or the new column, never a mix; the previous vectors stay in the shadow,
+    so flipping back to the old model is an instant rollback.
+    """
+    async with SessionLocal() as session:
+        # Blocks concurrent writers (seeding, re-embedding) but not readers.
+        await session.execute(text("LOCK TABLE qa_pairs IN SHARE ROW EXCLUSIVE MODE"))
+        pending = await session.scalar(
+            select(func.count())
+            .select_from(QaPairORM)
+            .where(QaPairORM.embedding_shadow_model.is_distinct_from(model_name))
+        )
+        if pending:
+            raise RuntimeError(
+                f"{pending} QA pair(s) have no {model_name} shadow embedding; "
+                "run the re-embedding job first"
+            )
+        # Right-hand sides read the pre-update row, so this is a swap.
+        flipped = await session.scalar(select(func.count()).select_from(QaPairORM))
+        await session.execute(
+            update(QaPairORM)
+            .values(
+                embedding=QaPairORM.embedding_shadow,
+                embedding_model=QaPairORM.embedding_shadow_model,
+                embedding_shadow=QaPairORM.embedding,
+                embedding_shadow_model=QaPairORM.embedding_model,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        # Cached question embeddings belong to the old model.
+        await invalidate_answer_cache(session)
+        await session.commit()
+    logger.info("Embedding model flipped (model={}, rows={})", model_name, flipped)
+    return int(flipped or 0)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    setup_logging()
+
+    parser = argparse.ArgumentParser(
+        description="Re-embed qa_pairs into a shadow column and flip to it"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="Fill the shadow column")
+    run_parser.add_argument("--model", default=EMBEDDING_MODEL_NAME)
+    run_parser.add_argument("--batch-size", type=int, default=256)
+    run_parser.add_argument("--concurrency", type=int, default=4)
+    run_parser.add_argument("--retries", type=int, default=3)
+    run_parser.add_argument("--backoff", type=float, default=2.0)
+
+    sub.add_parser("status", help="Row counts per live/shadow model")
+
+    verify_parser = sub.add_parser("verify", help="Compare shadow vs live search")
+    verify_parser.add_argument("--model", default=EMBEDDING_MODEL_NAME)
+    verify_parser.add_argument("--sample", type=int, default=100)
+    verify_parser.add_argument("--k", type=int, default=RAG_TOP_K)
+
+    flip_parser = sub.add_parser("flip", help="Swap the shadow column in")
+    flip_parser.add_argument("--model", default=EMBEDDING_MODEL_NAME)
+
+    args = parser.parse_args()
+    if args.command != "status" and not args.model:
+        parser.error("--model is required when EMBEDDING_MODEL_NAME is not set")
+
+    if args.command == "run":
+        asyncio.run(
+            reembed_shadow(
+                args.model,
+                batch_size=args.batch_size,
+                concurrency=args.concurrency,
+                retries=args.retries,
+                backoff_s=args.backoff,
+            )
+        )
+    elif args.command == "status":
+        for live_model, shadow_model, count in asyncio.run(shadow_status()):
+            print(f"live={live_model} shadow={shadow_model} rows={count}")
+    elif args.command == "verify":
+        report = asyncio.run(verify_shadow(args.model, sample=args.sample, k=args.k))
+        print(
+            f"sample={int(report['sample'])} "
+            f"self_hit_rate={report['self_hit_rate']:.4f} "
+            f"overlap@{args.k}={report['overlap_at_k']:.4f}"
+        )
+    elif args.command == "flip":
+        rows = asyncio.run(flip_embeddings(args.model))
+        print(f"Flipped {rows} rows to {args.model}.")
+        print(
+            "Run VACUUM ANALYZE qa_pairs, recompute topic centroids "
+            "(scripts.vector_index topics --no-indexes) and re-export the "
+            "snapshot if one is used."
+        )
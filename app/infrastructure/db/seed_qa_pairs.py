@@ -1,16 +1,27 @@
 import asyncio
 import csv
+import hashlib
+import itertools
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional, Sequence
 
 from loguru import logger
+from sqlalchemy import delete, select
 
+from app.domain.interfaces.embedding_provider import EmbeddingProvider
+from app.domain.models.embedding import Embedding
 from app.domain.models.qa_pair import QaPair
+from app.domain.models.tokens import (
+    TokenEstimator,
+    count_qa_pair_tokens,
+    get_token_estimator,
+)
+from app.infrastructure.config import EMBEDDING_MODEL_NAME, RAG_TOKEN_ESTIMATOR
 from app.infrastructure.db.base import SessionLocal
 from app.infrastructure.db.crud import SqlAlchemyQaPairRepository
-from app.infrastructure.llm.openrouter_embedding_provider import (
-    OpenRouterEmbeddingProvider,
-)
+from app.infrastructure.db.models import SeedCheckpointORM
+from app.infrastructure.llm.factory import create_embedding_provider
+from app.infrastructure.llm.http_pool import close_http_pool
 from app.infrastructure.logging import setup_logging
 
 
@@ -25,51 +36,237 @@ def parse_bool(value: Optional[str], default: bool = True) -> bool:
     return default
 
 
-async def seed_from_csv(csv_path: str) -> None:
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def iter_csv_chunks(
+    path: Path, chunk_size: int
+) -> Iterator[tuple[int, list[dict[str, str]]]]:
+    """Stream (chunk_index, rows) without reading the whole file."""
+    with path.open(newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for chunk_index in itertools.count():
+            rows = list(itertools.islice(reader, chunk_size))
+            if not rows:
+                return
+            yield chunk_index, rows
+
+
+async def embed_with_retries(
+    embedder: EmbeddingProvider,
+    texts: Sequence[str],
+    *,
+    retries: int,
+    backoff_s: float,
+) -> Sequence[Embedding]:
+    attempt = 0
+    while True:
+        try:
+            return await embedder.embed_many(texts)
+        except Exception as exc:
+            if attempt >= retries:
+                raise
+            delay = backoff_s * 2**attempt
+            attempt += 1
+            logger.warning(
+                "Embedding chunk failed (attempt={}/{}), retrying in {:.1f}s: {}",
+                attempt,
+                retries + 1,
+                delay,
+                exc,
+            )
+            await asyncio.sleep(delay)
+
+
+def qa_embedding_text(question: str, answer: str) -> str:
+    return f"{question}\n{answer}"
+
+
+def _to_qa_pair(
+    row: dict[str, str],
+    embedding: Embedding,
+    embedding_model: Optional[str],
+    estimator: TokenEstimator,
+) -> QaPair:
+    return QaPair(
+        id=None,
+        question=row["question"],
+        answer=row["answer"],
+        source_url=(row.get("source_url") or None),
+        topic=row["topic"],
+        is_generated=parse_bool(row.get("is_generated"), default=True),
+        embedding=embedding,
+        created_at=None,
+        embedding_model=embedding_model,
+        token_count=count_qa_pair_tokens(row["question"], row["answer"], estimator),
+    )
+
+
+async def _completed_chunks(source_hash: str, chunk_size: int) -> set[int]:
+    async with SessionLocal() as session:
+        rows = (
+            await session.execute(
+                select(
+                    SeedCheckpointORM.chunk_size, SeedCheckpointORM.chunk_index
+                ).where(SeedCheckpointORM.source_hash == source_hash)
+            )
+        ).all()
+    # Chunk boundaries depend on chunk_size: resuming with another size
+    # would skip the wrong rows and insert the seeded ones again.
+    other_sizes = sorted({row.chunk_size for row in rows} - {chunk_size})
+    if other_sizes:
+        raise RuntimeError(
+            f"File was partly seeded with --chunk-size {other_sizes}; "
+            "rerun with that size to resume"
+        )
+    return {row.chunk_index for row in rows}
+
+
+async def _seed_chunk(
+    *,
+    embedder: EmbeddingProvider,
+    embedding_model: Optional[str],
+    estimator: TokenEstimator,
+    path: Path,
+    source_hash: str,
+    chunk_size: int,
+    chunk_index: int,
+    rows: list[dict[str, str]],
+    retries: int,
+    backoff_s: float,
+) -> None:
+    texts = [qa_embedding_text(row["question"], row["answer"]) for row in rows]
+    embeddings = await embed_with_retries(
+        embedder, texts, retries=retries, backoff_s=backoff_s
+    )
+
+    # QA pairs and their checkpoint commit together: a chunk is either fully
+    # seeded and skipped on rerun, or not seeded at all.
+    async with SessionLocal() as session:
+        repo = SqlAlchemyQaPairRepository(session)
+        await repo.add_many(
+            [
+                _to_qa_pair(row, emb, embedding_model, estimator)
+                for row, emb in zip(rows, embeddings, strict=True)
+            ]
+        )
+        session.add(
+            SeedCheckpointORM(
+                source_hash=source_hash,
+                chunk_size=chunk_size,
+                chunk_index=chunk_index,
+                source_path=str(path),
+                row_count=len(rows),
+            )
+        )
+        await session.commit()
+    logger.info("Seeded chunk (index={}, rows={})", chunk_index, len(rows))
+
+
+async def seed_from_csv(
+    csv_path: str,
+    *,
+    chunk_size: int = 256,
+    concurrency: int = 4,
+    retries: int = 3,
+    backoff_s: float = 2.0,
+    restart: bool = False,
+    allow_duplicates: bool = False,
+) -> None:
     path = Path(csv_path)
     if not path.exists():
         raise FileNotFoundError(path)
+    if restart and not allow_duplicates:
+        # Pairs do not record their source file, so they cannot be removed here.
+        raise ValueError(
+            "--restart seeds every chunk again and duplicates pairs already "
+            "inserted from this file; pass --allow-duplicates to confirm"
+        )
 
+    chunk_size = max(1, int(chunk_size))
+    source_hash = file_sha256(path)
+    if restart:
+        async with SessionLocal() as session:
+            await session.execute(
+                delete(SeedCheckpointORM).where(
+                    SeedCheckpointORM.source_hash == source_hash
+                )
+            )
+            await session.commit()
+    done = await _completed_chunks(source_hash, chunk_size)
+    logger.info(
+        "Seeding QA pairs from CSV (path={}, chunk_size={}, concurrency={}, already_done={})",
+        path,
+        chunk_size,
+        concurrency,
+        len(done),
+    )
+
+    # New rows must match the live column, which may already have been
+    # flipped to a model other than EMBEDDING_MODEL_NAME.
     async with SessionLocal() as session:
-        repo = SqlAlchemyQaPairRepository(session)
-        embedder = OpenRouterEmbeddingProvider()
+        embedding_model = (
+            await SqlAlchemyQaPairRepository(session).active_embedding_model()
+            or EMBEDDING_MODEL_NAME
+        )
+    estimator = get_token_estimator(RAG_TOKEN_ESTIMATOR)
+    embedder = create_embedding_provider(model_name=embedding_model)
+    sem = asyncio.Semaphore(max(1, int(concurrency)))
+    failed: list[int] = []
+    seeded_rows = 0
 
+    async def _run(chunk_index: int, rows: list[dict[str, str]]) -> None:
+        nonlocal seeded_rows
         try:
-            with path.open(newline="", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                rows = list(reader)
-
-            questions = [f'{row["question"]}\n{row["answer"]}' for row in rows]
-            logger.info(
-                "Embedding questions+answers from CSV (count={}, path={})",
-                len(questions),
-                path,
+            await _seed_chunk(
+                embedder=embedder,
+                embedding_model=embedding_model,
+                estimator=estimator,
+                path=path,
+                source_hash=source_hash,
+                chunk_size=chunk_size,
+                chunk_index=chunk_index,
+                rows=rows,
+                retries=retries,
+                backoff_s=backoff_s,
             )
-            embeddings = await embedder.embed_many(questions)
-
-            qa_objects: list[QaPair] = []
-
-            for row, emb in zip(rows, embeddings, strict=False):
-                qa = QaPair(
-                    id=None,
-                    question=row["question"],
-                    answer=row["answer"],
-                    source_url=(row.get("source_url") or None),
-                    topic=row["topic"],
-                    is_generated=parse_bool(row.get("is_generated"), default=True),
-                    embedding=emb,
-                    created_at=None,
-                )
-                qa_objects.append(qa)
+            seeded_rows += len(rows)
+        except Exception as exc:
+            failed.append(chunk_index)
+            logger.exception("Failed to seed chunk {}: {}", chunk_index, exc)
+        finally:
+            sem.release()
 
-            await repo.add_many(qa_objects)
-            await session.commit()
-            logger.info("Inserted QA pairs into database (count={})", len(qa_objects))
+    tasks: list[asyncio.Task[None]] = []
+    try:
+        for chunk_index, rows in iter_csv_chunks(path, chunk_size):
+            if chunk_index in done:
+                continue
+            # Acquire before reading on, so at most `concurrency` chunks are
+            # held in memory.
+            await sem.acquire()
+            tasks.append(asyncio.create_task(_run(chunk_index, rows)))
+    finally:
+        # Chunks already started finish (and commit) even if reading failed.
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await embedder.close()
+        await close_http_pool()
 
-        except Exception as exc:
-            await session.rollback()
-            logger.exception("Failed to seed QA pairs from CSV: {}", exc)
-            raise
+    logger.info(
+        "Inserted QA pairs into database (count={}, skipped_chunks={})",
+        seeded_rows,
+        len(done),
+    )
+    if failed:
+        raise RuntimeError(
+            f"{len(failed)} chunk(s) failed ({sorted(failed)}); "
+            "rerun the same command to resume"
+        )
 
 
 if __name__ == "__main__":
@@ -79,6 +276,30 @@ if __name__ == "__main__":
 
     parser = argparse.ArgumentParser()
     parser.add_argument("--csv", required=True, help="Path to qa_pairs CSV file")
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--backoff", type=float, default=2.0)
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Forget checkpoints of this file and seed every chunk again",
+    )
+    parser.add_argument(
+        "--allow-duplicates",
+        action="store_true",
+        help="Confirm that --restart may insert pairs that are already seeded",
+    )
     args = parser.parse_args()
 
-    asyncio.run(seed_from_csv(args.csv))
+    asyncio.run(
+        seed_from_csv(
+            args.csv,
+            chunk_size=args.chunk_size,
+            concurrency=args.concurrency,
+            retries=args.retries,
+            backoff_s=args.backoff,
+            restart=args.restart,
+            allow_duplicates=args.allow_duplicates,
+        )
+    )
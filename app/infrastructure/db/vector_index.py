@@ -0,0 +1,196 @@
+import hashlib
+import json
+import math
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+from loguru import logger
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.models.embedding import Embedding, as_embedding
+from app.infrastructure.config import (
+    RAG_HNSW_EF_CONSTRUCTION,
+    RAG_HNSW_M,
+    RAG_VECTOR_TUNING_PATH,
+)
+from app.infrastructure.db.models import QaPairORM
+
+INDEX_KIND_HNSW = "hnsw"
+INDEX_KIND_IVFFLAT = "ivfflat"
+INDEX_KINDS = (INDEX_KIND_HNSW, INDEX_KIND_IVFFLAT)
+
+_INDEX_NAMES = {
+    INDEX_KIND_HNSW: "ix_qa_pairs_embedding_hnsw",
+    INDEX_KIND_IVFFLAT: "ix_qa_pairs_embedding_ivfflat",
+}
+_TOPIC_INDEX_PREFIX = "ix_qa_pairs_embedding_topic_"
+
+
+def auto_ivfflat_lists(rows: int) -> int:
+    """
+    pgvector recommendation: rows / 1000 up to 1M rows, sqrt(rows) above.
+    """
+    if rows <= 1_000_000:
+        return max(1, rows // 1000)
+    return max(1, int(math.sqrt(rows)))
+
+
+async def count_qa_pairs(
+    session: AsyncSession, *, exclude_duplicates: bool = False
+) -> int:
+    stmt = select(func.count()).select_from(QaPairORM)
+    if exclude_duplicates:
+        stmt = stmt.where(QaPairORM.duplicate_of.is_(None))
+    return int(await session.scalar(stmt) or 0)
+
+
+async def rebuild_vector_index(
+    session: AsyncSession,
+    kind: str,
+    *,
+    lists: Optional[int] = None,
+    m: int = RAG_HNSW_M,
+    ef_construction: int = RAG_HNSW_EF_CONSTRUCTION,
+) -> dict[str, Any]:
+    """
+    Drop every vector index on qa_pairs.embedding and build the requested one.
+    """
+    if kind not in INDEX_KINDS:
+        raise ValueError(f"Unknown vector index kind: {kind}")
+
+    for name in _INDEX_NAMES.values():
+        await session.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+    params: dict[str, Any]
+    if kind == INDEX_KIND_HNSW:
+        params = {"m": int(m), "ef_construction": int(ef_construction)}
+    else:
+        rows = await count_qa_pairs(session)
+        params = {"lists": int(lists) if lists else auto_ivfflat_lists(rows)}
+
+    with_clause = ", ".join(f"{key} = {value}" for key, value in params.items())
+    await session.execute(
+        text(
+            f"CREATE INDEX {_INDEX_NAMES[kind]} ON qa_pairs "
+            f"USING {kind} (embedding vector_cosine_ops) WITH ({with_clause})"
+        )
+    )
+    logger.info("Vector index rebuilt (kind={}, params={})", kind, params)
+    return params
+
+
+def topic_index_name(topic: str) -> str:
+    # Topics are free-form (Cyrillic, spaces), so name the index by a digest.
+    digest = hashlib.sha1(topic.encode("utf-8")).hexdigest()[:12]
+    return f"{_TOPIC_INDEX_PREFIX}{digest}"
+
+
+def _sql_string(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+async def list_topics(session: AsyncSession) -> list[str]:
+    result = await session.scalars(
+        select(QaPairORM.topic).distinct().order_by(QaPairORM.topic)
+    )
+    return list(result.all())
+
+
+async def rebuild_topic_indexes(
+    session: AsyncSession,
+    *,
+    m: int = RAG_HNSW_M,
+    ef_construction: int = RAG_HNSW_EF_CONSTRUCTION,
+) -> dict[str, str]:
+    """
+    Drop all per-topic vector indexes and build one partial HNSW index per
+    topic (`WHERE topic = '...'`). Filtered queries scan only the partition.
+    """
+    result = await session.execute(
+        text(
+            "SELECT indexname FROM pg_indexes "
+            "WHERE tablename = 'qa_pairs' AND indexname LIKE :prefix"
+        ),
+        {"prefix": f"{_TOPIC_INDEX_PREFIX}%"},
+    )
+    for name in [row.indexname for row in result.all()]:
+        await session.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+    indexes: dict[str, str] = {}
+    for topic in await list_topics(session):
+        name = topic_index_name(topic)
+        await session.execute(
+            text(
+                f"CREATE INDEX {name} ON qa_pairs "
+                f"USING hnsw (embedding vector_cosine_ops) "
+                f"WITH (m = {int(m)}, ef_construction = {int(ef_construction)}) "
+                f"WHERE topic = {_sql_string(topic)}"
+            )
+        )
+        indexes[topic] = name
+    logger.info("Per-topic vector indexes rebuilt (topics={})", len(indexes))
+    return indexes
+
+
+async def compute_topic_centroids(
+    session: AsyncSession, topics: Optional[Sequence[str]] = None
+) -> dict[str, Embedding]:
+    """
+    Mean embedding per topic, computed by pgvector's avg(vector).
+    """
+    centroid = func.avg(
+        QaPairORM.embedding, type_=QaPairORM.__table__.c.embedding.type
+    ).label("centroid")
+    stmt = select(QaPairORM.topic, centroid).where(QaPairORM.duplicate_of.is_(None))
+    if topics:
+        stmt = stmt.where(QaPairORM.topic.in_(list(topics)))
+    result = await session.execute(stmt.group_by(QaPairORM.topic))
+    return {row.topic: as_embedding(row.centroid) for row in result.all()}
+
+
+@lru_cache(maxsize=1)
+def load_vector_tuning(path: str = RAG_VECTOR_TUNING_PATH) -> dict[str, Any]:
+    tuning_path = Path(path)
+    if not tuning_path.is_file():
+        return {}
+    raw = json.loads(tuning_path.read_text(encoding="utf-8"))
+    if not isinstance(raw, dict):
+        raise ValueError(f"Invalid vector tuning JSON format: {tuning_path}")
+    return raw
+
+
+def tuned_ivfflat_probes() -> Optional[int]:
+    tuning = load_vector_tuning()
+    if tuning.get("index_kind") != INDEX_KIND_IVFFLAT:
+        return None
+    probes = tuning.get("probes")
+    return int(probes) if probes else None
+
+
+def save_vector_tuning(
+    tuning: dict[str, Any], path: str = RAG_VECTOR_TUNING_PATH
+) -> Path:
+    tuning_path = Path(path)
+    tuning_path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {**tuning, "tuned_at": datetime.now(timezone.utc).isoformat()}
+    tuning_path.write_text(
+        json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+    load_vector_tuning.cache_clear()
+    logger.info("Vector index tuning saved (path={}, tuning={})", tuning_path, payload)
+    return tuning_path
+
+
+async def existing_vector_index_kinds(session: AsyncSession) -> list[str]:
+    result = await session.execute(
+        text(
+            "SELECT indexname FROM pg_indexes "
+            "WHERE tablename = 'qa_pairs' AND indexname = ANY(:names)"
+        ),
+        {"names": list(_INDEX_NAMES.values())},
+    )
+    names = {row.indexname for row in result.all()}
+    return [kind for kind, name in _INDEX_NAMES.items() if name in names]
@@ -0,0 +1,138 @@
+import asyncio
+import time
+from collections import Counter
+from typing import Optional, Sequence
+
+from loguru import logger
+
+from app.domain.interfaces.embedding_provider import EmbeddingProvider
+from app.domain.models.embedding import Embedding
+from app.infrastructure.config import (
+    EMBEDDING_BATCH_MAX_SIZE,
+    EMBEDDING_BATCH_MAX_WAIT_MS,
+)
+
+
+class _Pending:
+    __slots__ = ("text", "future", "enqueued_at")
+
+    def __init__(self, text: str, future: "asyncio.Future[Embedding]") -> None:
+        self.text = text
+        self.future = future
+        self.enqueued_at = time.perf_counter()
+
+
+class BatchingEmbeddingProvider(EmbeddingProvider):
+    """
+    Coalesces concurrent embed() calls into one upstream embed_many() request.
+
+    A batch is sent when it reaches `max_batch_size` texts or `max_wait_ms`
+    after its first text arrived, whichever comes first. embed_many() calls
+    are already batched and go straight to the inner provider.
+    """
+
+    def __init__(
+        self,
+        inner: EmbeddingProvider,
+        *,
+        max_batch_size: int = EMBEDDING_BATCH_MAX_SIZE,
+        max_wait_ms: float = EMBEDDING_BATCH_MAX_WAIT_MS,
+    ) -> None:
+        self._inner = inner
+        self._max_batch_size = max(1, int(max_batch_size))
+        self._max_wait_s = max(0.0, float(max_wait_ms)) / 1000
+        self._pending: list[_Pending] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+        self.batch_sizes: Counter[int] = Counter()
+        self.queue_delay_ms_total = 0.0
+        self.queue_delay_ms_max = 0.0
+
+    async def embed(self, text: str) -> Embedding:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[Embedding] = loop.create_future()
+        self._pending.append(_Pending(text, future))
+
+        if len(self._pending) >= self._max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._max_wait_s, self._flush)
+        return await future
+
+    async def embed_many(self, texts: Sequence[str]) -> Sequence[Embedding]:
+        return await self._inner.embed_many(texts)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        # Callers cancelled while queued do not need an embedding.
+        batch = [item for item in batch if not item.future.done()]
+        if not batch:
+            return
+
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[_Pending]) -> None:
+        sent_at = time.perf_counter()
+        delays_ms = [(sent_at - item.enqueued_at) * 1000 for item in batch]
+        self.batch_sizes[len(batch)] += 1
+        self.queue_delay_ms_total += sum(delays_ms)
+        self.queue_delay_ms_max = max(self.queue_delay_ms_max, *delays_ms)
+        logger.debug(
+            "Embedding micro-batch sent (size={}, max_queue_delay_ms={:.2f})",
+            len(batch),
+            max(delays_ms),
+        )
+
+        try:
+            embeddings = await self._inner.embed_many([item.text for item in batch])
+            if len(embeddings) != len(batch):
+                raise RuntimeError(
+                    f"Expected {len(batch)} embeddings, got {len(embeddings)}"
+                )
+        except Exception as exc:
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(exc)
+            return
+
+        for item, embedding in zip(batch, embeddings, strict=True):
+            if not item.future.done():
+                item.future.set_result(embedding)
+
+    @property
+    def batches(self) -> int:
+        return sum(self.batch_sizes.values())
+
+    @property
+    def mean_batch_size(self) -> float:
+        texts = sum(size * count for size, count in self.batch_sizes.items())
+        return texts / self.batches if self.batches else 0.0
+
+    @property
+    def mean_queue_delay_ms(self) -> float:
+        texts = sum(size * count for size, count in self.batch_sizes.items())
+        return self.queue_delay_ms_total / texts if texts else 0.0
+
+    def log_stats(self) -> None:
+        logger.info(
+            "Embedding micro-batching stats (batches={}, mean_size={:.2f}, max_size={}, mean_queue_delay_ms={:.2f}, max_queue_delay_ms={:.2f})",
+            self.batches,
+            self.mean_batch_size,
+            max(self.batch_sizes, default=0),
+            self.mean_queue_delay_ms,
+            self.queue_delay_ms_max,
+        )
+
+    async def close(self) -> None:
+        if self._pending:
+            self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self.log_stats()
+        await self._inner.close()
@@ -0,0 +1,135 @@
+import hashlib
+import unicodedata
+from collections import OrderedDict
+from typing import Optional, Sequence
+
+from loguru import logger
+
+from app.domain.interfaces.embedding_cache import EmbeddingCache
+from app.domain.interfaces.embedding_provider import EmbeddingProvider
+from app.domain.models.embedding import Embedding
+from app.infrastructure.config import EMBEDDING_CACHE_MEMORY_SIZE
+
+
+def normalize_embedding_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def embedding_cache_key(text: str) -> str:
+    return hashlib.sha256(normalize_embedding_text(text).encode("utf-8")).hexdigest()
+
+
+class CachedEmbeddingProvider(EmbeddingProvider):
+    """
+    Caches embeddings by (model name, sha256 of the whitespace/NFC-normalized
+    text): a small in-process LRU in front of an optional persistent store.
+
+    Identical texts inside one embed_many batch are embedded once, and only
+    cache misses are sent upstream. Store failures are logged and treated as
+    misses, so the cache never breaks embedding.
+    """
+
+    def __init__(
+        self,
+        inner: EmbeddingProvider,
+        *,
+        model_name: str,
+        store: Optional[EmbeddingCache] = None,
+        memory_size: int = EMBEDDING_CACHE_MEMORY_SIZE,
+    ) -> None:
+        self._inner = inner
+        self._model_name = model_name
+        self._store = store
+        self._memory_size = max(0, int(memory_size))
+        self._memory: OrderedDict[str, Embedding] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.batch_duplicates = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def _remember(self, key: str, embedding: Embedding) -> None:
+        if not self._memory_size:
+            return
+        self._memory[key] = embedding
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._memory_size:
+            self._memory.popitem(last=False)
+
+    async def _load(self, keys: Sequence[str]) -> dict[str, Embedding]:
+        found: dict[str, Embedding] = {}
+        for key in keys:
+            embedding = self._memory.get(key)
+            if embedding is not None:
+                self._memory.move_to_end(key)
+                found[key] = embedding
+
+        missing = [key for key in keys if key not in found]
+        if missing and self._store is not None:
+            try:
+                stored = await self._store.get_many(self._model_name, missing)
+            except Exception as exc:
+                logger.warning("Embedding cache lookup failed: {}", exc)
+                stored = {}
+            for key, embedding in stored.items():
+                self._remember(key, embedding)
+                found[key] = embedding
+        return found
+
+    async def embed(self, text: str) -> Embedding:
+        embeddings = await self.embed_many([text])
+        return embeddings[0]
+
+    async def embed_many(self, texts: Sequence[str]) -> Sequence[Embedding]:
+        if not texts:
+            return []
+
+        keys = [embedding_cache_key(text) for text in texts]
+        # First occurrence of each key; its original text is what gets embedded.
+        unique: dict[str, str] = {}
+        for key, text in zip(keys, texts, strict=True):
+            unique.setdefault(key, text)
+
+        found = await self._load(list(unique))
+        missing = [key for key in unique if key not in found]
+        if missing:
+            fresh = await self._inner.embed_many([unique[key] for key in missing])
+            computed = dict(zip(missing, fresh, strict=True))
+            for key, embedding in computed.items():
+                self._remember(key, embedding)
+            found.update(computed)
+            if self._store is not None:
+                try:
+                    await self._store.put_many(self._model_name, computed)
+                except Exception as exc:
+                    logger.warning("Embedding cache write failed: {}", exc)
+
+        self.hits += len(unique) - len(missing)
+        self.misses += len(missing)
+        self.batch_duplicates += len(texts) - len(unique)
+        logger.debug(
+            "Embedding cache (model={}, texts={}, unique={}, misses={}, hit_ratio={:.3f})",
+            self._model_name,
+            len(texts),
+            len(unique),
+            len(missing),
+            self.hit_ratio,
+        )
+        return [found[key] for key in keys]
+
+    def log_stats(self) -> None:
+        logger.info(
+            "Embedding cache stats (model={}, hits={}, misses={}, hit_ratio={:.3f}, batch_duplicates={})",
+            self._model_name,
+            self.hits,
+            self.misses,
+            self.hit_ratio,
+            self.batch_duplicates,
+        )
+
+    async def close(self) -> None:
+        self.log_stats()
+        await self._inner.close()
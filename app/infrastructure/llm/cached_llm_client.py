@@ -0,0 +1,133 @@
+import hashlib
+import json
+from typing import Optional
+
+from loguru import logger
+
+from app.domain.interfaces.llm_client import LlmClient, LlmDeltaHandler
+from app.domain.interfaces.llm_response_cache import LlmResponseCache
+from app.domain.models.llm_generation import LlmGeneration
+from app.pricing.pricing import estimate_llm_cost_usd
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def llm_cache_key(
+    *, model_name: str, temperature: float, system_prompt: str, prompt: str
+) -> str:
+    payload = json.dumps(
+        [model_name, float(temperature), _sha256(system_prompt), _sha256(prompt)]
+    )
+    return _sha256(payload)
+
+
+class CachedLlmClient:
+    """
+    Exact response cache in front of an LLM client: a request with the same
+    model, temperature, system prompt and prompt returns the stored
+    generation (flagged `cached`) instead of calling the model again. Store
+    failures are logged and treated as misses. Answers produced by a fallback
+    model are not stored under the primary model's key.
+    """
+
+    def __init__(
+        self,
+        inner: LlmClient,
+        *,
+        model_name: str,
+        temperature: float,
+        system_prompt: str,
+        store: LlmResponseCache,
+    ) -> None:
+        self._inner = inner
+        self._model_name = model_name
+        self._temperature = temperature
+        self._system_prompt = system_prompt
+        self._store = store
+        self.hits = 0
+        self.misses = 0
+        self.saved_tokens = 0
+        self.saved_cost_usd = 0.0
+
+    def _key(self, prompt: str) -> str:
+        return llm_cache_key(
+            model_name=self._model_name,
+            temperature=self._temperature,
+            system_prompt=self._system_prompt,
+            prompt=prompt,
+        )
+
+    async def _lookup(self, key: str) -> Optional[LlmGeneration]:
+        try:
+            generation = await self._store.get(key)
+        except Exception as exc:
+            logger.warning("LLM response cache lookup failed: {}", exc)
+            generation = None
+        if generation is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        usage = generation.usage
+        if usage is not None:
+            self.saved_tokens += usage.total_tokens or 0
+            self.saved_cost_usd += (
+                estimate_llm_cost_usd(
+                    model_name=generation.model or self._model_name,
+                    prompt_tokens=usage.prompt_tokens,
+                    completion_tokens=usage.completion_tokens,
+                )
+                or 0.0
+            )
+        logger.debug("LLM response cache hit (model={})", self._model_name)
+        return generation
+
+    async def _save(self, key: str, generation: LlmGeneration) -> None:
+        if generation.call is not None and generation.call.model != self._model_name:
+            logger.debug(
+                "Not caching fallback answer (model={}, keyed model={})",
+                generation.call.model,
+                self._model_name,
+            )
+            return
+        try:
+            await self._store.put(key, self._model_name, generation)
+        except Exception as exc:
+            logger.warning("LLM response cache write failed: {}", exc)
+
+    async def generate(self, prompt: str) -> LlmGeneration:
+        key = self._key(prompt)
+        cached = await self._lookup(key)
+        if cached is not None:
+            return cached
+        generation = await self._inner.generate(prompt)
+        await self._save(key, generation)
+        return generation
+
+    async def generate_stream(
+        self, prompt: str, on_delta: LlmDeltaHandler
+    ) -> LlmGeneration:
+        key = self._key(prompt)
+        cached = await self._lookup(key)
+        if cached is not None:
+            await on_delta(cached.text)
+            return cached
+        generation = await self._inner.generate_stream(prompt, on_delta)
+        await self._save(key, generation)
+        return generation
+
+    def log_stats(self) -> None:
+        logger.info(
+            "LLM response cache stats (model={}, hits={}, misses={}, saved_tokens={}, saved_cost_usd={:.6f})",
+            self._model_name,
+            self.hits,
+            self.misses,
+            self.saved_tokens,
+            self.saved_cost_usd,
+        )
+
+    async def close(self) -> None:
+        self.log_stats()
+        await self._inner.close()
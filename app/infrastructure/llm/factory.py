@@ -0,0 +1,175 @@
+from typing import Optional, Sequence
+
+from app.domain.interfaces.embedding_provider import EmbeddingProvider
+from app.domain.interfaces.llm_client import LlmClient
+from app.infrastructure.config import (
+    EMBEDDING_BACKEND,
+    EMBEDDING_BASE_URL,
+    EMBEDDING_CACHE,
+    EMBEDDING_MICRO_BATCHING,
+    EMBEDDING_MODEL_NAME,
+    EMBEDDING_TIMEOUT,
+    LLM_BACKEND,
+    LLM_CACHE,
+    OPENROUTER_BASE_URL,
+    OPENROUTER_MODEL_NAME,
+    OPENROUTER_TEMPERATURE,
+    OPENROUTER_TIMEOUT,
+    RECORDINGS_PATH,
+    SYSTEM_PROMPT_NAME,
+)
+from app.infrastructure.db.base import SessionLocal
+from app.infrastructure.db.embedding_cache import SqlAlchemyEmbeddingCache
+from app.infrastructure.db.llm_response_cache import SqlAlchemyLlmResponseCache
+from app.infrastructure.llm.batching_embedding_provider import (
+    BatchingEmbeddingProvider,
+)
+from app.infrastructure.llm.cached_embedding_provider import CachedEmbeddingProvider
+from app.infrastructure.llm.cached_llm_client import CachedLlmClient
+from app.infrastructure.llm.fake_embedding_provider import FakeEmbeddingProvider
+from app.infrastructure.llm.fake_llm_client import FakeLlmClient
+from app.infrastructure.llm.openrouter_embedding_provider import (
+    OpenRouterEmbeddingProvider,
+)
+from app.infrastructure.llm.openrouter_llm_client import OpenRouterLlmClient
+from app.infrastructure.llm.recording import (
+    RecordingStore,
+    RecordReplayEmbeddingProvider,
+    RecordReplayLlmClient,
+)
+from app.prompts.loader import load_prompt
+
+BACKEND_OPENROUTER = "openrouter"
+BACKEND_FAKE = "fake"
+BACKEND_RECORD = "record"
+BACKEND_REPLAY = "replay"
+
+
+def _base_embedding_provider(
+    backend: str,
+    *,
+    model_name: Optional[str],
+    base_url: str,
+    timeout: float,
+) -> tuple[EmbeddingProvider, str]:
+    resolved_model_name = model_name or EMBEDDING_MODEL_NAME
+    if backend == BACKEND_OPENROUTER:
+        client = OpenRouterEmbeddingProvider(
+            model_name=model_name, base_url=base_url, timeout=timeout
+        )
+        return client, client.model_name
+    if backend == BACKEND_FAKE:
+        # Own cache namespace: fake vectors never mix with real ones.
+        fake_model_name = f"fake/{resolved_model_name or 'hash'}"
+        return FakeEmbeddingProvider(model_name=fake_model_name), fake_model_name
+    if backend in (BACKEND_RECORD, BACKEND_REPLAY):
+        if not resolved_model_name:
+            raise RuntimeError("EMBEDDING_MODEL_NAME is not set")
+        inner = (
+            OpenRouterEmbeddingProvider(
+                model_name=resolved_model_name, base_url=base_url, timeout=timeout
+            )
+            if backend == BACKEND_RECORD
+            else None
+        )
+        provider = RecordReplayEmbeddingProvider(
+            inner,
+            model_name=resolved_model_name,
+            store=RecordingStore(RECORDINGS_PATH, "embeddings"),
+        )
+        return provider, resolved_model_name
+    raise ValueError(f"Unknown EMBEDDING_BACKEND: {backend}")
+
+
+def create_embedding_provider(
+    *,
+    model_name: Optional[str] = None,
+    base_url: str = EMBEDDING_BASE_URL,
+    timeout: float = EMBEDDING_TIMEOUT,
+    cache: bool = EMBEDDING_CACHE,
+    micro_batching: bool = EMBEDDING_MICRO_BATCHING,
+    backend: str = EMBEDDING_BACKEND,
+) -> EmbeddingProvider:
+    provider, resolved_model_name = _base_embedding_provider(
+        backend, model_name=model_name, base_url=base_url, timeout=timeout
+    )
+    # Recording must see every text, so the cache stays out of its way.
+    if cache and backend != BACKEND_RECORD:
+        provider = CachedEmbeddingProvider(
+            provider,
+            model_name=resolved_model_name,
+            store=SqlAlchemyEmbeddingCache(SessionLocal),
+        )
+    if micro_batching:
+        # Outermost, so a coalesced batch is deduped and cache-checked at once.
+        provider = BatchingEmbeddingProvider(provider)
+    return provider
+
+
+def create_llm_client(
+    *,
+    model_name: Optional[str] = None,
+    temperature: Optional[float] = None,
+    system_prompt_name: str = SYSTEM_PROMPT_NAME,
+    base_url: str = OPENROUTER_BASE_URL,
+    timeout: float = OPENROUTER_TIMEOUT,
+    backend: str = LLM_BACKEND,
+    cache: bool = LLM_CACHE,
+    fallback_models: Optional[Sequence[str]] = None,
+) -> LlmClient:
+    resolved_model_name = model_name or OPENROUTER_MODEL_NAME
+    resolved_temperature = (
+        OPENROUTER_TEMPERATURE if temperature is None else float(temperature)
+    )
+    if backend == BACKEND_OPENROUTER:
+        client: LlmClient = OpenRouterLlmClient(
+            model_name=model_name,
+            temperature=temperature,
+            system_prompt_name=system_prompt_name,
+            base_url=base_url,
+            timeout=timeout,
+            fallback_models=fallback_models,
+        )
+        # Only real calls are worth caching; fake and replay are already free
+        # and recording must see every request.
+        if cache and resolved_model_name:
+            client = CachedLlmClient(
+                client,
+                model_name=resolved_model_name,
+                temperature=resolved_temperature,
+                system_prompt=load_prompt(system_prompt_name),
+                store=SqlAlchemyLlmResponseCache(SessionLocal),
+            )
+        return client
+
+    if backend == BACKEND_FAKE:
+        return FakeLlmClient(
+            model_name=resolved_model_name or "fake",
+            system_prompt=load_prompt(system_prompt_name),
+        )
+    if backend in (BACKEND_RECORD, BACKEND_REPLAY):
+        if not resolved_model_name:
+            raise RuntimeError("OPENROUTER_MODEL_NAME is not set")
+        inner = (
+            OpenRouterLlmClient(
+                model_name=resolved_model_name,
+                temperature=temperature,
+                system_prompt_name=system_prompt_name,
+                base_url=base_url,
+                timeout=timeout,
+                fallback_models=fallback_models,
+            )
+            if backend == BACKEND_RECORD
+            else None
+        )
+        return RecordReplayLlmClient(
+            inner,
+            # Keyed by the prompt text, not its name: editing it invalidates.
+            namespace=(
+                resolved_model_name,
+                resolved_temperature,
+                load_prompt(system_prompt_name),
+            ),
+            store=RecordingStore(RECORDINGS_PATH, "llm"),
+        )
+    raise ValueError(f"Unknown LLM_BACKEND: {backend}")
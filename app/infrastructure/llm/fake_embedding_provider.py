@@ -0,0 +1,91 @@
+import hashlib
+import re
+from typing import Optional, Sequence
+
+import numpy as np
+import numpy.typing as npt
+from loguru import logger
+
+from app.domain.models.embedding import Embedding, l2_normalize_rows
+from app.infrastructure.config import (
+    EMBEDDING_FAKE_DIM,
+    EMBEDDING_FAKE_LATENCY_MS,
+    FAKE_SEED,
+)
+from app.infrastructure.llm.cached_embedding_provider import normalize_embedding_text
+from app.infrastructure.llm.latency_model import LatencyModel
+
+_WORD_RE = re.compile(r"\w+")
+
+
+class FakeEmbeddingProvider:
+    """
+    Deterministic offline embeddings: word unigrams and bigrams are feature
+    hashed into `dim` signed buckets and the result is L2-normalized, so texts
+    sharing words stay close by cosine. Identical inputs give identical vectors
+    across processes; each call sleeps for a sampled latency.
+    """
+
+    def __init__(
+        self,
+        *,
+        model_name: str,
+        dim: int = EMBEDDING_FAKE_DIM,
+        latency: Optional[LatencyModel] = None,
+        seed: int = FAKE_SEED,
+    ) -> None:
+        if dim <= 0:
+            raise ValueError("EMBEDDING_FAKE_DIM must be positive")
+        self._model = model_name
+        self._dim = int(dim)
+        self._key = str(seed).encode("utf-8")
+        self._latency = latency or LatencyModel(EMBEDDING_FAKE_LATENCY_MS, seed=seed)
+
+    @property
+    def model_name(self) -> str:
+        return self._model
+
+    def _hash(self, feature: str) -> int:
+        digest = hashlib.blake2b(
+            feature.encode("utf-8"), digest_size=8, key=self._key
+        ).digest()
+        return int.from_bytes(digest, "little")
+
+    def _features(self, text: str) -> list[str]:
+        words = _WORD_RE.findall(normalize_embedding_text(text).lower())
+        if not words:
+            return [text]
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def _embed_matrix(self, texts: Sequence[str]) -> npt.NDArray[np.float32]:
+        matrix = np.zeros((len(texts), self._dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            hashes = np.fromiter(
+                (self._hash(feature) for feature in self._features(text)),
+                dtype=np.uint64,
+            )
+            signs = np.where(hashes >> np.uint64(63), 1.0, -1.0).astype(np.float32)
+            np.add.at(
+                matrix[row], (hashes % np.uint64(self._dim)).astype(np.intp), signs
+            )
+        return l2_normalize_rows(matrix)
+
+    async def embed(self, text: str) -> Embedding:
+        embeddings = await self.embed_many([text])
+        return embeddings[0]
+
+    async def embed_many(self, texts: Sequence[str]) -> Sequence[Embedding]:
+        if not texts:
+            return []
+
+        delay_ms = await self._latency.sleep()
+        logger.debug(
+            "Fake embeddings generated (model={}, count={}, latency_ms={:.1f})",
+            self._model,
+            len(texts),
+            delay_ms,
+        )
+        return list(self._embed_matrix(texts))
+
+    async def close(self) -> None:
+        return None
@@ -0,0 +1,97 @@
+import asyncio
+import hashlib
+import random
+import re
+from typing import Optional
+
+from loguru import logger
+
+from app.domain.interfaces.llm_client import LlmDeltaHandler
+from app.domain.models.llm_generation import LlmGeneration, LlmUsage
+from app.domain.models.tokens import estimate_tokens
+from app.infrastructure.config import (
+    FAKE_SEED,
+    LLM_FAKE_COMPLETION_TOKENS,
+    LLM_FAKE_FAILURE_RATE,
+    LLM_FAKE_LATENCY_MS,
+)
+from app.infrastructure.llm.latency_model import LatencyModel
+
+_WORD_RE = re.compile(r"\w+")
+_STREAM_WORDS_PER_DELTA = 4
+
+
+class FakeLlmClient:
+    """
+    Offline LLM stub. The answer is built deterministically from the prompt's
+    own words, usage is estimated from text length, and every call sleeps for a
+    sampled latency and fails with probability `failure_rate`.
+    """
+
+    def __init__(
+        self,
+        *,
+        model_name: str,
+        system_prompt: str = "",
+        completion_tokens: int = LLM_FAKE_COMPLETION_TOKENS,
+        failure_rate: float = LLM_FAKE_FAILURE_RATE,
+        latency: Optional[LatencyModel] = None,
+        seed: int = FAKE_SEED,
+    ) -> None:
+        self._model = model_name
+        self._system_prompt = system_prompt
+        self._completion_tokens = max(1, int(completion_tokens))
+        self._failure_rate = min(max(0.0, float(failure_rate)), 1.0)
+        self._latency = latency or LatencyModel(LLM_FAKE_LATENCY_MS, seed=seed)
+        self._seed = seed
+        self._rng = random.Random(seed)
+
+    def _answer(self, prompt: str) -> str:
+        digest = hashlib.sha256(f"{self._seed}:{prompt}".encode("utf-8")).hexdigest()
+        words = _WORD_RE.findall(prompt) or ["ответ"]
+        rng = random.Random(digest)
+        body = " ".join(rng.choice(words) for _ in range(self._completion_tokens))
+        return f"[fake {digest[:8]}] {body}"
+
+    async def generate(self, prompt: str) -> LlmGeneration:
+        delay_ms = await self._latency.sleep()
+        if self._rng.random() < self._failure_rate:
+            logger.warning(
+                "Fake LLM injected failure (model={}, latency_ms={:.1f})",
+                self._model,
+                delay_ms,
+            )
+            raise RuntimeError("Fake LLM injected failure")
+
+        answer = self._answer(prompt)
+        prompt_tokens = estimate_tokens(self._system_prompt) + estimate_tokens(prompt)
+        logger.debug(
+            "Fake LLM responded (model={}, latency_ms={:.1f}, answer_len={})",
+            self._model,
+            delay_ms,
+            len(answer),
+        )
+        return LlmGeneration(
+            text=answer,
+            model=self._model,
+            usage=LlmUsage(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=self._completion_tokens,
+                total_tokens=prompt_tokens + self._completion_tokens,
+            ),
+        )
+
+    async def generate_stream(
+        self, prompt: str, on_delta: LlmDeltaHandler
+    ) -> LlmGeneration:
+        # The sampled latency becomes the time to the first fragment.
+        generation = await self.generate(prompt)
+        words = generation.text.split(" ")
+        for start in range(0, len(words), _STREAM_WORDS_PER_DELTA):
+            fragment = " ".join(words[start : start + _STREAM_WORDS_PER_DELTA])
+            await on_delta(fragment if start == 0 else f" {fragment}")
+            await asyncio.sleep(0)
+        return generation
+
+    async def close(self) -> None:
+        return None
@@ -0,0 +1,111 @@
+import importlib.util
+from typing import Any, Iterable, Optional
+
+import httpx
+from loguru import logger
+
+from app.infrastructure.config import (
+    HTTP_POOL_HTTP2,
+    HTTP_POOL_KEEPALIVE_EXPIRY_S,
+    HTTP_POOL_MAX_CONNECTIONS,
+    HTTP_POOL_MAX_KEEPALIVE,
+    HTTP_POOL_SHARED,
+)
+
+# Warm-up only needs the TLS handshake, not a meaningful response.
+_WARMUP_TIMEOUT_S = 10.0
+
+
+class _PoolStats:
+    def __init__(self) -> None:
+        self.requests = 0
+
+    async def on_request(self, request: httpx.Request) -> None:
+        self.requests += 1
+
+
+_client: Optional[httpx.AsyncClient] = None
+_stats = _PoolStats()
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def get_http_client() -> Optional[httpx.AsyncClient]:
+    """
+    The process-wide pooled client for OpenRouter and embedding APIs, or None
+    when HTTP_POOL_SHARED is off (each SDK client then keeps its own pool).
+    Per-request timeouts are set by the SDK clients, not here.
+    """
+    global _client
+    if not HTTP_POOL_SHARED:
+        return None
+    if _client is None or _client.is_closed:
+        http2 = HTTP_POOL_HTTP2 and _http2_available()
+        if HTTP_POOL_HTTP2 and not http2:
+            logger.warning("HTTP/2 requested but `h2` is not installed, using HTTP/1.1")
+        _client = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=HTTP_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_POOL_KEEPALIVE_EXPIRY_S,
+            ),
+            event_hooks={"request": [_stats.on_request]},
+        )
+        logger.info(
+            "Shared HTTP pool created (http2={}, max_connections={}, max_keepalive={})",
+            http2,
+            HTTP_POOL_MAX_CONNECTIONS,
+            HTTP_POOL_MAX_KEEPALIVE,
+        )
+    return _client
+
+
+async def warm_up_http_pool(base_urls: Iterable[str]) -> None:
+    """Open a connection to each host up front so the first user skips TLS setup."""
+    client = get_http_client()
+    if client is None:
+        return
+    for base_url in dict.fromkeys(base_urls):
+        try:
+            # Any status will do: the connection stays in the pool.
+            await client.head(base_url, timeout=_WARMUP_TIMEOUT_S)
+        except httpx.HTTPError as exc:
+            logger.warning("HTTP pool warm-up failed (url={}): {}", base_url, exc)
+    logger.info("HTTP pool warmed up: {}", http_pool_snapshot())
+
+
+def http_pool_snapshot() -> Optional[dict[str, Any]]:
+    if _client is None or _client.is_closed:
+        return None
+    # httpcore internals; missing attributes just leave the counters at zero.
+    pool = getattr(getattr(_client, "_transport", None), "_pool", None)
+    connections = list(getattr(pool, "connections", []))
+    active = sum(1 for conn in connections if not conn.is_idle())
+    return {
+        "requests": _stats.requests,
+        "connections": len(connections),
+        "active": active,
+        "idle": len(connections) - active,
+        "http2": sum(1 for conn in connections if conn.info().startswith("HTTP/2")),
+        "queued": sum(
+            1 for request in getattr(pool, "_requests", []) if request.is_queued()
+        ),
+        "utilization": round(active / max(1, HTTP_POOL_MAX_CONNECTIONS), 3),
+    }
+
+
+def log_http_pool_stats() -> None:
+    snapshot = http_pool_snapshot()
+    if snapshot is not None:
+        logger.info("Shared HTTP pool stats: {}", snapshot)
+
+
+async def close_http_pool() -> None:
+    global _client
+    log_http_pool_stats()
+    client, _client = _client, None
+    if client is not None and not client.is_closed:
+        await client.aclose()
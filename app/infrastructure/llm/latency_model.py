@@ -0,0 +1,62 @@
+import asyncio
+import math
+import random
+from typing import Optional
+
+from app.infrastructure.config import (
+    FAKE_LATENCY_DISTRIBUTION,
+    FAKE_LATENCY_SPREAD,
+)
+
+LATENCY_FIXED = "fixed"
+LATENCY_UNIFORM = "uniform"
+LATENCY_EXPONENTIAL = "exponential"
+LATENCY_LOGNORMAL = "lognormal"
+
+
+class LatencyModel:
+    """
+    Samples simulated request latencies with the given mean (ms).
+
+    `spread` is the relative half-width for `uniform` (mean * (1 ± spread))
+    and sigma of the underlying normal for `lognormal`, whose median is chosen
+    so the mean stays `mean_ms`; `fixed` and `exponential` ignore it.
+    """
+
+    def __init__(
+        self,
+        mean_ms: float,
+        *,
+        distribution: str = FAKE_LATENCY_DISTRIBUTION,
+        spread: float = FAKE_LATENCY_SPREAD,
+        seed: Optional[int] = None,
+    ) -> None:
+        if distribution not in (
+            LATENCY_FIXED,
+            LATENCY_UNIFORM,
+            LATENCY_EXPONENTIAL,
+            LATENCY_LOGNORMAL,
+        ):
+            raise ValueError(f"Unknown FAKE_LATENCY_DISTRIBUTION: {distribution}")
+        self._mean_ms = max(0.0, float(mean_ms))
+        self._distribution = distribution
+        self._spread = max(0.0, float(spread))
+        self._rng = random.Random(seed)
+
+    def sample_ms(self) -> float:
+        mean = self._mean_ms
+        if not mean or self._distribution == LATENCY_FIXED:
+            return mean
+        if self._distribution == LATENCY_UNIFORM:
+            width = mean * min(self._spread, 1.0)
+            return self._rng.uniform(mean - width, mean + width)
+        if self._distribution == LATENCY_EXPONENTIAL:
+            return self._rng.expovariate(1.0 / mean)
+        sigma = self._spread
+        return self._rng.lognormvariate(math.log(mean) - sigma * sigma / 2, sigma)
+
+    async def sleep(self) -> float:
+        delay_ms = self.sample_ms()
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000)
+        return delay_ms
@@ -1,15 +1,26 @@
-import math
 from typing import Optional, Sequence
 
 from loguru import logger
 from openai import AsyncOpenAI
 
+from app.domain.models.embedding import (
+    Embedding,
+    as_embedding_matrix,
+    l2_normalize_rows,
+)
+from app.domain.models.tokens import estimate_tokens
 from app.infrastructure.config import (
     EMBEDDING_BASE_URL,
     EMBEDDING_MODEL_NAME,
     EMBEDDING_TIMEOUT,
     OPENROUTER_API_KEY,
 )
+from app.infrastructure.llm.http_pool import get_http_client
+from app.infrastructure.llm.rate_limiter import (
+    OpenRouterRateLimiter,
+    get_rate_limiter,
+    rate_limited,
+)
 
 
 class OpenRouterEmbeddingProvider:
@@ -21,6 +32,7 @@ class OpenRouterEmbeddingProvider:
         base_url: str = EMBEDDING_BASE_URL,
         api_key: Optional[str] = OPENROUTER_API_KEY,
         timeout: float = EMBEDDING_TIMEOUT,
+        rate_limiter: Optional[OpenRouterRateLimiter] = None,
     ) -> None:
         if not api_key:
             raise RuntimeError("OPENROUTER_API_KEY is not set")
@@ -30,17 +42,26 @@ class OpenRouterEmbeddingProvider:
             raise RuntimeError("EMBEDDING_MODEL_NAME is not set")
 
         self._model = resolved_model_name
+        self._limiter = (
+            rate_limiter if rate_limiter is not None else get_rate_limiter(base_url)
+        )
+        self._http_client = get_http_client()
         self._client = AsyncOpenAI(
             base_url=base_url,
             api_key=api_key,
             timeout=timeout,
+            http_client=self._http_client,
         )
 
-    async def embed(self, text: str) -> Sequence[float]:
+    @property
+    def model_name(self) -> str:
+        return self._model
+
+    async def embed(self, text: str) -> Embedding:
         embeddings = await self.embed_many([text])
         return embeddings[0]
 
-    async def embed_many(self, texts: Sequence[str]) -> Sequence[Sequence[float]]:
+    async def embed_many(self, texts: Sequence[str]) -> Sequence[Embedding]:
         if not texts:
             return []
 
@@ -50,26 +71,27 @@ class OpenRouterEmbeddingProvider:
             len(texts),
         )
         try:
-            response = await self._client.embeddings.create(
-                model=self._model,
-                input=list(texts),
-                encoding_format="float",
+            async with rate_limited(
+                self._limiter, sum(estimate_tokens(text) for text in texts)
+            ) as slot:
+                response = await self._client.embeddings.create(
+                    model=self._model,
+                    input=list(texts),
+                    encoding_format="float",
+                )
+                if response.usage:
+                    slot.actual_tokens = response.usage.total_tokens
+            matrix = l2_normalize_rows(
+                as_embedding_matrix([item.embedding for item in response.data])
             )
-            embeddings: list[list[float]] = [
-                self._l2_normalize(item.embedding) for item in response.data
-            ]
-            logger.debug("Embeddings received (items={})", len(embeddings))
-            return embeddings
+            logger.debug("Embeddings received (items={})", matrix.shape[0])
+            # Rows of one contiguous float32 matrix, no per-vector copies.
+            return list(matrix)
         except Exception as exc:
             logger.exception("Embedding request to OpenRouter failed: {}", exc)
             raise
 
     async def close(self) -> None:
-        await self._client.close()
-
-    @staticmethod
-    def _l2_normalize(vec: Sequence[float]) -> list[float]:
-        norm = math.sqrt(sum(x * x for x in vec))
-        if norm == 0:
-            return list(vec)
-        return [x / norm for x in vec]
+        # The shared pool outlives this client and is closed by close_http_pool().
+        if self._http_client is None:
+            await self._client.close()
@@ -1,10 +1,26 @@
-from typing import Optional
+import asyncio
+import random
+import time
+from collections import deque
+from dataclasses import replace
+from functools import partial
+from typing import Awaitable, Callable, Optional, Sequence
 
 from loguru import logger
-from openai import AsyncOpenAI
+from openai import APIConnectionError, APIStatusError, AsyncOpenAI
+from openai.types.chat import ChatCompletionMessageParam
 
-from app.domain.models.llm_generation import LlmGeneration, LlmUsage
+from app.domain.interfaces.llm_client import LlmDeltaHandler
+from app.domain.models.llm_generation import LlmCallStats, LlmGeneration, LlmUsage
+from app.domain.models.tokens import estimate_tokens
 from app.infrastructure.config import (
+    LLM_FALLBACK_MODELS,
+    LLM_HEDGE,
+    LLM_HEDGE_DELAY_S,
+    LLM_HEDGE_MIN_SAMPLES,
+    LLM_HEDGE_PERCENTILE,
+    LLM_RETRIES,
+    LLM_RETRY_BACKOFF_S,
     OPENROUTER_API_KEY,
     OPENROUTER_BASE_URL,
     OPENROUTER_MODEL_NAME,
@@ -12,10 +28,53 @@ from app.infrastructure.config import (
     OPENROUTER_TIMEOUT,
     SYSTEM_PROMPT_NAME,
 )
+from app.infrastructure.llm.http_pool import get_http_client
+from app.infrastructure.llm.rate_limiter import (
+    OpenRouterRateLimiter,
+    get_rate_limiter,
+    rate_limited,
+)
 from app.prompts.loader import load_prompt
 
+# Successful request latencies kept for the hedging percentile.
+_LATENCY_WINDOW = 200
+# Transient statuses worth retrying on the same model.
+_RETRYABLE_STATUSES = frozenset({408, 409, 429})
+# The model rejects the request or is unavailable: go to the next model.
+_MODEL_STATUSES = frozenset({400, 404, 422})
+
+
+class EmptyCompletionError(RuntimeError):
+    """The provider answered without choices (an upstream error in disguise)."""
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (APIConnectionError, EmptyCompletionError, TimeoutError)):
+        return True
+    if isinstance(exc, APIStatusError):
+        return exc.status_code >= 500 or exc.status_code in _RETRYABLE_STATUSES
+    return False
+
+
+def _is_model_error(exc: BaseException) -> bool:
+    return isinstance(exc, APIStatusError) and exc.status_code in _MODEL_STATUSES
+
 
 class OpenRouterLlmClient:
+    """
+    Chat completions via OpenRouter with tail-latency protection:
+
+    - transient failures (timeouts, 429, 5xx) are retried with jittered
+      exponential backoff;
+    - with `hedge`, a duplicate request is sent once the first one has been
+      running longer than the `hedge_percentile` of recent latencies; the
+      first success wins and the other request is cancelled;
+    - when a model exhausts its retries or rejects the request, the next one
+      of `fallback_models` is tried.
+
+    The model used, the attempt count and whether the hedge won are returned
+    in `LlmGeneration.call`.
+    """
 
     def __init__(
         self,
@@ -26,6 +85,14 @@ class OpenRouterLlmClient:
         base_url: str = OPENROUTER_BASE_URL,
         api_key: Optional[str] = OPENROUTER_API_KEY,
         timeout: float = OPENROUTER_TIMEOUT,
+        retries: int = LLM_RETRIES,
+        backoff_s: float = LLM_RETRY_BACKOFF_S,
+        fallback_models: Optional[Sequence[str]] = None,
+        hedge: bool = LLM_HEDGE,
+        hedge_percentile: float = LLM_HEDGE_PERCENTILE,
+        hedge_delay_s: float = LLM_HEDGE_DELAY_S,
+        hedge_min_samples: int = LLM_HEDGE_MIN_SAMPLES,
+        rate_limiter: Optional[OpenRouterRateLimiter] = None,
     ) -> None:
         if not api_key:
             raise RuntimeError("OPENROUTER_API_KEY is not set")
@@ -35,14 +102,196 @@ class OpenRouterLlmClient:
             raise RuntimeError("OPENROUTER_MODEL_NAME is not set")
 
         self._model = resolved_model_name
+        fallbacks = LLM_FALLBACK_MODELS if fallback_models is None else fallback_models
+        self._models = [self._model] + [
+            name for name in dict.fromkeys(fallbacks) if name != self._model
+        ]
         self._temperature = (
             OPENROUTER_TEMPERATURE if temperature is None else float(temperature)
         )
         self._system_prompt = load_prompt(system_prompt_name)
+        self._retries = max(0, int(retries))
+        self._backoff_s = max(0.0, float(backoff_s))
+        self._hedge = hedge
+        self._hedge_percentile = min(max(0.0, float(hedge_percentile)), 100.0)
+        self._hedge_delay_s = max(0.0, float(hedge_delay_s))
+        self._hedge_min_samples = max(1, int(hedge_min_samples))
+        self._latencies_s: deque[float] = deque(maxlen=_LATENCY_WINDOW)
+        self._rng = random.Random()
+        self._limiter = (
+            rate_limiter if rate_limiter is not None else get_rate_limiter(base_url)
+        )
+        self._http_client = get_http_client()
         self._client = AsyncOpenAI(
             base_url=base_url,
             api_key=api_key,
             timeout=timeout,
+            http_client=self._http_client,
+            # Retries are ours: backoff, hedging and fallbacks need to see them.
+            max_retries=0,
+        )
+
+    def _messages(self, prompt: str) -> list[ChatCompletionMessageParam]:
+        return [
+            {"role": "system", "content": self._system_prompt},
+            {"role": "user", "content": prompt},
+        ]
+
+    def _backoff(self, attempt: int) -> float:
+        return self._backoff_s * 2**attempt * self._rng.uniform(0.5, 1.0)
+
+    def _hedge_delay(self) -> float:
+        if len(self._latencies_s) < self._hedge_min_samples:
+            return self._hedge_delay_s
+        ordered = sorted(self._latencies_s)
+        idx = round((len(ordered) - 1) * self._hedge_percentile / 100.0)
+        return ordered[idx]
+
+    async def _hedged(
+        self, call: Callable[[], Awaitable[LlmGeneration]]
+    ) -> tuple[LlmGeneration, bool]:
+        delay = self._hedge_delay()
+        primary = asyncio.ensure_future(call())
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return primary.result(), False
+
+            logger.info(
+                "LLM request slower than {:.2f}s, sending hedge (model={})",
+                delay,
+                self._model,
+            )
+            tasks.append(asyncio.ensure_future(call()))
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    exc = task.exception()
+                    if exc is None:
+                        return task.result(), task is not primary
+                    error = exc
+            raise error or RuntimeError("Hedged LLM request failed")
+        finally:
+            losers = [task for task in tasks if not task.done()]
+            for task in losers:
+                task.cancel()
+            await asyncio.gather(*losers, return_exceptions=True)
+
+    async def _with_fallbacks(
+        self,
+        call: Callable[[str], Awaitable[LlmGeneration]],
+        *,
+        hedge: bool,
+        can_retry: Callable[[], bool] = lambda: True,
+    ) -> LlmGeneration:
+        attempts = 0
+        last_error: Optional[BaseException] = None
+        for model in self._models:
+            for attempt in range(self._retries + 1):
+                attempts += 1
+                model_call = partial(call, model)
+                try:
+                    if hedge:
+                        generation, hedged = await self._hedged(model_call)
+                    else:
+                        generation, hedged = await model_call(), False
+                except Exception as exc:
+                    last_error = exc
+                    if not can_retry():
+                        raise
+                    if _is_model_error(exc):
+                        logger.warning(
+                            "LLM model {} rejected the request: {}", model, exc
+                        )
+                        break
+                    if not _is_retryable(exc):
+                        raise
+                    if attempt < self._retries:
+                        delay = self._backoff(attempt)
+                        logger.warning(
+                            "LLM request failed (model={}, attempt={}/{}), retrying in {:.2f}s: {}",
+                            model,
+                            attempt + 1,
+                            self._retries + 1,
+                            delay,
+                            exc,
+                        )
+                        await asyncio.sleep(delay)
+                    continue
+
+                if model != self._model or attempts > 1:
+                    logger.info(
+                        "LLM answered after retries (model={}, attempts={}, hedged={})",
+                        model,
+                        attempts,
+                        hedged,
+                    )
+                return replace(
+                    generation,
+                    call=LlmCallStats(
+                        model=model,
+                        attempts=attempts,
+                        hedged=hedged,
+                        queue_wait_ms=(
+                            generation.call.queue_wait_ms if generation.call else None
+                        ),
+                    ),
+                )
+            if model != self._models[-1]:
+                logger.warning("LLM model {} failed, falling back", model)
+
+        logger.error(
+            "LLM request failed on every model (models={}, attempts={})",
+            self._models,
+            attempts,
+        )
+        raise last_error or RuntimeError("LLM request failed")
+
+    def _estimate_tokens(self, prompt: str) -> int:
+        return estimate_tokens(self._system_prompt) + estimate_tokens(prompt)
+
+    async def _complete(self, model: str, prompt: str) -> LlmGeneration:
+        async with rate_limited(self._limiter, self._estimate_tokens(prompt)) as slot:
+            t_start = time.perf_counter()
+            response = await self._client.chat.completions.create(
+                model=model,
+                messages=self._messages(prompt),
+                temperature=self._temperature,
+            )
+            if response.usage:
+                slot.actual_tokens = response.usage.total_tokens
+        if not response.choices:
+            raise EmptyCompletionError(f"No choices in completion from {model}")
+        self._latencies_s.append(time.perf_counter() - t_start)
+
+        answer = response.choices[0].message.content or ""
+        usage = (
+            LlmUsage(
+                prompt_tokens=response.usage.prompt_tokens,
+                completion_tokens=response.usage.completion_tokens,
+                total_tokens=response.usage.total_tokens,
+            )
+            if response.usage
+            else None
+        )
+        logger.debug(
+            "OpenRouter responded (model={}, finish_reason={}, answer_len={})",
+            model,
+            response.choices[0].finish_reason,
+            len(answer),
+        )
+        return LlmGeneration(
+            text=answer,
+            model=response.model,
+            usage=usage,
+            call=LlmCallStats(
+                model=model, attempts=1, queue_wait_ms=int(slot.wait_s * 1000)
+            ),
         )
 
     async def generate(self, prompt: str) -> LlmGeneration:
@@ -51,37 +300,90 @@ class OpenRouterLlmClient:
             self._model,
         )
         try:
-            response = await self._client.chat.completions.create(
-                model=self._model,
-                messages=[
-                    {"role": "system", "content": self._system_prompt},
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=self._temperature,
+            return await self._with_fallbacks(
+                partial(self._complete, prompt=prompt), hedge=self._hedge
             )
-            answer = response.choices[0].message.content or ""
-            usage = (
-                LlmUsage(
-                    prompt_tokens=response.usage.prompt_tokens,
-                    completion_tokens=response.usage.completion_tokens,
-                    total_tokens=response.usage.total_tokens,
-                )
-                if response.usage
-                else None
-            )
-            logger.debug(
-                "OpenRouter responded (finish_reason={}, answer_len={})",
-                response.choices[0].finish_reason,
-                len(answer),
+        except Exception as exc:
+            logger.exception("OpenRouter completion request failed: {}", exc)
+            raise
+
+    async def _complete_stream(
+        self, model: str, prompt: str, on_delta: LlmDeltaHandler
+    ) -> LlmGeneration:
+        parts: list[str] = []
+        response_model: Optional[str] = None
+        usage: Optional[LlmUsage] = None
+        finish_reason: Optional[str] = None
+        async with rate_limited(self._limiter, self._estimate_tokens(prompt)) as slot:
+            stream = await self._client.chat.completions.create(
+                model=model,
+                messages=self._messages(prompt),
+                temperature=self._temperature,
+                stream=True,
+                # The last chunk then carries token usage (and no choices).
+                stream_options={"include_usage": True},
             )
-            return LlmGeneration(
-                text=answer,
-                model=response.model,
-                usage=usage,
+            async for chunk in stream:
+                response_model = chunk.model or response_model
+                if chunk.usage:
+                    usage = LlmUsage(
+                        prompt_tokens=chunk.usage.prompt_tokens,
+                        completion_tokens=chunk.usage.completion_tokens,
+                        total_tokens=chunk.usage.total_tokens,
+                    )
+                    slot.actual_tokens = chunk.usage.total_tokens
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                finish_reason = choice.finish_reason or finish_reason
+                delta = choice.delta.content
+                if delta:
+                    parts.append(delta)
+                    await on_delta(delta)
+
+        answer = "".join(parts)
+        logger.debug(
+            "OpenRouter stream finished (model={}, finish_reason={}, answer_len={})",
+            model,
+            finish_reason,
+            len(answer),
+        )
+        return LlmGeneration(
+            text=answer,
+            model=response_model,
+            usage=usage,
+            call=LlmCallStats(
+                model=model, attempts=1, queue_wait_ms=int(slot.wait_s * 1000)
+            ),
+        )
+
+    async def generate_stream(
+        self, prompt: str, on_delta: LlmDeltaHandler
+    ) -> LlmGeneration:
+        logger.info(
+            "Streaming prompt to OpenRouter (model={})",
+            self._model,
+        )
+        streamed = False
+
+        async def _on_delta(delta: str) -> None:
+            nonlocal streamed
+            streamed = True
+            await on_delta(delta)
+
+        try:
+            # Not hedged, and retried only until the first fragment is shown:
+            # text already delivered to the caller cannot be taken back.
+            return await self._with_fallbacks(
+                partial(self._complete_stream, prompt=prompt, on_delta=_on_delta),
+                hedge=False,
+                can_retry=lambda: not streamed,
             )
         except Exception as exc:
-            logger.exception("OpenRouter completion request failed: {}", exc)
+            logger.exception("OpenRouter streaming request failed: {}", exc)
             raise
 
     async def close(self) -> None:
-        await self._client.close()
+        # The shared pool outlives this client and is closed by close_http_pool().
+        if self._http_client is None:
+            await self._client.close()
@@ -0,0 +1,245 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Optional
+
+from loguru import logger
+from openai import APIStatusError
+
+from app.infrastructure.config import (
+    OPENROUTER_CONCURRENCY_INITIAL,
+    OPENROUTER_CONCURRENCY_MAX,
+    OPENROUTER_CONCURRENCY_MIN,
+    OPENROUTER_RATE_LIMITER,
+    OPENROUTER_RPM,
+    OPENROUTER_TPM,
+)
+
+# Queue waits kept for the percentile in snapshot().
+_WAIT_WINDOW = 1000
+# One burst of 429s should halve the limit once, not once per failed request.
+_DECREASE_COOLDOWN_S = 2.0
+
+
+def _is_throttle(exc: BaseException) -> bool:
+    return isinstance(exc, APIStatusError) and (
+        exc.status_code == 429 or exc.status_code >= 500
+    )
+
+
+class TokenBucket:
+    """
+    Refills at `per_minute` units per minute up to one minute's worth. Waiters
+    are served in arrival order; an adjustment may drive the level negative,
+    which delays the following requests instead of the finished one.
+    """
+
+    def __init__(self, per_minute: float) -> None:
+        self._capacity = float(per_minute)
+        self._rate_per_s = float(per_minute) / 60.0
+        self._level = self._capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @property
+    def level(self) -> float:
+        self._refill()
+        return self._level
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._level = min(
+            self._capacity, self._level + (now - self._updated) * self._rate_per_s
+        )
+        self._updated = now
+
+    async def acquire(self, amount: float) -> None:
+        amount = min(float(amount), self._capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._level >= amount:
+                    self._level -= amount
+                    return
+                await asyncio.sleep((amount - self._level) / self._rate_per_s)
+
+    def adjust(self, delta: float) -> None:
+        self._refill()
+        self._level = min(self._capacity, self._level - float(delta))
+
+
+class AimdConcurrency:
+    """
+    Concurrency limit with additive increase (about +1 per `limit` successful
+    requests) and multiplicative decrease (halved on throttling).
+    """
+
+    def __init__(self, *, initial: int, minimum: int, maximum: int) -> None:
+        self._min = max(1, int(minimum))
+        self._max = max(self._min, int(maximum))
+        self._limit = float(min(max(int(initial), self._min), self._max))
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = asyncio.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def acquire(self) -> None:
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+
+    async def release(self) -> None:
+        async with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self) -> None:
+        self._limit = min(float(self._max), self._limit + 1.0 / self._limit)
+
+    def on_throttle(self) -> bool:
+        now = time.monotonic()
+        if now - self._last_decrease < _DECREASE_COOLDOWN_S:
+            return False
+        self._last_decrease = now
+        self._limit = max(float(self._min), self._limit / 2.0)
+        return True
+
+
+@dataclass
+class RateLimitSlot:
+    wait_s: float
+    estimated_tokens: int
+    # Set by the caller once the response reports real usage.
+    actual_tokens: Optional[int] = None
+
+
+class OpenRouterRateLimiter:
+    """
+    Process-wide gate in front of one API host: requests/min and tokens/min
+    token buckets (0 disables either) and an AIMD concurrency limit that backs
+    off on 429/5xx and grows back on success.
+    """
+
+    def __init__(
+        self,
+        *,
+        requests_per_minute: int = OPENROUTER_RPM,
+        tokens_per_minute: int = OPENROUTER_TPM,
+        initial_concurrency: int = OPENROUTER_CONCURRENCY_INITIAL,
+        min_concurrency: int = OPENROUTER_CONCURRENCY_MIN,
+        max_concurrency: int = OPENROUTER_CONCURRENCY_MAX,
+    ) -> None:
+        self._requests = (
+            TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        )
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self._concurrency = AimdConcurrency(
+            initial=initial_concurrency,
+            minimum=min_concurrency,
+            maximum=max_concurrency,
+        )
+        self._waits_s: deque[float] = deque(maxlen=_WAIT_WINDOW)
+        self._queued = 0
+        self.requests = 0
+        self.throttled = 0
+
+    @asynccontextmanager
+    async def slot(self, tokens: int = 0) -> AsyncIterator[RateLimitSlot]:
+        t_start = time.perf_counter()
+        self._queued += 1
+        try:
+            if self._requests is not None:
+                await self._requests.acquire(1)
+            if self._tokens is not None and tokens:
+                await self._tokens.acquire(tokens)
+            await self._concurrency.acquire()
+        finally:
+            self._queued -= 1
+        slot = RateLimitSlot(
+            wait_s=time.perf_counter() - t_start, estimated_tokens=tokens
+        )
+        self._waits_s.append(slot.wait_s)
+        self.requests += 1
+        try:
+            yield slot
+        except Exception as exc:
+            if _is_throttle(exc):
+                self.throttled += 1
+                if self._concurrency.on_throttle():
+                    logger.warning(
+                        "Upstream throttling, concurrency limit lowered to {}: {}",
+                        self._concurrency.limit,
+                        exc,
+                    )
+            raise
+        else:
+            self._concurrency.on_success()
+            if self._tokens is not None and slot.actual_tokens is not None:
+                self._tokens.adjust(slot.actual_tokens - tokens)
+        finally:
+            await self._concurrency.release()
+
+    def snapshot(self) -> dict[str, Any]:
+        waits = sorted(self._waits_s)
+        return {
+            "concurrency_limit": self._concurrency.limit,
+            "in_flight": self._concurrency.in_flight,
+            "queued": self._queued,
+            "requests_available": (
+                round(self._requests.level, 1) if self._requests else None
+            ),
+            "tokens_available": round(self._tokens.level) if self._tokens else None,
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "wait_ms_mean": (
+                round(sum(waits) / len(waits) * 1000, 1) if waits else None
+            ),
+            "wait_ms_p95": (
+                round(waits[round((len(waits) - 1) * 0.95)] * 1000, 1)
+                if waits
+                else None
+            ),
+            "wait_ms_max": round(waits[-1] * 1000, 1) if waits else None,
+        }
+
+
+@asynccontextmanager
+async def rate_limited(
+    limiter: Optional[OpenRouterRateLimiter], tokens: int = 0
+) -> AsyncIterator[RateLimitSlot]:
+    if limiter is None:
+        yield RateLimitSlot(wait_s=0.0, estimated_tokens=tokens)
+        return
+    async with limiter.slot(tokens) as slot:
+        yield slot
+
+
+_limiters: dict[str, OpenRouterRateLimiter] = {}
+
+
+def get_rate_limiter(base_url: str) -> Optional[OpenRouterRateLimiter]:
+    """Limiter shared by every client of `base_url` in this process."""
+    if not OPENROUTER_RATE_LIMITER:
+        return None
+    limiter = _limiters.get(base_url)
+    if limiter is None:
+        limiter = _limiters[base_url] = OpenRouterRateLimiter()
+    return limiter
+
+
+def rate_limiter_snapshots() -> dict[str, dict[str, Any]]:
+    return {base_url: limiter.snapshot() for base_url, limiter in _limiters.items()}
+
+
+def log_rate_limiter_stats() -> None:
+    for base_url, snapshot in rate_limiter_snapshots().items():
+        logger.info("OpenRouter rate limiter stats ({}): {}", base_url, snapshot)
@@ -0,0 +1,203 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+from loguru import logger
+
+from app.domain.interfaces.embedding_provider import EmbeddingProvider
+from app.domain.interfaces.llm_client import LlmClient, LlmDeltaHandler
+from app.domain.models.embedding import Embedding, as_embedding
+from app.domain.models.llm_generation import LlmGeneration, LlmUsage
+from app.infrastructure.llm.cached_embedding_provider import normalize_embedding_text
+
+
+def recording_key(*parts: object) -> str:
+    payload = json.dumps(parts, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RecordingStore:
+    """
+    One JSON file per recorded response under `root/<kind>/<key[:2]>/<key>.json`.
+    Files are written via a temporary file and os.replace, so concurrent
+    recorders never leave a half-written entry behind.
+    """
+
+    def __init__(self, root: str | Path, kind: str) -> None:
+        self._dir = Path(root) / kind
+
+    def _path(self, key: str) -> Path:
+        return self._dir / key[:2] / f"{key}.json"
+
+    def load(self, key: str) -> Optional[dict[str, Any]]:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if not isinstance(data, dict):
+            raise ValueError(f"Invalid recording format: {path}")
+        return data
+
+    def save(self, key: str, payload: dict[str, Any]) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+
+class RecordReplayEmbeddingProvider:
+    """
+    Serves embeddings recorded on disk. With an `inner` provider (record mode)
+    misses are embedded upstream once and saved; without one (replay mode) a
+    miss is an error, so runs never silently reach the network.
+    """
+
+    def __init__(
+        self,
+        inner: Optional[EmbeddingProvider],
+        *,
+        model_name: str,
+        store: RecordingStore,
+    ) -> None:
+        self._inner = inner
+        self._model = model_name
+        self._store = store
+
+    @property
+    def model_name(self) -> str:
+        return self._model
+
+    async def embed(self, text: str) -> Embedding:
+        embeddings = await self.embed_many([text])
+        return embeddings[0]
+
+    async def embed_many(self, texts: Sequence[str]) -> Sequence[Embedding]:
+        if not texts:
+            return []
+
+        keys = [
+            recording_key(self._model, normalize_embedding_text(text)) for text in texts
+        ]
+        found: dict[str, Embedding] = {}
+        for key in dict.fromkeys(keys):
+            recorded = self._store.load(key)
+            if recorded is not None:
+                found[key] = as_embedding(recorded["embedding"])
+
+        missing = {
+            key: text for key, text in zip(keys, texts, strict=True) if key not in found
+        }
+        if missing:
+            if self._inner is None:
+                raise RuntimeError(
+                    f"No recorded embeddings for {len(missing)} text(s) "
+                    f"(model={self._model}); record them with EMBEDDING_BACKEND=record"
+                )
+            fresh = await self._inner.embed_many(list(missing.values()))
+            for (key, text), embedding in zip(missing.items(), fresh, strict=True):
+                self._store.save(
+                    key,
+                    {
+                        "model_name": self._model,
+                        "text": text,
+                        "embedding": embedding.tolist(),
+                    },
+                )
+                found[key] = embedding
+            logger.info(
+                "Recorded embeddings (model={}, count={})", self._model, len(missing)
+            )
+        return [found[key] for key in keys]
+
+    async def close(self) -> None:
+        if self._inner is not None:
+            await self._inner.close()
+
+
+class RecordReplayLlmClient:
+    """
+    Serves LLM generations recorded on disk, keyed by `namespace` (model,
+    temperature, system prompt) plus the prompt. Record mode (`inner` given)
+    calls upstream only for prompts not recorded yet; replay mode raises on a
+    miss.
+    """
+
+    def __init__(
+        self,
+        inner: Optional[LlmClient],
+        *,
+        namespace: Sequence[object],
+        store: RecordingStore,
+    ) -> None:
+        self._inner = inner
+        self._namespace = tuple(namespace)
+        self._store = store
+
+    def _replay(self, key: str) -> Optional[LlmGeneration]:
+        recorded = self._store.load(key)
+        if recorded is None:
+            return None
+        usage = recorded.get("usage")
+        return LlmGeneration(
+            text=recorded["text"],
+            model=recorded.get("model"),
+            usage=LlmUsage(**usage) if usage else None,
+        )
+
+    def _upstream(self, key: str) -> LlmClient:
+        if self._inner is None:
+            raise RuntimeError(
+                f"No recorded LLM response (key={key}); "
+                "record it with LLM_BACKEND=record"
+            )
+        return self._inner
+
+    async def generate(self, prompt: str) -> LlmGeneration:
+        key = recording_key(*self._namespace, prompt)
+        generation = self._replay(key)
+        if generation is not None:
+            return generation
+
+        generation = await self._upstream(key).generate(prompt)
+        self._record(key, prompt, generation)
+        return generation
+
+    async def generate_stream(
+        self, prompt: str, on_delta: LlmDeltaHandler
+    ) -> LlmGeneration:
+        key = recording_key(*self._namespace, prompt)
+        generation = self._replay(key)
+        if generation is not None:
+            await on_delta(generation.text)
+            return generation
+
+        generation = await self._upstream(key).generate_stream(prompt, on_delta)
+        self._record(key, prompt, generation)
+        return generation
+
+    def _record(self, key: str, prompt: str, generation: LlmGeneration) -> None:
+        self._store.save(
+            key,
+            {
+                "prompt": prompt,
+                "text": generation.text,
+                "model": generation.model,
+                "usage": (
+                    {
+                        "prompt_tokens": generation.usage.prompt_tokens,
+                        "completion_tokens": generation.usage.completion_tokens,
+                        "total_tokens": generation.usage.total_tokens,
+                    }
+                    if generation.usage
+                    else None
+                ),
+            },
+        )
+        logger.info("Recorded LLM response (key={})", key)
+
+    async def close(self) -> None:
+        if self._inner is not None:
+            await self._inner.close()
@@ -0,0 +1,122 @@
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+from app.domain.models.qa_pair import QaPair
+from app.infrastructure.vector.numpy_qa_pair_repository import (
+    Partition,
+    partition_rows,
+)
+
+
+@dataclass(frozen=True)
+class DuplicateGroup:
+    topic: str
+    canonical_id: int
+    duplicate_ids: list[int]
+    # Lowest pairwise similarity on the edges that joined the group.
+    min_similarity: float
+
+
+class _UnionFind:
+    def __init__(self, size: int) -> None:
+        self._parent = np.arange(size, dtype=np.intp)
+
+    def find(self, item: int) -> int:
+        root = item
+        while self._parent[root] != root:
+            root = int(self._parent[root])
+        while self._parent[item] != root:
+            self._parent[item], item = root, int(self._parent[item])
+        return root
+
+    def union(self, a: int, b: int) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self._parent[max(root_a, root_b)] = min(root_a, root_b)
+
+
+def _canonical_row(rows: Sequence[int], qa_pairs: Sequence[QaPair]) -> int:
+    # Prefer hand-written pairs over generated ones, then the oldest id.
+    return min(
+        rows, key=lambda row: (qa_pairs[row].is_generated, qa_pairs[row].id or 0)
+    )
+
+
+def _partition_block(
+    matrix: npt.NDArray[np.float32], part: Partition, start: int, stop: int
+) -> npt.NDArray[np.float32]:
+    if isinstance(part, slice):
+        # A view: with a memory-mapped matrix only these pages are read.
+        return matrix[part.start + start : part.start + stop]
+    return matrix[part[start:stop]]
+
+
+def find_duplicate_groups(
+    matrix: npt.NDArray[np.float32],
+    qa_pairs: Sequence[QaPair],
+    partitions: Sequence[Partition],
+    *,
+    threshold: float,
+    block_rows: int = 2048,
+) -> list[DuplicateGroup]:
+    """
+    Connected components of the "cosine >= threshold" graph inside each
+    partition of the L2-normalized `matrix`.
+
+    Similarities are computed tile by tile (block_rows x block_rows, upper
+    triangle only), so neither the n x n similarity matrix nor a copy of
+    `matrix` is materialized and `matrix` can be a read-only memory map.
+    """
+    groups: list[DuplicateGroup] = []
+    for part in partitions:
+        rows = partition_rows([part])
+        n = int(rows.shape[0])
+        if n < 2:
+            continue
+
+        edges: list[tuple[int, int, float]] = []
+        for i_start in range(0, n, block_rows):
+            i_stop = min(n, i_start + block_rows)
+            left = _partition_block(matrix, part, i_start, i_stop)
+            for j_start in range(i_start, n, block_rows):
+                j_stop = min(n, j_start + block_rows)
+                right = _partition_block(matrix, part, j_start, j_stop)
+                sims = left @ right.T
+                local_i, local_j = np.nonzero(sims >= threshold)
+                for i, j in zip(local_i, local_j, strict=True):
+                    a, b = i_start + int(i), j_start + int(j)
+                    if b > a:
+                        edges.append((a, b, float(sims[i, j])))
+
+        union_find = _UnionFind(n)
+        for a, b, _ in edges:
+            union_find.union(a, b)
+        edge_min: dict[int, float] = {}
+        for a, _, sim in edges:
+            root = union_find.find(a)
+            edge_min[root] = min(edge_min.get(root, 1.0), sim)
+
+        members: dict[int, list[int]] = {}
+        for local in range(n):
+            members.setdefault(union_find.find(local), []).append(int(rows[local]))
+
+        for root, member_rows in members.items():
+            if len(member_rows) < 2:
+                continue
+            canonical = _canonical_row(member_rows, qa_pairs)
+            groups.append(
+                DuplicateGroup(
+                    topic=qa_pairs[canonical].topic,
+                    canonical_id=int(qa_pairs[canonical].id or 0),
+                    duplicate_ids=sorted(
+                        int(qa_pairs[row].id or 0)
+                        for row in member_rows
+                        if row != canonical
+                    ),
+                    min_similarity=edge_min.get(root, 1.0),
+                )
+            )
+    return groups
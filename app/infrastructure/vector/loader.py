@@ -0,0 +1,167 @@
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+
+from app.domain.interfaces.qa_pair_repository import QaPairRepository
+from app.domain.interfaces.topic_router import TopicRouter
+from app.domain.models.embedding import EmbeddingModelMismatchError
+from app.infrastructure.config import (
+    RAG_MATRYOSHKA,
+    RAG_MATRYOSHKA_RESCORE_FACTOR,
+    RAG_QUANTIZATION,
+    RAG_QUANTIZATION_RECALL_SAMPLE,
+    RAG_QUANTIZATION_RESCORE_FACTOR,
+    RAG_RETRIEVER_BACKEND,
+    RAG_SHORT_EMBEDDING_DIM,
+    RAG_SNAPSHOT_PATH,
+    RAG_TOP_K,
+    RAG_TOPIC_CENTROIDS_PATH,
+    RAG_TOPIC_ROUTING,
+)
+from app.infrastructure.db.base import SessionLocal
+from app.infrastructure.db.crud import SqlAlchemyQaPairRepository
+from app.infrastructure.db.vector_index import compute_topic_centroids
+from app.infrastructure.vector.matryoshka import MatryoshkaQaPairRepository
+from app.infrastructure.vector.numpy_qa_pair_repository import NumpyQaPairRepository
+from app.infrastructure.vector.quantized_qa_pair_repository import (
+    QuantizedQaPairRepository,
+)
+from app.infrastructure.vector.topic_router import CentroidTopicRouter
+
+RETRIEVER_BACKEND_POSTGRES = "postgres"
+RETRIEVER_BACKEND_NUMPY = "numpy"
+RETRIEVER_BACKEND_SNAPSHOT = "snapshot"
+
+
+async def load_in_memory_qa_repository(
+    backend: str = RAG_RETRIEVER_BACKEND,
+    quantization: str = RAG_QUANTIZATION,
+    matryoshka: bool = RAG_MATRYOSHKA,
+    embedding_model: Optional[str] = None,
+) -> Optional[QaPairRepository]:
+    """
+    Build the process-wide in-memory QA repository for the configured backend.
+
+    Returns None for the Postgres backend: callers then create a
+    SqlAlchemyQaPairRepository per session as before. A snapshot built with a
+    model other than `embedding_model` (the live one) is refused and Postgres
+    is used until the snapshot is re-exported.
+    """
+    logger.info("QA retriever backend: {}", backend)
+    if backend == RETRIEVER_BACKEND_POSTGRES:
+        return None
+
+    base: NumpyQaPairRepository
+    if backend == RETRIEVER_BACKEND_NUMPY:
+        async with SessionLocal() as session:
+            base = await NumpyQaPairRepository.from_repository(
+                SqlAlchemyQaPairRepository(session)
+            )
+    elif backend == RETRIEVER_BACKEND_SNAPSHOT:
+        try:
+            base = NumpyQaPairRepository.from_snapshot(
+                RAG_SNAPSHOT_PATH, embedding_model=embedding_model
+            )
+        except EmbeddingModelMismatchError as exc:
+            logger.error(
+                "{}; falling back to the postgres retriever until the snapshot is re-exported",
+                exc,
+            )
+            return None
+    else:
+        raise ValueError(f"Unknown RAG_RETRIEVER_BACKEND: {backend}")
+
+    if quantization and backend == RETRIEVER_BACKEND_NUMPY:
+        # Rescoring needs the float32 rows; loaded from the DB they stay
+        # resident, so the codes would only add memory on top.
+        logger.warning(
+            "RAG_QUANTIZATION={} ignored for the numpy backend: it saves memory "
+            "only over a memory-mapped snapshot (RAG_RETRIEVER_BACKEND=snapshot)",
+            quantization,
+        )
+        quantization = ""
+
+    if not quantization:
+        if matryoshka:
+            return _matryoshka_repository(base)
+        return base
+
+    quantized = QuantizedQaPairRepository(
+        base,
+        mode=quantization,
+        rescore_factor=RAG_QUANTIZATION_RESCORE_FACTOR,
+    )
+    if RAG_QUANTIZATION_RECALL_SAMPLE > 0:
+        logger.info(
+            "Quantized index recall@{} vs exact search: {:.4f} (sample={})",
+            RAG_TOP_K,
+            quantized.recall_at_k(
+                RAG_TOP_K, sample_size=RAG_QUANTIZATION_RECALL_SAMPLE
+            ),
+            RAG_QUANTIZATION_RECALL_SAMPLE,
+        )
+    return quantized
+
+
+def _matryoshka_repository(base: NumpyQaPairRepository) -> MatryoshkaQaPairRepository:
+    repo = MatryoshkaQaPairRepository(
+        base,
+        dim=RAG_SHORT_EMBEDDING_DIM,
+        rescore_factor=RAG_MATRYOSHKA_RESCORE_FACTOR,
+    )
+    if RAG_QUANTIZATION_RECALL_SAMPLE > 0:
+        logger.info(
+            "Matryoshka index recall@{} vs full-dimension search: {:.4f} (sample={})",
+            RAG_TOP_K,
+            repo.recall_at_k(RAG_TOP_K, sample_size=RAG_QUANTIZATION_RECALL_SAMPLE),
+            RAG_QUANTIZATION_RECALL_SAMPLE,
+        )
+    return repo
+
+
+async def load_topic_router(
+    qa_repo: Optional[QaPairRepository] = None,
+    enabled: bool = RAG_TOPIC_ROUTING,
+    centroids_path: str = RAG_TOPIC_CENTROIDS_PATH,
+    embedding_model: Optional[str] = None,
+) -> Optional[TopicRouter]:
+    """
+    Topic router from the saved centroids file, or computed on the fly from
+    the in-memory index / Postgres when the file does not exist or was built
+    with a model other than `embedding_model`.
+    """
+    if not enabled:
+        return None
+
+    router: Optional[CentroidTopicRouter] = None
+    if Path(centroids_path).is_file():
+        try:
+            router = CentroidTopicRouter.load(
+                centroids_path, embedding_model=embedding_model
+            )
+            source = centroids_path
+        except EmbeddingModelMismatchError as exc:
+            logger.error("{}; computing centroids instead", exc)
+    if router is None:
+        base = (
+            qa_repo.base
+            if isinstance(
+                qa_repo, (QuantizedQaPairRepository, MatryoshkaQaPairRepository)
+            )
+            else qa_repo
+        )
+        if isinstance(base, NumpyQaPairRepository):
+            router = CentroidTopicRouter.from_matrix(
+                base.matrix, [qa.topic for qa in base.qa_pairs]
+            )
+            source = "in-memory index"
+        else:
+            async with SessionLocal() as session:
+                router = CentroidTopicRouter(await compute_topic_centroids(session))
+            source = "postgres"
+
+    logger.info(
+        "Topic router loaded (source={}, topics={})", source, len(router.topics)
+    )
+    return router
@@ -0,0 +1,208 @@
+from typing import Mapping, Optional, Sequence
+
+import numpy as np
+import numpy.typing as npt
+from loguru import logger
+
+from app.domain.interfaces.qa_pair_repository import QaPairRepository
+from app.domain.models.embedding import (
+    Embedding,
+    as_embedding,
+    l2_normalize,
+    l2_normalize_rows,
+)
+from app.domain.models.qa_pair import QaPair, QaPairHit
+from app.eval.retrieval import mean_recall_at_k
+from app.infrastructure.vector.numpy_qa_pair_repository import (
+    NumpyQaPairRepository,
+    Partition,
+    partition_rows,
+    top_k_indices,
+    top_k_indices_2d,
+)
+
+
+def truncate_embedding(embedding: Embedding, dim: int) -> Embedding:
+    """
+    First `dim` components, re-normalized to unit length. Matches
+    l2_normalize(subvector(embedding, 1, dim)) of qa_pairs.embedding_short.
+    """
+    return l2_normalize(as_embedding(embedding)[:dim])
+
+
+class MatryoshkaQaPairRepository(QaPairRepository):
+    """
+    Two-stage search over a NumpyQaPairRepository: a coarse scan on the
+    re-normalized `dim`-prefix of every embedding selects
+    `k * rescore_factor` candidates, which are rescored on the full vectors.
+    Only valid for Matryoshka-trained embedding models, whose prefixes are
+    embeddings in their own right.
+    """
+
+    def __init__(
+        self,
+        base: NumpyQaPairRepository,
+        *,
+        dim: int,
+        rescore_factor: int = 4,
+    ) -> None:
+        if not 0 < dim <= base.dim:
+            raise ValueError(f"Short dim {dim} must be in 1..{base.dim}")
+        self._base = base
+        self._dim = int(dim)
+        self._rescore_factor = max(1, int(rescore_factor))
+        self._short = l2_normalize_rows(np.asarray(base.matrix[:, : self._dim]))
+        logger.info(
+            "Matryoshka QA index built (dim={}/{}, count={}, bytes={})",
+            self._dim,
+            base.dim,
+            len(base),
+            self._short.nbytes,
+        )
+
+    @property
+    def base(self) -> NumpyQaPairRepository:
+        return self._base
+
+    @property
+    def nbytes(self) -> int:
+        return int(self._short.nbytes)
+
+    def _coarse_scores(
+        self,
+        queries: npt.NDArray[np.float32],
+        topics: Optional[Sequence[str]] = None,
+    ) -> tuple[Optional[npt.NDArray[np.intp]], npt.NDArray[np.float32]]:
+        short_queries = l2_normalize_rows(queries[:, : self._dim])
+        if not topics:
+            return None, short_queries @ self._short.T
+
+        partitions: list[Partition] = self._base.topic_partitions(topics)
+        if not partitions:
+            return np.empty(0, dtype=np.intp), np.empty(
+                (queries.shape[0], 0), dtype=np.float32
+            )
+        scores = np.hstack([short_queries @ self._short[part].T for part in partitions])
+        return partition_rows(partitions), scores
+
+    def _rescore(
+        self, query: npt.NDArray[np.float32], shortlist: npt.NDArray[np.intp], k: int
+    ) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.float32]]:
+        shortlist = np.sort(shortlist)
+        exact_scores = (self._base.matrix[shortlist] @ query).astype(np.float32)
+        order = top_k_indices(exact_scores, k)
+        return shortlist[order], exact_scores[order]
+
+    def _search(
+        self,
+        query: npt.NDArray[np.float32],
+        k: int,
+        topics: Optional[Sequence[str]] = None,
+    ) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.float32]]:
+        rows, coarse = self._coarse_scores(query[np.newaxis, :], topics)
+        shortlist = top_k_indices(coarse[0], k * self._rescore_factor)
+        if rows is not None:
+            shortlist = rows[shortlist]
+        return self._rescore(query, shortlist, k)
+
+    async def add(self, qa: QaPair) -> QaPair:
+        await self.add_many([qa])
+        return qa
+
+    async def add_many(self, qa_list: Sequence[QaPair]) -> None:
+        await self._base.add_many(qa_list)
+        self._short = l2_normalize_rows(np.asarray(self._base.matrix[:, : self._dim]))
+
+    async def list_all(self) -> Sequence[QaPair]:
+        return await self._base.list_all()
+
+    async def get_embeddings(self, ids: Sequence[int]) -> Mapping[int, Embedding]:
+        return await self._base.get_embeddings(ids)
+
+    async def find_top_k(
+        self,
+        query_embedding: Embedding,
+        k: int,
+        max_distance: Optional[float] = None,
+        topics: Optional[Sequence[str]] = None,
+    ) -> Sequence[QaPairHit]:
+        if not len(self._base):
+            return []
+
+        indices, scores = self._search(
+            self._base.normalize_query(query_embedding), k, topics
+        )
+        hits = self._base.build_hits(indices, scores, max_distance)
+
+        logger.info(
+            "Matryoshka vector search returned {} items (k={}, dim={}, topics={}): {}",
+            len(hits),
+            k,
+            self._dim,
+            topics,
+            [(hit.qa_pair.id, round(hit.similarity, 4)) for hit in hits],
+        )
+        return hits
+
+    async def find_top_k_many(
+        self,
+        query_embeddings: Sequence[Embedding],
+        k: int,
+        max_distance: Optional[float] = None,
+        topics: Optional[Sequence[str]] = None,
+        *,
+        query_block: int = 256,
+    ) -> Sequence[Sequence[QaPairHit]]:
+        if not query_embeddings:
+            return []
+        if not len(self._base):
+            return [[] for _ in query_embeddings]
+
+        queries = self._base.normalize_queries(query_embeddings)
+        hits_per_query: list[Sequence[QaPairHit]] = []
+        for start in range(0, queries.shape[0], query_block):
+            block = queries[start : start + query_block]
+            rows, coarse = self._coarse_scores(block, topics)
+            shortlists = top_k_indices_2d(coarse, k * self._rescore_factor)
+            if rows is not None:
+                shortlists = rows[shortlists]
+            for query, shortlist in zip(block, shortlists, strict=True):
+                indices, scores = self._rescore(query, shortlist, k)
+                hits_per_query.append(
+                    self._base.build_hits(indices, scores, max_distance)
+                )
+
+        logger.info(
+            "Matryoshka batched vector search (queries={}, k={}, dim={}, topics={})",
+            len(hits_per_query),
+            k,
+            self._dim,
+            topics,
+        )
+        return hits_per_query
+
+    def recall_at_k(
+        self, k: int, sample_size: int = 200, seed: Optional[int] = 0
+    ) -> float:
+        """
+        Mean recall@k against exact full-dimension search, using stored rows
+        as queries (each query's own row is excluded from both result lists).
+        """
+        matrix = self._base.matrix
+        if not matrix.shape[0]:
+            return 1.0
+
+        rng = np.random.default_rng(seed)
+        sample = rng.choice(
+            matrix.shape[0], size=min(sample_size, matrix.shape[0]), replace=False
+        )
+        expected: list[list[int]] = []
+        actual: list[list[int]] = []
+        for row in sample:
+            query = np.asarray(matrix[row], dtype=np.float32)
+            exact = top_k_indices((matrix @ query).astype(np.float32), k + 1)
+            approx, _ = self._search(query, k + 1)
+            expected.append([int(i) for i in exact if i != row][:k])
+            actual.append([int(i) for i in approx if i != row][:k])
+
+        return mean_recall_at_k(expected, actual, k)
@@ -0,0 +1,358 @@
+from pathlib import Path
+from typing import Mapping, Optional, Sequence, TypeAlias
+
+import numpy as np
+import numpy.typing as npt
+from loguru import logger
+
+from app.domain.interfaces.qa_pair_repository import QaPairRepository
+from app.domain.models.embedding import (
+    Embedding,
+    as_embedding,
+    as_embedding_matrix,
+    ensure_embedding_model,
+    l2_normalize_rows,
+)
+from app.domain.models.qa_pair import QaPair, QaPairHit, QaPairProjection
+from app.infrastructure.config import EMBEDDING_MODEL_NAME
+from app.infrastructure.vector.snapshot import open_snapshot
+
+# Rows of one topic: a slice when they are contiguous (a view, no copy),
+# otherwise an index array.
+Partition: TypeAlias = slice | npt.NDArray[np.intp]
+
+
+def top_k_indices(scores: npt.NDArray[np.float32], k: int) -> npt.NDArray[np.intp]:
+    """
+    Indices of the k largest scores, sorted by score descending.
+    """
+    n = int(scores.shape[0])
+    k = min(int(k), n)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < n:
+        idx = np.argpartition(-scores, k - 1)[:k]
+    else:
+        idx = np.arange(n)
+    return idx[np.argsort(-scores[idx], kind="stable")]
+
+
+def partition_rows(partitions: Sequence[Partition]) -> npt.NDArray[np.intp]:
+    """
+    Matrix row numbers covered by `partitions`, in partition order.
+    """
+    rows = [
+        (
+            np.arange(part.start, part.stop, dtype=np.intp)
+            if isinstance(part, slice)
+            else part
+        )
+        for part in partitions
+    ]
+    return np.concatenate(rows) if rows else np.empty(0, dtype=np.intp)
+
+
+def top_k_indices_2d(scores: npt.NDArray[np.float32], k: int) -> npt.NDArray[np.intp]:
+    """
+    Row-wise `top_k_indices` for a (queries, rows) score matrix.
+    """
+    n = int(scores.shape[1])
+    k = min(int(k), n)
+    if k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.intp)
+    if k < n:
+        idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        idx = np.broadcast_to(np.arange(n), scores.shape)
+    top_scores = np.take_along_axis(scores, idx, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind="stable")
+    return np.take_along_axis(idx, order, axis=1)
+
+
+class NumpyQaPairRepository(QaPairRepository):
+    """
+    Read-mostly in-process replica of qa_pairs: all embeddings live in one
+    contiguous, L2-normalized float32 matrix and search is a single matmul.
+    Rows are kept grouped by topic where possible, so a topic-filtered search
+    multiplies only that topic's sub-matrix.
+    """
+
+    def __init__(
+        self,
+        qa_pairs: Sequence[QaPair],
+        *,
+        matrix: Optional[npt.NDArray[np.float32]] = None,
+    ) -> None:
+        """
+        `matrix`, when given, must already hold the L2-normalized float32 rows
+        of `qa_pairs`; it is used as-is (e.g. a read-only memory map).
+        """
+        self._qa_pairs: list[QaPair] = []
+        self._projections: list[QaPairProjection] = []
+        self._row_by_id: dict[int, int] = {}
+        self._partitions: dict[str, Partition] = {}
+        self._matrix: npt.NDArray[np.float32] = np.empty((0, 0), dtype=np.float32)
+        if matrix is None:
+            self._append(qa_pairs)
+            return
+
+        if matrix.dtype != np.float32 or matrix.shape[0] != len(qa_pairs):
+            raise ValueError("matrix must be float32 with one row per QA pair")
+        self._matrix = matrix
+        self._qa_pairs = list(qa_pairs)
+        self._reindex()
+
+    @classmethod
+    async def from_repository(cls, source: QaPairRepository) -> "NumpyQaPairRepository":
+        qa_pairs = [qa for qa in await source.list_all() if qa.duplicate_of is None]
+        repo = cls(sorted(qa_pairs, key=lambda qa: (qa.topic, qa.id or 0)))
+        logger.info(
+            "In-memory QA index loaded (count={}, dim={}, bytes={}, topics={})",
+            len(repo),
+            repo.dim,
+            repo.nbytes,
+            len(repo.topics),
+        )
+        return repo
+
+    @classmethod
+    def from_snapshot(
+        cls, path: str | Path, *, embedding_model: Optional[str] = None
+    ) -> "NumpyQaPairRepository":
+        """
+        With `embedding_model` (the model of the live qa_pairs.embedding) a
+        snapshot of another model raises EmbeddingModelMismatchError.
+        """
+        snapshot = open_snapshot(path)
+        ensure_embedding_model(
+            f"Snapshot {snapshot.path}", snapshot.embedding_model_name, embedding_model
+        )
+        if (
+            embedding_model is None
+            and snapshot.embedding_model_name
+            and EMBEDDING_MODEL_NAME
+            and snapshot.embedding_model_name != EMBEDDING_MODEL_NAME
+        ):
+            logger.warning(
+                "Snapshot embedding model {} differs from EMBEDDING_MODEL_NAME {}",
+                snapshot.embedding_model_name,
+                EMBEDDING_MODEL_NAME,
+            )
+        repo = cls(snapshot.qa_pairs, matrix=snapshot.matrix)
+        logger.info(
+            "Memory-mapped QA index opened (path={}, count={}, dim={}, created_at={})",
+            snapshot.path,
+            len(repo),
+            repo.dim,
+            snapshot.created_at,
+        )
+        return repo
+
+    def __len__(self) -> int:
+        return len(self._qa_pairs)
+
+    @property
+    def dim(self) -> int:
+        return int(self._matrix.shape[1])
+
+    @property
+    def nbytes(self) -> int:
+        return int(self._matrix.nbytes)
+
+    @property
+    def matrix(self) -> npt.NDArray[np.float32]:
+        return self._matrix
+
+    @property
+    def qa_pairs(self) -> Sequence[QaPair]:
+        return self._qa_pairs
+
+    @property
+    def topics(self) -> list[str]:
+        return list(self._partitions)
+
+    def topic_partitions(self, topics: Sequence[str]) -> list[Partition]:
+        """
+        Row partitions of the known `topics` (unknown ones are skipped).
+        """
+        return [
+            self._partitions[topic]
+            for topic in dict.fromkeys(topics)
+            if topic in self._partitions
+        ]
+
+    def _append(self, qa_list: Sequence[QaPair]) -> None:
+        if not qa_list:
+            return
+
+        new_rows = l2_normalize_rows(
+            as_embedding_matrix([qa.embedding for qa in qa_list])
+        )
+        matrix = (
+            new_rows if self._matrix.size == 0 else np.vstack([self._matrix, new_rows])
+        )
+        self._matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        self._qa_pairs.extend(qa_list)
+        for i, qa in enumerate(self._qa_pairs):
+            # Point the domain object at its matrix row instead of keeping a
+            # second copy of the vector as a list of Python floats.
+            qa.embedding = self._matrix[i]
+        self._reindex()
+
+    def _reindex(self) -> None:
+        self._projections = [qa.to_projection() for qa in self._qa_pairs]
+        self._row_by_id = {
+            qa.id: row for row, qa in enumerate(self._qa_pairs) if qa.id is not None
+        }
+
+        rows_by_topic: dict[str, list[int]] = {}
+        for row, qa in enumerate(self._qa_pairs):
+            rows_by_topic.setdefault(qa.topic, []).append(row)
+        self._partitions = {}
+        for topic, rows in rows_by_topic.items():
+            if rows[-1] - rows[0] + 1 == len(rows):
+                self._partitions[topic] = slice(rows[0], rows[-1] + 1)
+            else:
+                self._partitions[topic] = np.asarray(rows, dtype=np.intp)
+
+    def normalize_queries(
+        self, query_embeddings: Sequence[Embedding]
+    ) -> npt.NDArray[np.float32]:
+        queries = as_embedding_matrix(query_embeddings)
+        if queries.ndim != 2 or queries.shape[1] != self.dim:
+            raise ValueError(
+                f"Query embeddings shape {queries.shape} does not match index dim {self.dim}"
+            )
+        return l2_normalize_rows(queries)
+
+    def score(
+        self,
+        queries: npt.NDArray[np.float32],
+        topics: Optional[Sequence[str]] = None,
+    ) -> tuple[Optional[npt.NDArray[np.intp]], npt.NDArray[np.float32]]:
+        """
+        Cosine scores of a (queries, dim) batch against all rows, or only the
+        rows of `topics`. Returns the row numbers of the score columns (None
+        when all rows were scored) and the (queries, rows) score matrix.
+        """
+        if not topics:
+            return None, queries @ self._matrix.T
+
+        partitions = self.topic_partitions(topics)
+        if not partitions:
+            return np.empty(0, dtype=np.intp), np.empty(
+                (queries.shape[0], 0), dtype=np.float32
+            )
+        scores = np.hstack([queries @ self._matrix[part].T for part in partitions])
+        return partition_rows(partitions), scores
+
+    def build_hits(
+        self,
+        indices: npt.NDArray[np.intp],
+        scores: npt.NDArray[np.float32],
+        max_distance: Optional[float] = None,
+    ) -> list[QaPairHit]:
+        """
+        Hits for row `indices` whose cosine similarities are `scores`.
+        """
+        if max_distance is not None:
+            keep = scores >= 1.0 - max_distance
+            indices, scores = indices[keep], scores[keep]
+        return [
+            QaPairHit(
+                qa_pair=self._projections[int(idx)],
+                rank=rank,
+                distance=1.0 - float(score),
+                similarity=float(score),
+            )
+            for rank, (idx, score) in enumerate(zip(indices, scores, strict=True))
+        ]
+
+    def normalize_query(self, query_embedding: Embedding) -> npt.NDArray[np.float32]:
+        query = as_embedding(query_embedding)
+        if query.shape != (self.dim,):
+            raise ValueError(
+                f"Query embedding dimension {query.shape} does not match index dim {self.dim}"
+            )
+        norm = float(np.linalg.norm(query))
+        return query / norm if norm else query
+
+    async def add(self, qa: QaPair) -> QaPair:
+        self._append([qa])
+        return qa
+
+    async def add_many(self, qa_list: Sequence[QaPair]) -> None:
+        self._append(qa_list)
+
+    async def list_all(self) -> Sequence[QaPair]:
+        return list(self._qa_pairs)
+
+    async def get_embeddings(self, ids: Sequence[int]) -> Mapping[int, Embedding]:
+        rows = {
+            qa_id: self._row_by_id[qa_id] for qa_id in ids if qa_id in self._row_by_id
+        }
+        return {qa_id: self._matrix[row] for qa_id, row in rows.items()}
+
+    async def find_top_k(
+        self,
+        query_embedding: Embedding,
+        k: int,
+        max_distance: Optional[float] = None,
+        topics: Optional[Sequence[str]] = None,
+    ) -> Sequence[QaPairHit]:
+        if not self._qa_pairs:
+            return []
+
+        rows, scores_2d = self.score(
+            self.normalize_query(query_embedding)[np.newaxis, :], topics
+        )
+        scores = scores_2d[0]
+        indices = top_k_indices(scores, k)
+        hits = self.build_hits(
+            indices if rows is None else rows[indices], scores[indices], max_distance
+        )
+
+        logger.info(
+            "In-memory vector search returned {} items (k={}, topics={}): {}",
+            len(hits),
+            k,
+            topics,
+            [(hit.qa_pair.id, round(hit.similarity, 4)) for hit in hits],
+        )
+        return hits
+
+    async def find_top_k_many(
+        self,
+        query_embeddings: Sequence[Embedding],
+        k: int,
+        max_distance: Optional[float] = None,
+        topics: Optional[Sequence[str]] = None,
+        *,
+        query_block: int = 256,
+    ) -> Sequence[Sequence[QaPairHit]]:
+        if not query_embeddings:
+            return []
+        if not self._qa_pairs:
+            return [[] for _ in query_embeddings]
+
+        queries = self.normalize_queries(query_embeddings)
+        hits_per_query: list[Sequence[QaPairHit]] = []
+        # Block over queries so the (queries, rows) score matrix stays bounded.
+        for start in range(0, queries.shape[0], query_block):
+            rows, scores = self.score(queries[start : start + query_block], topics)
+            indices = top_k_indices_2d(scores, k)
+            top_scores = np.take_along_axis(scores, indices, axis=1)
+            if rows is not None:
+                indices = rows[indices]
+            hits_per_query.extend(
+                self.build_hits(row_idx, row_scores, max_distance)
+                for row_idx, row_scores in zip(indices, top_scores, strict=True)
+            )
+
+        logger.info(
+            "In-memory batched vector search (queries={}, k={}, topics={})",
+            len(hits_per_query),
+            k,
+            topics,
+        )
+        return hits_per_query
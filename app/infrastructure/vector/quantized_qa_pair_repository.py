@@ -0,0 +1,253 @@
+from dataclasses import dataclass
+from typing import Mapping, Optional, Sequence
+
+import numpy as np
+import numpy.typing as npt
+from loguru import logger
+
+from app.domain.interfaces.qa_pair_repository import QaPairRepository
+from app.domain.models.embedding import Embedding
+from app.domain.models.qa_pair import QaPair, QaPairHit
+from app.eval.retrieval import mean_recall_at_k
+from app.infrastructure.vector.numpy_qa_pair_repository import (
+    NumpyQaPairRepository,
+    Partition,
+    partition_rows,
+    top_k_indices,
+    top_k_indices_2d,
+)
+
+QUANTIZATION_INT8 = "int8"
+QUANTIZATION_FLOAT16 = "float16"
+QUANTIZATION_MODES = (QUANTIZATION_INT8, QUANTIZATION_FLOAT16)
+
+
+@dataclass(frozen=True)
+class QuantizedMatrix:
+    mode: str
+    codes: npt.NDArray[np.int8] | npt.NDArray[np.float16]
+    # Per-dimension dequantization scale, only for int8.
+    scale: Optional[npt.NDArray[np.float32]]
+
+    @property
+    def nbytes(self) -> int:
+        scale_bytes = self.scale.nbytes if self.scale is not None else 0
+        return int(self.codes.nbytes + scale_bytes)
+
+
+def quantize(matrix: npt.NDArray[np.float32], mode: str) -> QuantizedMatrix:
+    if mode == QUANTIZATION_FLOAT16:
+        return QuantizedMatrix(
+            mode=mode, codes=np.ascontiguousarray(matrix, dtype=np.float16), scale=None
+        )
+    if mode == QUANTIZATION_INT8:
+        max_abs = np.abs(matrix).max(axis=0) if matrix.size else np.ones(0)
+        scale = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+        codes = np.clip(np.rint(matrix / scale), -127, 127).astype(np.int8)
+        return QuantizedMatrix(
+            mode=mode, codes=np.ascontiguousarray(codes), scale=scale
+        )
+    raise ValueError(f"Unknown quantization mode: {mode}")
+
+
+class QuantizedQaPairRepository(QaPairRepository):
+    """
+    Two-stage search over a NumpyQaPairRepository: a coarse scan on int8/float16
+    codes selects `k * rescore_factor` candidates, which are then rescored on
+    the full-precision float32 rows. With a memory-mapped base only the
+    compact codes need to stay resident.
+    """
+
+    def __init__(
+        self,
+        base: NumpyQaPairRepository,
+        *,
+        mode: str = QUANTIZATION_INT8,
+        rescore_factor: int = 4,
+        block_rows: int = 4096,
+    ) -> None:
+        if mode not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization mode: {mode}")
+        self._base = base
+        self._mode = mode
+        self._rescore_factor = max(1, int(rescore_factor))
+        self._block_rows = max(1, int(block_rows))
+        self._quantized = quantize(base.matrix, mode)
+        logger.info(
+            "Quantized QA index built (mode={}, count={}, bytes={}, float32_bytes={})",
+            mode,
+            len(base),
+            self._quantized.nbytes,
+            base.nbytes,
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return self._quantized.nbytes
+
+    @property
+    def base(self) -> NumpyQaPairRepository:
+        return self._base
+
+    def _coarse_scores(
+        self,
+        queries: npt.NDArray[np.float32],
+        topics: Optional[Sequence[str]] = None,
+    ) -> tuple[Optional[npt.NDArray[np.intp]], npt.NDArray[np.float32]]:
+        """
+        Approximate scores for a (queries, dim) batch, shape (queries, rows),
+        over all rows or only the rows of `topics` (see
+        NumpyQaPairRepository.score for the returned row numbers).
+        """
+        if self._quantized.scale is not None:
+            # x ≈ codes * scale, so x·q = codes·(scale * q).
+            queries = (queries * self._quantized.scale).astype(np.float32)
+
+        partitions: list[Partition]
+        rows: Optional[npt.NDArray[np.intp]]
+        if topics:
+            partitions = self._base.topic_partitions(topics)
+            rows = partition_rows(partitions)
+        else:
+            partitions = [slice(0, len(self._base))]
+            rows = None
+
+        # NumPy has no int8/float16 GEMM: upcast block by block so the float32
+        # temporary stays cache-sized while memory traffic is on the codes.
+        total = sum(
+            part.stop - part.start if isinstance(part, slice) else len(part)
+            for part in partitions
+        )
+        scores = np.empty((queries.shape[0], total), dtype=np.float32)
+        offset = 0
+        for part in partitions:
+            codes = self._quantized.codes[part]
+            for start in range(0, codes.shape[0], self._block_rows):
+                block = codes[start : start + self._block_rows].astype(np.float32)
+                scores[:, offset + start : offset + start + block.shape[0]] = (
+                    queries @ block.T
+                )
+            offset += codes.shape[0]
+        return rows, scores
+
+    def _rescore(
+        self, query: npt.NDArray[np.float32], shortlist: npt.NDArray[np.intp], k: int
+    ) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.float32]]:
+        shortlist = np.sort(shortlist)
+        exact_scores = (self._base.matrix[shortlist] @ query).astype(np.float32)
+        order = top_k_indices(exact_scores, k)
+        return shortlist[order], exact_scores[order]
+
+    def _search(
+        self,
+        query: npt.NDArray[np.float32],
+        k: int,
+        topics: Optional[Sequence[str]] = None,
+    ) -> tuple[npt.NDArray[np.intp], npt.NDArray[np.float32]]:
+        rows, coarse = self._coarse_scores(query[np.newaxis, :], topics)
+        shortlist = top_k_indices(coarse[0], k * self._rescore_factor)
+        if rows is not None:
+            shortlist = rows[shortlist]
+        return self._rescore(query, shortlist, k)
+
+    async def add(self, qa: QaPair) -> QaPair:
+        await self.add_many([qa])
+        return qa
+
+    async def add_many(self, qa_list: Sequence[QaPair]) -> None:
+        await self._base.add_many(qa_list)
+        self._quantized = quantize(self._base.matrix, self._mode)
+
+    async def list_all(self) -> Sequence[QaPair]:
+        return await self._base.list_all()
+
+    async def get_embeddings(self, ids: Sequence[int]) -> Mapping[int, Embedding]:
+        return await self._base.get_embeddings(ids)
+
+    async def find_top_k(
+        self,
+        query_embedding: Embedding,
+        k: int,
+        max_distance: Optional[float] = None,
+        topics: Optional[Sequence[str]] = None,
+    ) -> Sequence[QaPairHit]:
+        if not len(self._base):
+            return []
+
+        indices, scores = self._search(
+            self._base.normalize_query(query_embedding), k, topics
+        )
+        hits = self._base.build_hits(indices, scores, max_distance)
+
+        logger.info(
+            "Quantized vector search returned {} items (k={}, mode={}, topics={}): {}",
+            len(hits),
+            k,
+            self._mode,
+            topics,
+            [(hit.qa_pair.id, round(hit.similarity, 4)) for hit in hits],
+        )
+        return hits
+
+    async def find_top_k_many(
+        self,
+        query_embeddings: Sequence[Embedding],
+        k: int,
+        max_distance: Optional[float] = None,
+        topics: Optional[Sequence[str]] = None,
+        *,
+        query_block: int = 256,
+    ) -> Sequence[Sequence[QaPairHit]]:
+        if not query_embeddings:
+            return []
+        if not len(self._base):
+            return [[] for _ in query_embeddings]
+
+        queries = self._base.normalize_queries(query_embeddings)
+        hits_per_query: list[Sequence[QaPairHit]] = []
+        for start in range(0, queries.shape[0], query_block):
+            block = queries[start : start + query_block]
+            rows, coarse = self._coarse_scores(block, topics)
+            shortlists = top_k_indices_2d(coarse, k * self._rescore_factor)
+            if rows is not None:
+                shortlists = rows[shortlists]
+            for query, shortlist in zip(block, shortlists, strict=True):
+                indices, scores = self._rescore(query, shortlist, k)
+                hits_per_query.append(
+                    self._base.build_hits(indices, scores, max_distance)
+                )
+
+        logger.info(
+            "Quantized batched vector search (queries={}, k={}, mode={}, topics={})",
+            len(hits_per_query),
+            k,
+            self._mode,
+            topics,
+        )
+        return hits_per_query
+
+    def recall_at_k(
+        self, k: int, sample_size: int = 200, seed: Optional[int] = 0
+    ) -> float:
+        """
+        Mean recall@k against exact float32 search, using stored rows as queries
+        (each query's own row is excluded from both result lists).
+        """
+        matrix = self._base.matrix
+        if not matrix.shape[0]:
+            return 1.0
+
+        rng = np.random.default_rng(seed)
+        sample = rng.choice(
+            matrix.shape[0], size=min(sample_size, matrix.shape[0]), replace=False
+        )
+        expected: list[list[int]] = []
+        actual: list[list[int]] = []
+        for row in sample:
+            query = np.asarray(matrix[row], dtype=np.float32)
+            exact = top_k_indices((matrix @ query).astype(np.float32), k + 1)
+            approx, _ = self._search(query, k + 1)
+            expected.append([int(i) for i in exact if i != row][:k])
+            actual.append([int(i) for i in approx if i != row][:k])
+
+        return mean_recall_at_k(expected, actual, k)
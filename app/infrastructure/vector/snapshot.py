@@ -0,0 +1,191 @@
+import json
+import os
+import shutil
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional, Sequence, cast
+
+import numpy as np
+import numpy.typing as npt
+from loguru import logger
+
+from app.domain.models.embedding import as_embedding, l2_normalize
+from app.domain.models.qa_pair import QaPair
+
+SNAPSHOT_FORMAT_VERSION = 1
+EMBEDDINGS_FILE = "embeddings.npy"
+METADATA_FILE = "metadata.json"
+
+
+@dataclass(frozen=True)
+class EmbeddingSnapshot:
+    """
+    Opened snapshot: `matrix` is a read-only memory map over embeddings.npy,
+    so every process that opens the same file shares its page cache.
+    """
+
+    path: Path
+    matrix: npt.NDArray[np.float32]
+    qa_pairs: list[QaPair]
+    embedding_model_name: Optional[str]
+    created_at: Optional[str]
+
+
+class SnapshotWriter:
+    """
+    Streams normalized embeddings into a preallocated .npy memmap and writes
+    the metadata sidecar on `close()`. Each snapshot is written to its own
+    directory under `<path>.versions/`, and `path` is a symlink that is
+    atomically replaced at the end, so readers always find a complete
+    snapshot, even if the writer crashes midway.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        count: int,
+        dim: int,
+        embedding_model_name: Optional[str],
+    ) -> None:
+        self._path = Path(path)
+        self._versions_path = self._path.with_name(self._path.name + ".versions")
+        version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        self._tmp_path = self._versions_path / version
+        self._tmp_path.mkdir(parents=True)
+
+        self._count = count
+        self._dim = dim
+        self._embedding_model_name = embedding_model_name
+        self._matrix = np.lib.format.open_memmap(
+            self._tmp_path / EMBEDDINGS_FILE,
+            mode="w+",
+            dtype=np.float32,
+            shape=(count, dim),
+        )
+        self._items: list[dict[str, Any]] = []
+
+    def append(self, qa: QaPair) -> None:
+        row = len(self._items)
+        if row >= self._count:
+            raise ValueError(f"Snapshot already holds {self._count} rows")
+
+        self._matrix[row] = l2_normalize(as_embedding(qa.embedding))
+        self._items.append(
+            {
+                "id": qa.id,
+                "question": qa.question,
+                "answer": qa.answer,
+                "source_url": qa.source_url,
+                "topic": qa.topic,
+                "is_generated": qa.is_generated,
+                "token_count": qa.token_count,
+                "created_at": qa.created_at.isoformat() if qa.created_at else None,
+            }
+        )
+
+    def close(self) -> Path:
+        if len(self._items) != self._count:
+            raise ValueError(
+                f"Snapshot expected {self._count} rows, got {len(self._items)}"
+            )
+
+        self._matrix.flush()
+        del self._matrix
+
+        metadata = {
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "count": self._count,
+            "dim": self._dim,
+            "embedding_model_name": self._embedding_model_name,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "items": self._items,
+        }
+        (self._tmp_path / METADATA_FILE).write_text(
+            json.dumps(metadata, ensure_ascii=False), encoding="utf-8"
+        )
+
+        self._swap_in()
+        logger.info(
+            "Embedding snapshot written (path={}, count={}, dim={})",
+            self._path,
+            self._count,
+            self._dim,
+        )
+        return self._path
+
+    def _swap_in(self) -> None:
+        previous = self._path.resolve() if self._path.is_symlink() else None
+        if self._path.is_dir() and not self._path.is_symlink():
+            # Layout from before versioning: one-time move of the real
+            # directory, the only moment `path` is briefly missing.
+            legacy = self._versions_path / "legacy"
+            if legacy.exists():
+                shutil.rmtree(legacy)
+            self._path.rename(legacy)
+            previous = legacy.resolve()
+
+        link_tmp = self._path.with_name(self._path.name + ".link.tmp")
+        if link_tmp.is_symlink() or link_tmp.exists():
+            link_tmp.unlink()
+        # Relative target, so the link survives moving or mounting `data/`.
+        link_tmp.symlink_to(Path(self._versions_path.name) / self._tmp_path.name)
+        os.replace(link_tmp, self._path)
+
+        # Keep the new and the previously live version (a reader may be
+        # opening it right now); older ones and crashed writes are removed.
+        keep = {self._tmp_path.resolve(), previous}
+        for version in self._versions_path.iterdir():
+            if version.resolve() not in keep:
+                shutil.rmtree(version, ignore_errors=True)
+
+
+def open_snapshot(path: str | Path) -> EmbeddingSnapshot:
+    # Resolve the symlink once, so both files come from the same version even
+    # if a new snapshot is swapped in meanwhile.
+    snapshot_path = Path(path).resolve()
+    metadata_path = snapshot_path / METADATA_FILE
+    embeddings_path = snapshot_path / EMBEDDINGS_FILE
+    if not metadata_path.is_file() or not embeddings_path.is_file():
+        raise FileNotFoundError(f"Embedding snapshot not found: {snapshot_path}")
+
+    metadata = json.loads(metadata_path.read_text(encoding="utf-8"))
+    if metadata.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported snapshot format version: {metadata.get('format_version')}"
+        )
+
+    matrix = cast(npt.NDArray[np.float32], np.load(embeddings_path, mmap_mode="r"))
+    items: Sequence[dict[str, Any]] = metadata["items"]
+    if matrix.dtype != np.float32 or matrix.shape != (len(items), metadata["dim"]):
+        raise ValueError(
+            f"Snapshot matrix {matrix.dtype}{matrix.shape} does not match metadata"
+        )
+
+    qa_pairs = [
+        QaPair(
+            id=item["id"],
+            question=item["question"],
+            answer=item["answer"],
+            source_url=item["source_url"],
+            topic=item["topic"],
+            is_generated=item["is_generated"],
+            embedding=matrix[i],
+            created_at=(
+                datetime.fromisoformat(item["created_at"])
+                if item["created_at"]
+                else None
+            ),
+            # Absent in snapshots exported before token counts existed.
+            token_count=item.get("token_count"),
+        )
+        for i, item in enumerate(items)
+    ]
+    return EmbeddingSnapshot(
+        path=snapshot_path,
+        matrix=matrix,
+        qa_pairs=qa_pairs,
+        embedding_model_name=metadata.get("embedding_model_name"),
+        created_at=metadata.get("created_at"),
+    )
@@ -0,0 +1,139 @@
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Mapping, Optional, Sequence
+
+import numpy as np
+import numpy.typing as npt
+from loguru import logger
+
+from app.domain.interfaces.topic_router import TopicRouter
+from app.domain.models.embedding import (
+    Embedding,
+    as_embedding,
+    as_embedding_matrix,
+    ensure_embedding_model,
+    l2_normalize,
+    l2_normalize_rows,
+)
+from app.infrastructure.config import (
+    EMBEDDING_MODEL_NAME,
+    RAG_TOPIC_ROUTER_MARGIN,
+    RAG_TOPIC_ROUTER_MAX_TOPICS,
+)
+
+
+class CentroidTopicRouter(TopicRouter):
+    """
+    Routes a query to the topics whose centroid (mean normalized embedding)
+    is closest by cosine: the best topic plus up to `max_topics - 1` others
+    scoring within `margin` of it.
+    """
+
+    def __init__(
+        self,
+        centroids: Mapping[str, Embedding],
+        *,
+        max_topics: int = RAG_TOPIC_ROUTER_MAX_TOPICS,
+        margin: float = RAG_TOPIC_ROUTER_MARGIN,
+    ) -> None:
+        self._topics = list(centroids)
+        self._centroids = (
+            l2_normalize_rows(as_embedding_matrix(list(centroids.values())))
+            if centroids
+            else np.empty((0, 0), dtype=np.float32)
+        )
+        self._max_topics = max(1, int(max_topics))
+        self._margin = float(margin)
+
+    @classmethod
+    def from_matrix(
+        cls,
+        matrix: npt.NDArray[np.float32],
+        topics: Sequence[str],
+        *,
+        max_topics: int = RAG_TOPIC_ROUTER_MAX_TOPICS,
+        margin: float = RAG_TOPIC_ROUTER_MARGIN,
+    ) -> "CentroidTopicRouter":
+        """
+        Centroids of the rows of an L2-normalized `matrix`, labelled `topics`.
+        """
+        labels = np.asarray(topics, dtype=object)
+        centroids = {
+            str(topic): matrix[labels == topic].mean(axis=0, dtype=np.float32)
+            for topic in dict.fromkeys(topics)
+        }
+        return cls(centroids, max_topics=max_topics, margin=margin)
+
+    @classmethod
+    def load(
+        cls,
+        path: str | Path,
+        *,
+        max_topics: int = RAG_TOPIC_ROUTER_MAX_TOPICS,
+        margin: float = RAG_TOPIC_ROUTER_MARGIN,
+        embedding_model: Optional[str] = None,
+    ) -> "CentroidTopicRouter":
+        """
+        With `embedding_model` centroids of another model raise
+        EmbeddingModelMismatchError.
+        """
+        raw = json.loads(Path(path).read_text(encoding="utf-8"))
+        if not isinstance(raw, dict) or not isinstance(raw.get("centroids"), dict):
+            raise ValueError(f"Invalid topic centroids JSON format: {path}")
+        model_name = raw.get("embedding_model_name")
+        ensure_embedding_model(f"Topic centroids {path}", model_name, embedding_model)
+        if (
+            embedding_model is None
+            and model_name
+            and EMBEDDING_MODEL_NAME
+            and model_name != EMBEDDING_MODEL_NAME
+        ):
+            logger.warning(
+                "Topic centroids embedding model {} differs from EMBEDDING_MODEL_NAME {}",
+                model_name,
+                EMBEDDING_MODEL_NAME,
+            )
+        return cls(
+            {topic: as_embedding(row) for topic, row in raw["centroids"].items()},
+            max_topics=max_topics,
+            margin=margin,
+        )
+
+    @property
+    def topics(self) -> list[str]:
+        return list(self._topics)
+
+    def save(self, path: str | Path, *, embedding_model: Optional[str] = None) -> Path:
+        centroids_path = Path(path)
+        centroids_path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "embedding_model_name": embedding_model or EMBEDDING_MODEL_NAME,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "centroids": {
+                topic: row.tolist()
+                for topic, row in zip(self._topics, self._centroids, strict=True)
+            },
+        }
+        centroids_path.write_text(
+            json.dumps(payload, ensure_ascii=False), encoding="utf-8"
+        )
+        logger.info(
+            "Topic centroids saved (path={}, topics={})",
+            centroids_path,
+            len(self._topics),
+        )
+        return centroids_path
+
+    def route(self, query_embedding: Embedding) -> list[str]:
+        if not self._topics:
+            return []
+
+        scores = self._centroids @ l2_normalize(as_embedding(query_embedding))
+        order = np.argsort(-scores, kind="stable")[: self._max_topics]
+        best = float(scores[order[0]])
+        return [
+            self._topics[int(idx)]
+            for idx in order
+            if float(scores[idx]) >= best - self._margin
+        ]
@@ -1,15 +1,25 @@
+from typing import Optional
+
 from aiogram import Router, F
 from aiogram.filters import CommandStart
 from aiogram.types import Message
 from loguru import logger
 
-from app.infrastructure.config import TELEGRAM_WELCOME_PROMPT
+from app.infrastructure.config import (
+    TELEGRAM_STREAM_EDIT_INTERVAL_S,
+    TELEGRAM_STREAMING,
+    TELEGRAM_WELCOME_PROMPT,
+)
 from app.prompts.loader import load_prompt
 from .services import rag_service_context
+from .streaming import ProgressiveReply, split_message
 
 
 router = Router()
 
+_ERROR_TEXT = "Произошла ошибка при обработке вопроса. Попробуй ещё раз позже."
+_PLACEHOLDER_TEXT = "Ищу ответ…"
+
 
 @router.message(CommandStart())
 async def cmd_start(message: Message) -> None:
@@ -30,7 +40,16 @@ async def handle_question(message: Message) -> None:
         message.from_user.id if message.from_user else None,
         len(question),
     )
-    await message.chat.do("typing")
+    reply: Optional[ProgressiveReply] = None
+    if TELEGRAM_STREAMING:
+        reply = ProgressiveReply(
+            message,
+            edit_interval_s=TELEGRAM_STREAM_EDIT_INTERVAL_S,
+            placeholder=_PLACEHOLDER_TEXT,
+        )
+        await reply.start()
+    else:
+        await message.chat.do("typing")
 
     try:
         async with rag_service_context() as rag_service:
@@ -39,11 +58,16 @@ async def handle_question(message: Message) -> None:
                 if message.from_user is not None
                 else int(message.chat.id)
             )
-            answer = await rag_service.answer(question, user_id=user_id)
+            answer = await rag_service.answer(
+                question,
+                user_id=user_id,
+                on_delta=reply.on_delta if reply is not None else None,
+            )
     except Exception as exc:
-        await message.answer(
-            "Произошла ошибка при обработке вопроса. Попробуй ещё раз позже."
-        )
+        if reply is not None:
+            await reply.fail(_ERROR_TEXT)
+        else:
+            await message.answer(_ERROR_TEXT)
         logger.exception("Failed to process question: {}", exc)
         return
 
@@ -53,4 +77,8 @@ async def handle_question(message: Message) -> None:
         message.from_user.id if message.from_user else None,
         len(answer),
     )
-    await message.answer(answer)
+    if reply is not None:
+        await reply.finish(answer)
+        return
+    for part in split_message(answer):
+        await message.answer(part)
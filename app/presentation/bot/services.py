@@ -1,56 +1,162 @@
 import asyncio
+import time
 from contextlib import asynccontextmanager
 from typing import AsyncIterator, Optional
 
 from loguru import logger
 
 from app.application.rag_service import RagService
+from app.domain.interfaces.embedding_provider import EmbeddingProvider
+from app.domain.interfaces.llm_client import LlmClient
+from app.domain.interfaces.qa_pair_repository import QaPairRepository
+from app.domain.interfaces.topic_router import TopicRouter
 from app.infrastructure.db.base import SessionLocal
-from app.infrastructure.db.crud import SqlAlchemyQaPairRepository
+from app.infrastructure.config import (
+    EMBEDDING_BASE_URL,
+    EMBEDDING_MODEL_CHECK_INTERVAL_S,
+    HTTP_POOL_WARMUP,
+    OPENROUTER_BASE_URL,
+    RAG_ANSWER_CACHE,
+    RAG_HYBRID_SEARCH,
+)
+from app.infrastructure.db.answer_cache import SqlAlchemyAnswerCache
+from app.infrastructure.db.crud import (
+    SqlAlchemyLexicalQaPairRetriever,
+    SqlAlchemyQaPairRepository,
+)
 from app.infrastructure.db.rag_run_repository import SqlAlchemyRagRunRepository
-from app.infrastructure.llm.openrouter_embedding_provider import (
-    OpenRouterEmbeddingProvider,
+from app.infrastructure.llm.factory import (
+    create_embedding_provider,
+    create_llm_client,
+)
+from app.infrastructure.llm.http_pool import close_http_pool, warm_up_http_pool
+from app.infrastructure.llm.rate_limiter import log_rate_limiter_stats
+from app.infrastructure.vector.loader import (
+    load_in_memory_qa_repository,
+    load_topic_router,
 )
-from app.infrastructure.llm.openrouter_llm_client import OpenRouterLlmClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
 _shared_clients_lock = asyncio.Lock()
-_shared_embedding_provider: Optional[OpenRouterEmbeddingProvider] = None
-_shared_llm_client: Optional[OpenRouterLlmClient] = None
-
-
-async def _get_shared_clients() -> (
-    tuple[OpenRouterEmbeddingProvider, OpenRouterLlmClient]
-):
+_shared_embedding_provider: Optional[EmbeddingProvider] = None
+_shared_llm_client: Optional[LlmClient] = None
+_shared_qa_repo: Optional[QaPairRepository] = None
+_shared_topic_router: Optional[TopicRouter] = None
+_shared_qa_repo_loaded = False
+_shared_embedding_model: Optional[str] = None
+_active_model: Optional[str] = None
+_active_model_checked_at: Optional[float] = None
+# Process-wide so its hit/miss counters cover every request.
+_shared_answer_cache: Optional[SqlAlchemyAnswerCache] = (
+    SqlAlchemyAnswerCache(SessionLocal) if RAG_ANSWER_CACHE else None
+)
+# Providers replaced after an embedding-model flip. Requests may still hold
+# them, so they are only closed on shutdown.
+_retired_embedding_providers: list[EmbeddingProvider] = []
+
+
+async def _active_embedding_model(session: AsyncSession) -> Optional[str]:
+    # The live model is re-read at most every EMBEDDING_MODEL_CHECK_INTERVAL_S
+    # (the query scans qa_pairs for a non-null embedding_model), so a flip to
+    # a new model is picked up within that interval without a restart.
+    global _active_model, _active_model_checked_at
+
+    now = time.monotonic()
+    if (
+        _active_model_checked_at is None
+        or now - _active_model_checked_at >= EMBEDDING_MODEL_CHECK_INTERVAL_S
+    ):
+        repo = SqlAlchemyQaPairRepository(session)
+        _active_model = await repo.active_embedding_model()
+        _active_model_checked_at = now
+    return _active_model
+
+
+async def _get_shared_clients(
+    embedding_model: Optional[str],
+) -> tuple[EmbeddingProvider, LlmClient]:
     global _shared_embedding_provider, _shared_llm_client
+    global _shared_embedding_model, _shared_qa_repo_loaded
 
-    if _shared_embedding_provider is not None and _shared_llm_client is not None:
+    if (
+        _shared_embedding_provider is not None
+        and _shared_llm_client is not None
+        and _shared_embedding_model == embedding_model
+    ):
         return _shared_embedding_provider, _shared_llm_client
 
     async with _shared_clients_lock:
+        if (
+            _shared_embedding_provider is not None
+            and _shared_embedding_model != embedding_model
+        ):
+            logger.warning(
+                "Embedding model switched from {} to {}; reloading query embeddings and QA index",
+                _shared_embedding_model,
+                embedding_model,
+            )
+            _retired_embedding_providers.append(_shared_embedding_provider)
+            _shared_embedding_provider = None
+            _shared_qa_repo_loaded = False
         if _shared_embedding_provider is None:
-            _shared_embedding_provider = OpenRouterEmbeddingProvider()
+            _shared_embedding_provider = create_embedding_provider(
+                model_name=embedding_model
+            )
+            _shared_embedding_model = embedding_model
         if _shared_llm_client is None:
-            _shared_llm_client = OpenRouterLlmClient()
+            _shared_llm_client = create_llm_client()
         return _shared_embedding_provider, _shared_llm_client
 
 
+async def _get_shared_qa_repo(
+    embedding_model: Optional[str],
+) -> tuple[Optional[QaPairRepository], Optional[TopicRouter]]:
+    # Reloaded after a model flip (see _get_shared_clients); files built with
+    # another model are refused by the loaders.
+    global _shared_qa_repo, _shared_topic_router, _shared_qa_repo_loaded
+
+    if _shared_qa_repo_loaded:
+        return _shared_qa_repo, _shared_topic_router
+
+    async with _shared_clients_lock:
+        if not _shared_qa_repo_loaded:
+            _shared_qa_repo = await load_in_memory_qa_repository(
+                embedding_model=embedding_model
+            )
+            _shared_topic_router = await load_topic_router(
+                _shared_qa_repo, embedding_model=embedding_model
+            )
+            _shared_qa_repo_loaded = True
+        return _shared_qa_repo, _shared_topic_router
+
+
 async def init_shared_clients(**_: object) -> None:
-    await _get_shared_clients()
+    async with SessionLocal() as session:
+        embedding_model = await _active_embedding_model(session)
+    await _get_shared_clients(embedding_model)
+    if HTTP_POOL_WARMUP:
+        await warm_up_http_pool([OPENROUTER_BASE_URL, EMBEDDING_BASE_URL])
+    await _get_shared_qa_repo(embedding_model)
 
 
 async def close_shared_clients(**_: object) -> None:
-    global _shared_embedding_provider, _shared_llm_client
+    global _shared_embedding_provider, _shared_llm_client, _shared_embedding_model
+    global _shared_qa_repo, _shared_topic_router, _shared_qa_repo_loaded
+    global _active_model_checked_at
 
     async with _shared_clients_lock:
-        embedding_provider, _shared_embedding_provider = (
-            _shared_embedding_provider,
-            None,
-        )
+        _active_model_checked_at = None
+        embedding_providers = list(_retired_embedding_providers)
+        _retired_embedding_providers.clear()
+        if _shared_embedding_provider is not None:
+            embedding_providers.append(_shared_embedding_provider)
+        _shared_embedding_provider, _shared_embedding_model = None, None
         llm_client, _shared_llm_client = _shared_llm_client, None
+        _shared_qa_repo, _shared_topic_router = None, None
+        _shared_qa_repo_loaded = False
 
-    if embedding_provider is not None:
+    for embedding_provider in embedding_providers:
         try:
             await embedding_provider.close()
         except Exception as exc:
@@ -62,33 +168,54 @@ async def close_shared_clients(**_: object) -> None:
         except Exception as exc:
             logger.exception("Failed to close LLM client: {}", exc)
 
+    if _shared_answer_cache is not None:
+        _shared_answer_cache.log_stats()
+    log_rate_limiter_stats()
+    await close_http_pool()
+
 
 def _build_rag_service(
     session: AsyncSession,
-    embedding_provider: OpenRouterEmbeddingProvider,
-    llm_client: OpenRouterLlmClient,
+    embedding_provider: EmbeddingProvider,
+    llm_client: LlmClient,
+    shared_qa_repo: Optional[QaPairRepository] = None,
+    topic_router: Optional[TopicRouter] = None,
 ) -> RagService:
-    qa_repo = SqlAlchemyQaPairRepository(session)
+    qa_repo = (
+        shared_qa_repo
+        if shared_qa_repo is not None
+        else SqlAlchemyQaPairRepository(session)
+    )
     run_repo = SqlAlchemyRagRunRepository(session)
     return RagService(
         qa_repo=qa_repo,
         embedding_provider=embedding_provider,
         llm_client=llm_client,
         run_repo=run_repo,
+        lexical_retriever=(
+            SqlAlchemyLexicalQaPairRetriever(SessionLocal)
+            if RAG_HYBRID_SEARCH
+            else None
+        ),
+        topic_router=topic_router,
+        answer_cache=_shared_answer_cache,
     )
 
 
 @asynccontextmanager
 async def rag_service_context() -> AsyncIterator[RagService]:
-    embedding_provider, llm_client = await _get_shared_clients()
-
     async with SessionLocal() as session:
         logger.debug("Opened database session for Telegram request")
         try:
+            embedding_model = await _active_embedding_model(session)
+            embedding_provider, llm_client = await _get_shared_clients(embedding_model)
+            shared_qa_repo, topic_router = await _get_shared_qa_repo(embedding_model)
             rag_service = _build_rag_service(
                 session,
                 embedding_provider=embedding_provider,
                 llm_client=llm_client,
+                shared_qa_repo=shared_qa_repo,
+                topic_router=topic_router,
             )
             yield rag_service
             await session.commit()
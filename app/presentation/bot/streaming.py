@@ -0,0 +1,122 @@
+import asyncio
+import time
+from typing import Any, Optional
+
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+from aiogram.types import Message
+from loguru import logger
+
+# Telegram rejects longer message texts.
+TELEGRAM_MESSAGE_LIMIT = 4096
+_CURSOR = " ▌"
+_FINAL_EDIT_ATTEMPTS = 3
+
+
+def split_message(text: str, limit: int = TELEGRAM_MESSAGE_LIMIT) -> list[str]:
+    """Split at line breaks where possible so each part fits one message."""
+    parts: list[str] = []
+    while len(text) > limit:
+        cut = text.rfind("\n", 0, limit)
+        if cut <= 0:
+            cut = limit
+        parts.append(text[:cut])
+        text = text[cut:].lstrip("\n")
+    parts.append(text)
+    return parts
+
+
+class ProgressiveReply:
+    """
+    One Telegram message that grows with a streamed answer.
+
+    Fragments are buffered and the message is edited at most once per
+    `edit_interval_s`, as Telegram throttles frequent edits in a chat; a
+    RetryAfter pushes the next edit back instead of failing the answer.
+    Intermediate edits are plain text because a half-streamed answer is rarely
+    valid HTML; the final edit uses the bot's default parse mode.
+    """
+
+    def __init__(
+        self, message: Message, *, edit_interval_s: float, placeholder: str
+    ) -> None:
+        self._message = message
+        self._interval = max(0.0, float(edit_interval_s))
+        self._placeholder = placeholder
+        self._reply: Optional[Message] = None
+        self._text = ""
+        self._shown = ""
+        self._next_edit_at = 0.0
+        self._pending: Optional[asyncio.Task[None]] = None
+        self.edits = 0
+
+    async def start(self) -> None:
+        self._reply = await self._message.answer(self._placeholder, parse_mode=None)
+        self._shown = self._placeholder
+        self._next_edit_at = time.monotonic() + self._interval
+
+    async def on_delta(self, delta: str) -> None:
+        self._text += delta
+        # Never blocks the stream: at most one edit is scheduled at a time.
+        if self._pending is None or self._pending.done():
+            self._pending = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(max(0.0, self._next_edit_at - time.monotonic()))
+        preview = self._text[: TELEGRAM_MESSAGE_LIMIT - len(_CURSOR)] + _CURSOR
+        try:
+            await self._edit(preview, parse_mode=None)
+        except Exception as exc:
+            logger.warning("Failed to update streamed answer: {}", exc)
+
+    async def _edit(self, text: str, **kwargs: Any) -> bool:
+        if self._reply is None or text == self._shown:
+            return True
+        try:
+            await self._reply.edit_text(text, **kwargs)
+        except TelegramRetryAfter as exc:
+            self._next_edit_at = time.monotonic() + exc.retry_after
+            logger.warning(
+                "Telegram edit rate limited, retrying in {}s", exc.retry_after
+            )
+            return False
+        except TelegramBadRequest as exc:
+            if "message is not modified" not in str(exc):
+                raise
+        self._shown = text
+        self.edits += 1
+        self._next_edit_at = time.monotonic() + self._interval
+        return True
+
+    async def _cancel_pending(self) -> None:
+        if self._pending is not None and not self._pending.done():
+            self._pending.cancel()
+            try:
+                await self._pending
+            except asyncio.CancelledError:
+                pass
+        self._pending = None
+
+    async def finish(self, text: str) -> None:
+        await self._cancel_pending()
+        first, *rest = split_message(text)
+        for _ in range(_FINAL_EDIT_ATTEMPTS):
+            if await self._edit(first):
+                break
+            await asyncio.sleep(max(0.0, self._next_edit_at - time.monotonic()))
+        else:
+            # Still rate limited: deliver the answer as a new message instead.
+            await self._message.answer(first)
+        for part in rest:
+            await self._message.answer(part)
+        logger.debug(
+            "Streamed answer delivered (edits={}, parts={})", self.edits, 1 + len(rest)
+        )
+
+    async def fail(self, text: str) -> None:
+        await self._cancel_pending()
+        try:
+            if await self._edit(text, parse_mode=None):
+                return
+        except Exception as exc:
+            logger.warning("Failed to replace streamed answer with error: {}", exc)
+        await self._message.answer(text)
@@ -2,23 +2,41 @@ import asyncio
 
 from app.infrastructure.db.base import SessionLocal
 from app.infrastructure.db.crud import SqlAlchemyQaPairRepository
-from app.infrastructure.llm.openrouter_embedding_provider import (
-    OpenRouterEmbeddingProvider,
+from app.infrastructure.llm.factory import (
+    create_embedding_provider,
+    create_llm_client,
+)
+from app.infrastructure.vector.loader import (
+    load_in_memory_qa_repository,
+    load_topic_router,
 )
-from app.infrastructure.llm.openrouter_llm_client import OpenRouterLlmClient
 from app.application.rag_service import RagService
 
 
 async def main() -> None:
     async with SessionLocal() as session:
-        qa_repo = SqlAlchemyQaPairRepository(session)
-        embedding_provider = OpenRouterEmbeddingProvider()
-        llm_client = OpenRouterLlmClient()
+        embedding_model = await SqlAlchemyQaPairRepository(
+            session
+        ).active_embedding_model()
+    shared_qa_repo = await load_in_memory_qa_repository(embedding_model=embedding_model)
+    topic_router = await load_topic_router(
+        shared_qa_repo, embedding_model=embedding_model
+    )
+
+    async with SessionLocal() as session:
+        qa_repo = (
+            shared_qa_repo
+            if shared_qa_repo is not None
+            else SqlAlchemyQaPairRepository(session)
+        )
+        embedding_provider = create_embedding_provider(model_name=embedding_model)
+        llm_client = create_llm_client()
 
         rag_service = RagService(
             qa_repo=qa_repo,
             embedding_provider=embedding_provider,
             llm_client=llm_client,
+            topic_router=topic_router,
         )
 
         print("RAG-консоль. Введи вопрос абитуриента. Пустая строка — выход.\n")
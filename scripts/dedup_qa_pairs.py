@@ -0,0 +1,174 @@
+import asyncio
+import tempfile
+from collections import Counter
+from pathlib import Path
+from typing import Optional, Sequence
+
+from loguru import logger
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.db.base import SessionLocal
+from app.infrastructure.db.export_embedding_snapshot import export_snapshot
+from app.infrastructure.db.models import QaPairORM, RagRunHitORM
+from app.infrastructure.logging import setup_logging
+from app.infrastructure.vector.dedup import DuplicateGroup, find_duplicate_groups
+from app.infrastructure.vector.numpy_qa_pair_repository import NumpyQaPairRepository
+
+APPLY_FLAG = "flag"
+APPLY_MERGE = "merge"
+
+
+def _preview(text: str, width: int = 80) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= width else text[: width - 1] + "…"
+
+
+def print_report(
+    groups: Sequence[DuplicateGroup], repo: NumpyQaPairRepository, show: int
+) -> None:
+    by_id = {qa.id: qa for qa in repo.qa_pairs}
+    duplicates = sum(len(group.duplicate_ids) for group in groups)
+    print(
+        f"qa_pairs={len(repo)} groups={len(groups)} duplicates={duplicates} "
+        f"compacted={len(repo) - duplicates}"
+    )
+
+    groups_by_topic = Counter(group.topic for group in groups)
+    dups_by_topic: Counter[str] = Counter()
+    for group in groups:
+        dups_by_topic[group.topic] += len(group.duplicate_ids)
+    for topic, count in groups_by_topic.most_common():
+        print(f"- topic={topic}: groups={count} duplicates={dups_by_topic[topic]}")
+
+    largest = sorted(groups, key=lambda group: len(group.duplicate_ids), reverse=True)
+    for group in largest[:show]:
+        canonical = by_id[group.canonical_id]
+        print(
+            f"\n[{group.topic}] keep id={group.canonical_id} "
+            f"(min_similarity={group.min_similarity:.4f}): "
+            f"{_preview(canonical.question)}"
+        )
+        for dup_id in group.duplicate_ids:
+            print(f"    dup id={dup_id}: {_preview(by_id[dup_id].question)}")
+
+
+async def flag_duplicates(
+    session: AsyncSession, groups: Sequence[DuplicateGroup]
+) -> int:
+    for group in groups:
+        await session.execute(
+            update(QaPairORM)
+            .where(QaPairORM.id.in_(group.duplicate_ids))
+            .values(duplicate_of=group.canonical_id)
+        )
+    return sum(len(group.duplicate_ids) for group in groups)
+
+
+async def merge_duplicates(
+    session: AsyncSession, groups: Sequence[DuplicateGroup]
+) -> int:
+    """
+    Delete duplicates, re-pointing their rag_run_hits to the kept pair first
+    so run history still references an existing QA pair.
+    """
+    for group in groups:
+        await session.execute(
+            update(RagRunHitORM)
+            .where(RagRunHitORM.qa_pair_id.in_(group.duplicate_ids))
+            .values(qa_pair_id=group.canonical_id)
+        )
+        await session.execute(
+            delete(QaPairORM).where(QaPairORM.id.in_(group.duplicate_ids))
+        )
+    return sum(len(group.duplicate_ids) for group in groups)
+
+
+async def dedup(
+    *,
+    threshold: float,
+    block_rows: int,
+    snapshot: Optional[str],
+    cross_topic: bool,
+    apply: Optional[str],
+    show: int,
+) -> None:
+    with tempfile.TemporaryDirectory(prefix="qa_dedup_") as tmp_dir:
+        snapshot_path = snapshot or str(
+            await export_snapshot(str(Path(tmp_dir) / "snapshot"))
+        )
+        repo = NumpyQaPairRepository.from_snapshot(snapshot_path)
+        partitions = (
+            [slice(0, len(repo))] if cross_topic else repo.topic_partitions(repo.topics)
+        )
+        groups = find_duplicate_groups(
+            repo.matrix,
+            repo.qa_pairs,
+            partitions,
+            threshold=threshold,
+            block_rows=block_rows,
+        )
+        print_report(groups, repo, show)
+
+    if not apply or not groups:
+        return
+
+    async with SessionLocal() as session:
+        if apply == APPLY_FLAG:
+            changed = await flag_duplicates(session, groups)
+        else:
+            changed = await merge_duplicates(session, groups)
+        await session.commit()
+
+    print(f"\n{apply}: {changed} QA pairs updated")
+    if apply == APPLY_MERGE:
+        print("Run VACUUM ANALYZE qa_pairs and re-export the snapshot if one is used.")
+    logger.info(
+        "QA pairs deduplicated (apply={}, groups={}, changed={})",
+        apply,
+        len(groups),
+        changed,
+    )
+
+
+async def main() -> None:
+    import argparse
+
+    setup_logging()
+
+    parser = argparse.ArgumentParser(
+        description="Find near-duplicate QA pairs by embedding cosine similarity"
+    )
+    parser.add_argument("--threshold", type=float, default=0.95)
+    parser.add_argument("--block-rows", type=int, default=2048)
+    parser.add_argument(
+        "--snapshot",
+        default=None,
+        help="Use an existing embedding snapshot instead of exporting one",
+    )
+    parser.add_argument(
+        "--cross-topic",
+        action="store_true",
+        help="Also group pairs from different topics",
+    )
+    parser.add_argument(
+        "--apply",
+        choices=(APPLY_FLAG, APPLY_MERGE),
+        default=None,
+        help="flag: set duplicate_of (hidden from retrieval); merge: delete",
+    )
+    parser.add_argument("--show", type=int, default=20)
+    args = parser.parse_args()
+
+    await dedup(
+        threshold=args.threshold,
+        block_rows=max(1, args.block_rows),
+        snapshot=args.snapshot,
+        cross_topic=args.cross_topic,
+        apply=args.apply,
+        show=args.show,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -5,6 +5,15 @@ from loguru import logger
 
 from app.eval.pipeline import EvalPipeline, EvalPipelineConfig
 from app.eval.report import format_summary, summarize_run
+from app.infrastructure.config import (
+    EMBEDDING_BACKEND,
+    EVAL_LLM_CACHE,
+    LLM_BACKEND,
+    RAG_HYBRID_SEARCH,
+    RAG_CONTEXT_TOKEN_BUDGET,
+    RAG_MMR,
+    RAG_TOPIC_ROUTING,
+)
 from app.infrastructure.db.base import SessionLocal
 from app.infrastructure.db.eval_repository import SqlAlchemyEvalRepository
 from app.infrastructure.logging import setup_logging
@@ -26,6 +35,42 @@ async def main() -> None:
         "--concurrency", type=int, default=int(os.getenv("EVAL_CONCURRENCY", "3"))
     )
     parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument(
+        "--retriever-backend",
+        default=os.getenv("RAG_RETRIEVER_BACKEND", "postgres"),
+    )
+    parser.add_argument(
+        "--hybrid-search",
+        action=argparse.BooleanOptionalAction,
+        default=RAG_HYBRID_SEARCH,
+    )
+    parser.add_argument(
+        "--topic-routing",
+        action=argparse.BooleanOptionalAction,
+        default=RAG_TOPIC_ROUTING,
+    )
+    parser.add_argument("--mmr", action=argparse.BooleanOptionalAction, default=RAG_MMR)
+    parser.add_argument(
+        "--context-token-budget",
+        type=int,
+        default=RAG_CONTEXT_TOKEN_BUDGET,
+        help="Context token budget (0: no limit)",
+    )
+    parser.add_argument(
+        "--embedding-backend",
+        choices=("openrouter", "fake", "record", "replay"),
+        default=EMBEDDING_BACKEND,
+    )
+    parser.add_argument(
+        "--llm-backend",
+        choices=("openrouter", "fake", "record", "replay"),
+        default=LLM_BACKEND,
+    )
+    parser.add_argument(
+        "--llm-cache",
+        action=argparse.BooleanOptionalAction,
+        default=EVAL_LLM_CACHE,
+    )
 
     parser.add_argument(
         "--answer-model",
@@ -75,6 +120,14 @@ async def main() -> None:
             dataset_name=args.dataset,
             dataset_description=None,
             system_version=args.system_version,
+            rag_retriever_backend=args.retriever_backend,
+            rag_hybrid_search=args.hybrid_search,
+            rag_topic_routing=args.topic_routing,
+            rag_mmr=args.mmr,
+            rag_context_token_budget=args.context_token_budget,
+            embedding_backend=args.embedding_backend,
+            llm_backend=args.llm_backend,
+            llm_cache=args.llm_cache,
             answer_model_name=args.answer_model,
             answer_temperature=args.answer_temperature,
             answer_system_prompt_name=args.answer_system_prompt,
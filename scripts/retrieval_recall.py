@@ -0,0 +1,99 @@
+import asyncio
+import time
+import numpy as np
+from loguru import logger
+
+from app.eval.retrieval import format_benchmark, summarize_benchmark
+from app.infrastructure.config import RAG_SHORT_EMBEDDING_DIM, RAG_TOP_K
+from app.infrastructure.logging import setup_logging
+from app.infrastructure.vector.loader import (
+    RETRIEVER_BACKEND_NUMPY,
+    RETRIEVER_BACKEND_SNAPSHOT,
+    load_in_memory_qa_repository,
+)
+from app.infrastructure.vector.matryoshka import MatryoshkaQaPairRepository
+from app.infrastructure.vector.numpy_qa_pair_repository import NumpyQaPairRepository
+from app.infrastructure.vector.quantized_qa_pair_repository import (
+    QUANTIZATION_MODES,
+    QuantizedQaPairRepository,
+)
+
+
+async def main() -> None:
+    import argparse
+
+    setup_logging()
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--backend",
+        choices=(RETRIEVER_BACKEND_NUMPY, RETRIEVER_BACKEND_SNAPSHOT),
+        default=RETRIEVER_BACKEND_SNAPSHOT,
+    )
+    parser.add_argument("--k", type=int, default=RAG_TOP_K)
+    parser.add_argument("--sample", type=int, default=200)
+    parser.add_argument("--rescore-factor", type=int, default=4)
+    parser.add_argument(
+        "--short-dims",
+        type=int,
+        nargs="*",
+        default=[RAG_SHORT_EMBEDDING_DIM],
+        help="Matryoshka prefix dimensions to benchmark (empty to skip)",
+    )
+    args = parser.parse_args()
+
+    base = await load_in_memory_qa_repository(
+        args.backend, quantization="", matryoshka=False
+    )
+    if not isinstance(base, NumpyQaPairRepository) or not len(base):
+        raise RuntimeError("In-memory QA index is empty")
+
+    rng = np.random.default_rng(0)
+    sample = rng.choice(len(base), size=min(args.sample, len(base)), replace=False)
+    queries = [np.asarray(base.matrix[row], dtype=np.float32) for row in sample]
+
+    latencies_ms: list[float] = []
+    for query in queries:
+        t_start = time.perf_counter()
+        await base.find_top_k(query, args.k)
+        latencies_ms.append((time.perf_counter() - t_start) * 1000)
+    print(f"float32: bytes={base.nbytes}")
+    print(format_benchmark(summarize_benchmark("exact", latencies_ms, 1.0), args.k))
+
+    for mode in QUANTIZATION_MODES:
+        quantized = QuantizedQaPairRepository(
+            base, mode=mode, rescore_factor=args.rescore_factor
+        )
+        latencies_ms = []
+        for query in queries:
+            t_start = time.perf_counter()
+            await quantized.find_top_k(query, args.k)
+            latencies_ms.append((time.perf_counter() - t_start) * 1000)
+        recall = quantized.recall_at_k(args.k, sample_size=args.sample)
+        print(f"{mode}: bytes={quantized.nbytes}")
+        print(format_benchmark(summarize_benchmark(mode, latencies_ms, recall), args.k))
+
+    for dim in args.short_dims:
+        if not 0 < dim < base.dim:
+            continue
+        matryoshka = MatryoshkaQaPairRepository(
+            base, dim=dim, rescore_factor=args.rescore_factor
+        )
+        latencies_ms = []
+        for query in queries:
+            t_start = time.perf_counter()
+            await matryoshka.find_top_k(query, args.k)
+            latencies_ms.append((time.perf_counter() - t_start) * 1000)
+        recall = matryoshka.recall_at_k(args.k, sample_size=args.sample)
+        print(f"matryoshka-{dim}: bytes={matryoshka.nbytes}")
+        print(
+            format_benchmark(
+                summarize_benchmark(f"matryoshka-{dim}", latencies_ms, recall), args.k
+            )
+        )
+
+    logger.info("Retrieval recall benchmark completed (backend={})", args.backend)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -3,15 +3,15 @@ import asyncio
 from app.infrastructure.config import RAG_MIN_SIMILARITY, RAG_TOP_K
 from app.infrastructure.db.base import SessionLocal
 from app.infrastructure.db.crud import SqlAlchemyQaPairRepository
-from app.infrastructure.llm.openrouter_embedding_provider import (
-    OpenRouterEmbeddingProvider,
-)
+from app.infrastructure.llm.factory import create_embedding_provider
 
 
 async def main() -> None:
     async with SessionLocal() as session:
         repo = SqlAlchemyQaPairRepository(session)
-        embedder = OpenRouterEmbeddingProvider()
+        embedder = create_embedding_provider(
+            model_name=await repo.active_embedding_model()
+        )
 
         user_question = "Сколько стоит обучение на платном отделении и есть ли рассрочка/оплата по семестрам?"
 
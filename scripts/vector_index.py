@@ -0,0 +1,282 @@
+import asyncio
+import time
+from typing import Optional, Sequence
+
+from loguru import logger
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.models.embedding import Embedding, as_embedding
+from app.eval.retrieval import (
+    RetrievalBenchmark,
+    format_benchmark,
+    mean_recall_at_k,
+    summarize_benchmark,
+)
+from app.infrastructure.config import RAG_TOPIC_CENTROIDS_PATH
+from app.infrastructure.db.base import SessionLocal
+from app.infrastructure.db.crud import SqlAlchemyQaPairRepository
+from app.infrastructure.db.models import QA_PAIRS_SHORT_EMBEDDING_DIM, QaPairORM
+from app.infrastructure.db.vector_index import (
+    INDEX_KIND_IVFFLAT,
+    INDEX_KINDS,
+    compute_topic_centroids,
+    count_qa_pairs,
+    existing_vector_index_kinds,
+    rebuild_topic_indexes,
+    rebuild_vector_index,
+    save_vector_tuning,
+)
+from app.infrastructure.logging import setup_logging
+from app.infrastructure.vector.topic_router import CentroidTopicRouter
+
+
+async def _sample_queries(
+    session: AsyncSession, sample_size: int
+) -> list[tuple[int, Embedding]]:
+    result = await session.execute(
+        select(QaPairORM.id, QaPairORM.embedding)
+        .order_by(func.random())
+        .limit(sample_size)
+    )
+    return [(int(row.id), as_embedding(row.embedding)) for row in result.all()]
+
+
+async def _run_queries(
+    repo: SqlAlchemyQaPairRepository,
+    queries: Sequence[tuple[int, Embedding]],
+    k: int,
+) -> tuple[list[list[int]], list[float]]:
+    ids: list[list[int]] = []
+    latencies_ms: list[float] = []
+    for query_id, embedding in queries:
+        t_start = time.perf_counter()
+        hits = await repo.find_top_k(embedding, k + 1)
+        latencies_ms.append((time.perf_counter() - t_start) * 1000)
+        # The sampled row always matches itself; drop it from both sides.
+        hit_ids = [int(hit.qa_pair.id or 0) for hit in hits]
+        ids.append([hit_id for hit_id in hit_ids if hit_id != query_id][:k])
+    return ids, latencies_ms
+
+
+async def build(kind: str, lists: Optional[int]) -> None:
+    async with SessionLocal() as session:
+        params = await rebuild_vector_index(session, kind, lists=lists)
+        await session.commit()
+    print(f"index_kind={kind} params={params}")
+    print(f"Set RAG_VECTOR_INDEX={kind} for the application to use it.")
+
+
+async def topics(*, build_indexes: bool, out: str) -> None:
+    async with SessionLocal() as session:
+        if build_indexes:
+            indexes = await rebuild_topic_indexes(session)
+            await session.commit()
+            for topic, name in indexes.items():
+                print(f"{name}: topic={topic}")
+        centroids = await compute_topic_centroids(session)
+        embedding_model = await SqlAlchemyQaPairRepository(
+            session
+        ).active_embedding_model()
+
+    path = CentroidTopicRouter(centroids).save(out, embedding_model=embedding_model)
+    print(f"Saved {len(centroids)} topic centroids to {path}")
+    print("Set RAG_TOPIC_ROUTING=true for the application to route by topic.")
+
+
+async def tune(
+    *,
+    sample_size: int,
+    k: int,
+    probes_values: Sequence[int],
+    target_recall: float,
+    persist: bool,
+) -> None:
+    async with SessionLocal() as session:
+        if INDEX_KIND_IVFFLAT not in await existing_vector_index_kinds(session):
+            raise RuntimeError(
+                "IVFFlat index not found; run "
+                "`python -m scripts.vector_index build --kind ivfflat` first"
+            )
+
+        rows = await count_qa_pairs(session)
+        queries = await _sample_queries(session, sample_size)
+        await session.rollback()
+        if not queries:
+            raise RuntimeError("qa_pairs is empty, nothing to benchmark")
+
+        exact_repo = SqlAlchemyQaPairRepository(session, exact=True)
+        exact_ids, exact_latencies = await _run_queries(exact_repo, queries, k)
+        await session.rollback()
+        print(format_benchmark(summarize_benchmark("exact", exact_latencies), k))
+
+        benchmarks: list[tuple[int, RetrievalBenchmark]] = []
+        for probes in sorted(set(probes_values)):
+            repo = SqlAlchemyQaPairRepository(
+                session, index_kind=INDEX_KIND_IVFFLAT, probes=probes, matryoshka=False
+            )
+            approx_ids, latencies = await _run_queries(repo, queries, k)
+            await session.rollback()
+
+            bench = summarize_benchmark(
+                f"ivfflat probes={probes}",
+                latencies,
+                recall=mean_recall_at_k(exact_ids, approx_ids, k),
+            )
+            benchmarks.append((probes, bench))
+            print(format_benchmark(bench, k))
+
+    recommended = next(
+        (
+            (probes, bench)
+            for probes, bench in benchmarks
+            if (bench.recall_at_k or 0.0) >= target_recall
+        ),
+        None,
+    )
+    if recommended is None:
+        print(
+            f"No probes value reached recall@{k} >= {target_recall}; "
+            f"try larger --probes values or an HNSW index."
+        )
+        return
+
+    probes, bench = recommended
+    print(f"recommended_probes={probes}")
+    if persist:
+        path = save_vector_tuning(
+            {
+                "index_kind": INDEX_KIND_IVFFLAT,
+                "probes": probes,
+                "k": k,
+                "target_recall": target_recall,
+                "recall_at_k": bench.recall_at_k,
+                "latency_ms_p50": bench.latency_ms_p50,
+                "latency_ms_p95": bench.latency_ms_p95,
+                "rows": rows,
+                "sample_size": len(queries),
+            }
+        )
+        print(f"Saved tuning to {path}")
+
+
+async def matryoshka(
+    *, sample_size: int, k: int, rescore_factors: Sequence[int]
+) -> None:
+    """
+    Recall of the two-stage search (embedding_short shortlist, full-vector
+    rescoring) against exact full-dimension search.
+    """
+    async with SessionLocal() as session:
+        queries = await _sample_queries(session, sample_size)
+        await session.rollback()
+        if not queries:
+            raise RuntimeError("qa_pairs is empty, nothing to benchmark")
+
+        exact_repo = SqlAlchemyQaPairRepository(session, exact=True)
+        exact_ids, exact_latencies = await _run_queries(exact_repo, queries, k)
+        await session.rollback()
+        print(format_benchmark(summarize_benchmark("exact", exact_latencies), k))
+
+        full_repo = SqlAlchemyQaPairRepository(session, matryoshka=False)
+        full_ids, full_latencies = await _run_queries(full_repo, queries, k)
+        await session.rollback()
+        print(
+            format_benchmark(
+                summarize_benchmark(
+                    "full index",
+                    full_latencies,
+                    recall=mean_recall_at_k(exact_ids, full_ids, k),
+                ),
+                k,
+            )
+        )
+
+        for factor in sorted(set(rescore_factors)):
+            label = f"matryoshka dim={QA_PAIRS_SHORT_EMBEDDING_DIM} rescore={factor}"
+            repo = SqlAlchemyQaPairRepository(
+                session, matryoshka=True, rescore_factor=factor
+            )
+            approx_ids, latencies = await _run_queries(repo, queries, k)
+            await session.rollback()
+            print(
+                format_benchmark(
+                    summarize_benchmark(
+                        label,
+                        latencies,
+                        recall=mean_recall_at_k(exact_ids, approx_ids, k),
+                    ),
+                    k,
+                )
+            )
+
+
+async def main() -> None:
+    import argparse
+
+    setup_logging()
+
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Rebuild the vector index")
+    build_parser.add_argument("--kind", choices=INDEX_KINDS, required=True)
+    build_parser.add_argument(
+        "--lists", type=int, default=None, help="IVFFlat lists (default: auto)"
+    )
+
+    tune_parser = subparsers.add_parser(
+        "tune", help="Benchmark IVFFlat probes against exact search"
+    )
+    tune_parser.add_argument("--sample", type=int, default=200)
+    tune_parser.add_argument("--k", type=int, default=5)
+    tune_parser.add_argument("--probes", default="1,2,4,8,16,32,64")
+    tune_parser.add_argument("--target-recall", type=float, default=0.95)
+    tune_parser.add_argument("--persist", action="store_true")
+
+    topics_parser = subparsers.add_parser(
+        "topics",
+        help="Build per-topic partial indexes and save topic centroids",
+    )
+    topics_parser.add_argument(
+        "--no-indexes",
+        action="store_true",
+        help="Only recompute centroids, keep existing per-topic indexes",
+    )
+    topics_parser.add_argument("--out", default=RAG_TOPIC_CENTROIDS_PATH)
+
+    matryoshka_parser = subparsers.add_parser(
+        "matryoshka",
+        help="Benchmark short-vector search with rescoring against exact search",
+    )
+    matryoshka_parser.add_argument("--sample", type=int, default=200)
+    matryoshka_parser.add_argument("--k", type=int, default=5)
+    matryoshka_parser.add_argument("--rescore-factors", default="1,2,4,8")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        await build(args.kind, args.lists)
+    elif args.command == "topics":
+        await topics(build_indexes=not args.no_indexes, out=args.out)
+    elif args.command == "matryoshka":
+        await matryoshka(
+            sample_size=args.sample,
+            k=args.k,
+            rescore_factors=[
+                int(f) for f in args.rescore_factors.split(",") if f.strip()
+            ],
+        )
+    else:
+        await tune(
+            sample_size=args.sample,
+            k=args.k,
+            probes_values=[int(p) for p in args.probes.split(",") if p.strip()],
+            target_recall=args.target_recall,
+            persist=args.persist,
+        )
+
+    logger.info("Vector index command completed ({})", args.command)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())